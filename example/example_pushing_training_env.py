@@ -71,6 +71,7 @@ class ExamplePushingTrainingEnv(gym.Env):
 
         # will be initialized in reset()
         self.platform = None
+        self.np_random = None
 
         # Create the action and observation spaces
         # ========================================
@@ -176,7 +177,9 @@ class ExamplePushingTrainingEnv(gym.Env):
                 position=default_object_position,
                 orientation=default_object_orientation,
             )
-            goal_object_pose = move_cube.sample_goal(difficulty=1)
+            goal_object_pose = move_cube.sample_goal(
+                difficulty=1, rng=self.np_random
+            )
         else:
             # if an initializer is given, i.e. during evaluation, we need to initialize
             # according to it, to make sure we remain coherent with the standard CubeEnv.
@@ -184,8 +187,12 @@ class ExamplePushingTrainingEnv(gym.Env):
             initial_robot_position = (
                 TriFingerPlatform.spaces.robot_position.default
             )
-            initial_object_pose = self.initializer.get_initial_state()
-            goal_object_pose = self.initializer.get_goal()
+            (
+                initial_object_pose,
+                goal_object_pose,
+            ) = cube_env.sample_from_initializer(
+                self.initializer, self.np_random
+            )
 
         self.platform = TriFingerPlatform(
             visualization=self.visualization,
@@ -214,7 +221,6 @@ class ExamplePushingTrainingEnv(gym.Env):
 
     def seed(self, seed=None):
         self.np_random, seed = gym.utils.seeding.np_random(seed)
-        move_cube.random = self.np_random
         return [seed]
 
     def _create_observation(self, t):
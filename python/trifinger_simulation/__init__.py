@@ -1,5 +1,7 @@
 # import some important classes to the main module
 from .sim_finger import SimFinger  # noqa
+from .sim_finger_pool import SimFingerPool  # noqa
+from .shared_world import SharedWorld  # noqa
 from .action import Action  # noqa
 from .observation import Observation  # noqa
 from .trifinger_platform import (  # noqa
@@ -0,0 +1,687 @@
+"""Action log of :class:`~trifinger_simulation.TriFingerPlatform` episodes.
+
+The log is stored column-wise, i.e. one array per field (time index, action
+torque, ...) instead of one Python object per step.  This keeps the memory
+usage low and allows writing/reading it as a compact binary file.
+
+File Format
+-----------
+
+All numbers are stored little-endian.
+
+Files in this format use the extension ``.bin`` to distinguish them from the
+pickle files of the old format (``.p``).
+
+1. The magic bytes ``TFACTLOG``, followed by the format version (uint32).
+2. The header: its length in bytes (uint32), followed by a UTF-8 encoded JSON
+   object with the keys "n_joints", "initial_robot_position",
+   "initial_object_pose" and "deterministic_overlapping_pairs".
+3. Any number of blocks, each starting with a 4-byte tag:
+
+   - ``CHNK``: A chunk of steps.  The number of steps n (uint32) is followed
+     by the data of each column (in the order of :data:`COLUMNS`) as raw
+     array of shape ``(n, ...)``.
+   - ``FINL``: The final object pose.  The length in bytes (uint32) is
+     followed by a UTF-8 encoded JSON object with keys "t", "position",
+     "orientation", "timestamp" and "confidence".
+
+Since steps are written in self-contained chunks, a file that is truncated
+(e.g. because the writing process crashed) can still be read up to the last
+complete chunk.
+
+The columns contain everything that was stored per step in the pickle
+format, including timestamp and confidence of the object pose and the tip
+forces of the robot observation (one per finger, i.e. ``n_joints / 3``
+values; NaN if the tip forces were not computed).  Files of version 1 do not
+have the columns "object_timestamp", "object_confidence" and "tip_force",
+they are set to NaN when reading such a file.
+
+Old logs in the pickle format (see :func:`load_action_log`) were recorded
+without deterministic overlapping pairs.
+"""
+import json
+import pickle
+import queue
+import struct
+import threading
+import weakref
+
+import numpy as np
+
+from .action import Action
+from .observation import Observation
+from .tasks import move_cube
+
+
+#: Magic bytes at the beginning of an action log file.
+MAGIC = b"TFACTLOG"
+#: Version of the file format.
+FORMAT_VERSION = 2
+
+#: Names of the columns of the log.
+COLUMNS = (
+    "t",
+    "torque",
+    "position",
+    "kp",
+    "kd",
+    "object_position",
+    "object_orientation",
+    "object_timestamp",
+    "object_confidence",
+    "robot_position",
+    "robot_velocity",
+    "robot_torque",
+    "tip_force",
+)
+
+# columns of files with format version 1
+_COLUMNS_V1 = tuple(
+    name
+    for name in COLUMNS
+    if name not in ("object_timestamp", "object_confidence", "tip_force")
+)
+
+_CHUNK_TAG = b"CHNK"
+_FINAL_OBJECT_POSE_TAG = b"FINL"
+
+
+def _column_layout(n_joints, n_fingers):
+    """Get dtype and shape (without the step dimension) of each column."""
+    joint_column = (np.dtype("<f8"), (n_joints,))
+    return {
+        "t": (np.dtype("<i8"), ()),
+        "torque": joint_column,
+        "position": joint_column,
+        "kp": joint_column,
+        "kd": joint_column,
+        "object_position": (np.dtype("<f8"), (3,)),
+        "object_orientation": (np.dtype("<f8"), (4,)),
+        "object_timestamp": (np.dtype("<f8"), ()),
+        "object_confidence": (np.dtype("<f8"), ()),
+        "robot_position": joint_column,
+        "robot_velocity": joint_column,
+        "robot_torque": joint_column,
+        "tip_force": (np.dtype("<f8"), (n_fingers,)),
+    }
+
+
+def _number_of_fingers(n_joints):
+    # all supported robots have three joints per finger
+    return n_joints // 3
+
+
+def _new_chunk(layout, size):
+    return {
+        name: np.empty((size,) + shape, dtype=dtype)
+        for name, (dtype, shape) in layout.items()
+    }
+
+
+def _write_header(
+    fh,
+    initial_robot_position,
+    initial_object_pose,
+    deterministic_overlapping_pairs,
+):
+    header = {
+        "n_joints": len(initial_robot_position),
+        "initial_robot_position": np.asarray(
+            initial_robot_position, dtype=float
+        ).tolist(),
+        "initial_object_pose": {
+            "position": np.asarray(
+                initial_object_pose.position, dtype=float
+            ).tolist(),
+            "orientation": np.asarray(
+                initial_object_pose.orientation, dtype=float
+            ).tolist(),
+        },
+        "deterministic_overlapping_pairs": bool(
+            deterministic_overlapping_pairs
+        ),
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    fh.write(MAGIC)
+    fh.write(struct.pack("<I", FORMAT_VERSION))
+    fh.write(struct.pack("<I", len(header_bytes)))
+    fh.write(header_bytes)
+
+
+def _write_chunk(fh, chunk, n_steps):
+    fh.write(_CHUNK_TAG)
+    fh.write(struct.pack("<I", n_steps))
+    for name in COLUMNS:
+        fh.write(np.ascontiguousarray(chunk[name][:n_steps]).data)
+
+
+def _write_final_object_pose(fh, final_object_pose):
+    pose = final_object_pose["pose"]
+    data = {
+        "t": int(final_object_pose["t"]),
+        "position": np.asarray(pose.position, dtype=float).tolist(),
+        "orientation": np.asarray(pose.orientation, dtype=float).tolist(),
+        "timestamp": pose.timestamp,
+        "confidence": pose.confidence,
+    }
+    data_bytes = json.dumps(data).encode("utf-8")
+
+    fh.write(_FINAL_OBJECT_POSE_TAG)
+    fh.write(struct.pack("<I", len(data_bytes)))
+    fh.write(data_bytes)
+
+
+def _read_exactly(fh, n_bytes):
+    """Read n_bytes from the file.  Returns None if the file ends before."""
+    data = fh.read(n_bytes)
+    if len(data) < n_bytes:
+        return None
+    return data
+
+
+class _StreamWriter:
+    """Writes blocks of an action log file in a background thread."""
+
+    def __init__(self, filename, max_queued_blocks=2):
+        """Open the file and start the writer thread.
+
+        Args:
+            filename (str): Path to the output file.  If the file exists
+                already, it will be overwritten.
+            max_queued_blocks (int): Maximum number of blocks that are
+                waiting to be written.  If reached, :meth:`write` blocks
+                until the writer thread has caught up.
+        """
+        self._file = open(filename, "wb")
+        self._queue = queue.Queue(maxsize=max_queued_blocks)
+        self._error = None
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, write_function, *args):
+        """Queue ``write_function(file, *args)`` for execution."""
+        if self._closed:
+            raise RuntimeError("The action log file is already closed.")
+        self._check_error()
+        self._queue.put((write_function, args))
+
+    def wait(self):
+        """Wait until all queued blocks are written."""
+        self._queue.join()
+        self._check_error()
+
+    def close(self):
+        """Write all queued blocks and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._file.close()
+        self._check_error()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise RuntimeError(
+                "Failed to write action log file."
+            ) from self._error
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                if self._error is None:
+                    write_function, args = item
+                    write_function(self._file, *args)
+                    # flush every block, so that the file contains all
+                    # completed blocks even if the process crashes
+                    self._file.flush()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+
+def _finish_stream(stream_writer, chunks, chunk_lengths):
+    """Write the steps that are still in memory and close the stream."""
+    if stream_writer._closed:
+        return
+    for chunk, n_steps in zip(chunks, chunk_lengths):
+        if n_steps > 0:
+            stream_writer.write(_write_chunk, chunk, n_steps)
+    stream_writer.close()
+
+
+class ActionLog:
+    """Log of the actions and observations of an episode.
+
+    The values of all steps are kept in preallocated column arrays (one per
+    field, see :data:`COLUMNS`).  When the arrays are full, a new chunk of
+    ``chunk_size`` steps is allocated, so existing data never needs to be
+    copied.
+
+    For compatibility with the old (dictionary-based) log, the log can be
+    indexed/iterated, which gives a dictionary with keys "t", "action",
+    "object_pose" and "robot_observation" for each step.
+
+    If a ``filename`` is given, the log is streamed to that file: the header
+    is written immediately and every full chunk is written by a background
+    thread and then dropped from memory, so memory usage does not grow with
+    the length of the episode.  Since the steps are not kept, indexing,
+    iterating, :meth:`get_column` and :meth:`write` are not available in this
+    mode.  Call :meth:`close` at the end of the episode to write the
+    remaining steps and the final object pose.  If the log is garbage
+    collected (or the interpreter exits) without being closed, the remaining
+    steps are still written, but not the final object pose.  If the process
+    crashes, the file still contains all steps up to the last written chunk.
+
+    Attributes:
+        initial_robot_position (array): Initial joint positions of the robot.
+        initial_object_pose: Initial pose of the object (any object with
+            attributes ``position`` and ``orientation``).
+        final_object_pose (dict): Final pose of the object in the format
+            ``{"t": t, "pose": ObjectPose}``.  None if not set.
+        chunk_size (int): Number of steps per chunk.
+        deterministic_overlapping_pairs (bool): Whether the episode was
+            simulated with deterministic overlapping pairs (see
+            :class:`~trifinger_simulation.TriFingerPlatform`).  Needed to
+            replay the log with the same physics.
+    """
+
+    def __init__(
+        self,
+        initial_robot_position,
+        initial_object_pose,
+        chunk_size=10000,
+        filename=None,
+        deterministic_overlapping_pairs=False,
+    ):
+        """Initialize an empty log.
+
+        Args:
+            initial_robot_position: See :attr:`initial_robot_position`.
+            initial_object_pose: See :attr:`initial_object_pose`.
+            chunk_size (int): See :attr:`chunk_size`.
+            filename (str): If set, the log is streamed to this file (see
+                above).  If the file exists already, it will be overwritten.
+            deterministic_overlapping_pairs (bool): See
+                :attr:`deterministic_overlapping_pairs`.
+        """
+        self.initial_robot_position = np.array(
+            initial_robot_position, dtype=float
+        )
+        self.initial_object_pose = initial_object_pose
+        self.final_object_pose = None
+        self.chunk_size = chunk_size
+        self.deterministic_overlapping_pairs = deterministic_overlapping_pairs
+
+        n_joints = len(self.initial_robot_position)
+        self._layout = _column_layout(n_joints, _number_of_fingers(n_joints))
+        self._chunks = []
+        # number of used steps in each chunk
+        self._chunk_lengths = []
+
+        # number of steps that were already handed over to the stream writer
+        self._n_streamed_steps = 0
+        if filename is None:
+            self._stream_writer = None
+        else:
+            self._stream_writer = _StreamWriter(filename)
+            self._stream_writer.write(
+                _write_header,
+                self.initial_robot_position,
+                self.initial_object_pose,
+                self.deterministic_overlapping_pairs,
+            )
+            # make sure the file is completed if the log is not closed
+            # explicitly (must not reference the log itself)
+            self._finalizer = weakref.finalize(
+                self,
+                _finish_stream,
+                self._stream_writer,
+                self._chunks,
+                self._chunk_lengths,
+            )
+
+    def __len__(self):
+        return self._n_streamed_steps + sum(self._chunk_lengths)
+
+    @property
+    def is_streaming(self):
+        """True if the log is streamed to a file."""
+        return self._stream_writer is not None
+
+    def append(self, t, action, object_pose, robot_observation):
+        """Add a step to the log.
+
+        Args:
+            t (int): Time index of the step.
+            action (Action): The desired action.
+            object_pose (ObjectPose): Object pose at step t.
+            robot_observation (Observation): Robot observation at step t.
+        """
+        if not self._chunks or self._chunk_lengths[-1] == len(
+            self._chunks[-1]["t"]
+        ):
+            self._chunks.append(_new_chunk(self._layout, self.chunk_size))
+            self._chunk_lengths.append(0)
+
+        chunk = self._chunks[-1]
+        i = self._chunk_lengths[-1]
+
+        chunk["t"][i] = t
+        chunk["torque"][i] = action.torque
+        chunk["position"][i] = action.position
+        chunk["kp"][i] = action.position_kp
+        chunk["kd"][i] = action.position_kd
+        chunk["object_position"][i] = object_pose.position
+        chunk["object_orientation"][i] = object_pose.orientation
+        chunk["object_timestamp"][i] = object_pose.timestamp
+        chunk["object_confidence"][i] = object_pose.confidence
+        chunk["robot_position"][i] = robot_observation.position
+        chunk["robot_velocity"][i] = robot_observation.velocity
+        chunk["robot_torque"][i] = robot_observation.torque
+        if robot_observation.tip_force is None:
+            chunk["tip_force"][i] = np.nan
+        else:
+            chunk["tip_force"][i] = robot_observation.tip_force
+
+        self._chunk_lengths[-1] += 1
+
+        if self.is_streaming and self._chunk_lengths[-1] == len(chunk["t"]):
+            self._stream_chunk()
+
+    def close(self):
+        """Finish a streamed log.
+
+        Writes the remaining steps and (if set) :attr:`final_object_pose` to
+        the file and closes it.  Does nothing if the log is not streamed.
+        """
+        if not self.is_streaming:
+            return
+
+        self._finalizer.detach()
+        if self._chunks and self._chunk_lengths[-1] > 0:
+            self._stream_chunk()
+        if self.final_object_pose is not None:
+            self._stream_writer.write(
+                _write_final_object_pose, self.final_object_pose
+            )
+        self._stream_writer.close()
+
+    def _stream_chunk(self):
+        """Hand the last chunk over to the stream writer."""
+        chunk = self._chunks.pop()
+        n_steps = self._chunk_lengths.pop()
+        self._stream_writer.write(_write_chunk, chunk, n_steps)
+        self._n_streamed_steps += n_steps
+
+    def _check_not_streaming(self):
+        if self.is_streaming:
+            raise RuntimeError(
+                "Steps of a streamed action log are not kept in memory."
+                "  Read the file instead."
+            )
+
+    def get_column(self, name):
+        """Get the values of one column for all steps.
+
+        Args:
+            name (str): Name of the column (see :data:`COLUMNS`).
+
+        Returns:
+            array: Array of shape ``(len(log), ...)``.
+        """
+        self._check_not_streaming()
+
+        dtype, shape = self._layout[name]
+        if not self._chunks:
+            return np.empty((0,) + shape, dtype=dtype)
+
+        return np.concatenate(
+            [
+                chunk[name][:n]
+                for chunk, n in zip(self._chunks, self._chunk_lengths)
+            ]
+        )
+
+    def __getitem__(self, index):
+        self._check_not_streaming()
+
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("Step index out of range.")
+
+        for chunk, n in zip(self._chunks, self._chunk_lengths):
+            if index < n:
+                return self._get_step(chunk, index)
+            index -= n
+
+    def __iter__(self):
+        self._check_not_streaming()
+
+        for chunk, n in zip(self._chunks, self._chunk_lengths):
+            for i in range(n):
+                yield self._get_step(chunk, i)
+
+    @staticmethod
+    def _get_step(chunk, i):
+        """Get step i of the chunk in the format of the old action log."""
+        from .trifinger_platform import ObjectPose
+
+        action = Action(
+            torque=chunk["torque"][i].copy(),
+            position=chunk["position"][i].copy(),
+            kp=chunk["kp"][i].copy(),
+            kd=chunk["kd"][i].copy(),
+        )
+
+        object_pose = ObjectPose()
+        object_pose.position = chunk["object_position"][i].copy()
+        object_pose.orientation = chunk["object_orientation"][i].copy()
+        object_pose.timestamp = float(chunk["object_timestamp"][i])
+        object_pose.confidence = float(chunk["object_confidence"][i])
+
+        robot_observation = Observation()
+        robot_observation.position = chunk["robot_position"][i].copy()
+        robot_observation.velocity = chunk["robot_velocity"][i].copy()
+        robot_observation.torque = chunk["robot_torque"][i].copy()
+        tip_force = chunk["tip_force"][i]
+        if np.isnan(tip_force).any():
+            robot_observation.tip_force = None
+        else:
+            robot_observation.tip_force = tip_force.copy()
+
+        return {
+            "t": int(chunk["t"][i]),
+            "action": action,
+            "object_pose": object_pose,
+            "robot_observation": robot_observation,
+        }
+
+    def to_dict(self):
+        """Get the log in the format of the old (pickle-based) action log.
+
+        Returns:
+            dict: Dictionary with keys "initial_robot_position",
+            "initial_object_pose", "deterministic_overlapping_pairs",
+            "actions" and (if set) "final_object_pose".  "actions" is the
+            log itself, providing
+            the steps as dictionaries when indexed/iterated (see
+            :class:`ActionLog`).
+        """
+        log = {
+            "initial_robot_position": self.initial_robot_position,
+            "initial_object_pose": self.initial_object_pose,
+            "deterministic_overlapping_pairs": (
+                self.deterministic_overlapping_pairs
+            ),
+            "actions": self,
+        }
+        if self.final_object_pose is not None:
+            log["final_object_pose"] = self.final_object_pose
+
+        return log
+
+    def write(self, filename):
+        """Write the log to a binary file.
+
+        Args:
+            filename (str): Path to the output file.  If the file exists
+                already, it will be overwritten.
+        """
+        self._check_not_streaming()
+
+        with open(filename, "wb") as fh:
+            _write_header(
+                fh,
+                self.initial_robot_position,
+                self.initial_object_pose,
+                self.deterministic_overlapping_pairs,
+            )
+            for chunk, n in zip(self._chunks, self._chunk_lengths):
+                _write_chunk(fh, chunk, n)
+            if self.final_object_pose is not None:
+                _write_final_object_pose(fh, self.final_object_pose)
+
+    @classmethod
+    def read(cls, filename):
+        """Read a log from a binary file.
+
+        If the file is truncated, all complete chunks are read.
+
+        Args:
+            filename (str): Path to the file.
+
+        Returns:
+            ActionLog: The log.
+
+        Raises:
+            ValueError: If the file is not a valid action log file.
+        """
+        from .trifinger_platform import ObjectPose
+
+        with open(filename, "rb") as fh:
+            if fh.read(len(MAGIC)) != MAGIC:
+                raise ValueError(
+                    "{} is not an action log file.".format(filename)
+                )
+            (version,) = struct.unpack("<I", fh.read(4))
+            if version not in (1, FORMAT_VERSION):
+                raise ValueError(
+                    "Unsupported action log format version {}.".format(
+                        version
+                    )
+                )
+            (header_size,) = struct.unpack("<I", fh.read(4))
+            header = json.loads(fh.read(header_size).decode("utf-8"))
+
+            initial_object_pose = header["initial_object_pose"]
+            log = cls(
+                header["initial_robot_position"],
+                move_cube.Pose(
+                    position=np.array(initial_object_pose["position"]),
+                    orientation=np.array(initial_object_pose["orientation"]),
+                ),
+                deterministic_overlapping_pairs=header[
+                    "deterministic_overlapping_pairs"
+                ],
+            )
+
+            while True:
+                tag = _read_exactly(fh, 4)
+                if tag is None:
+                    break
+
+                if tag == _CHUNK_TAG:
+                    chunk = log._read_chunk(fh, version)
+                    if chunk is None:
+                        break
+                    log._chunks.append(chunk)
+                    log._chunk_lengths.append(len(chunk["t"]))
+
+                elif tag == _FINAL_OBJECT_POSE_TAG:
+                    size_bytes = _read_exactly(fh, 4)
+                    if size_bytes is None:
+                        break
+                    (size,) = struct.unpack("<I", size_bytes)
+                    data_bytes = _read_exactly(fh, size)
+                    if data_bytes is None:
+                        break
+                    data = json.loads(data_bytes.decode("utf-8"))
+
+                    pose = ObjectPose()
+                    pose.position = np.array(data["position"])
+                    pose.orientation = np.array(data["orientation"])
+                    pose.timestamp = data["timestamp"]
+                    pose.confidence = data["confidence"]
+                    log.final_object_pose = {"t": data["t"], "pose": pose}
+
+                else:
+                    raise ValueError(
+                        "Invalid block {!r} in action log file.".format(tag)
+                    )
+
+        return log
+
+    def _read_chunk(self, fh, version):
+        """Read the data of a chunk.  Returns None if it is incomplete."""
+        size_bytes = _read_exactly(fh, 4)
+        if size_bytes is None:
+            return None
+        (n_steps,) = struct.unpack("<I", size_bytes)
+
+        if version == 1:
+            columns = _COLUMNS_V1
+            chunk = {
+                name: np.full((n_steps,) + shape, np.nan, dtype=dtype)
+                for name, (dtype, shape) in self._layout.items()
+                if name not in columns
+            }
+        else:
+            columns = COLUMNS
+            chunk = {}
+
+        for name in columns:
+            dtype, shape = self._layout[name]
+            count = n_steps * int(np.prod(shape))
+            data = _read_exactly(fh, count * dtype.itemsize)
+            if data is None:
+                return None
+            chunk[name] = np.frombuffer(data, dtype=dtype).reshape(
+                (n_steps,) + shape
+            )
+
+        return chunk
+
+
+def load_action_log(filename):
+    """Load an action log file.
+
+    Supports both the binary format written by :meth:`ActionLog.write` and
+    pickle files of the old log format.  The latter do not contain the key
+    "deterministic_overlapping_pairs" since they were always recorded
+    without it.
+
+    Args:
+        filename (str): Path to the log file.
+
+    Returns:
+        dict: The log in the format of the old action log (see
+        :meth:`ActionLog.to_dict`).
+    """
+    with open(filename, "rb") as fh:
+        is_binary_log = fh.read(len(MAGIC)) == MAGIC
+
+    if is_binary_log:
+        return ActionLog.read(filename).to_dict()
+    else:
+        with open(filename, "rb") as fh:
+            return pickle.load(fh)
@@ -4,6 +4,136 @@ import numpy as np
 import pybullet
 from scipy.spatial.transform import Rotation
 
+from .tasks import move_cube
+
+
+#: Names of the channels that can be rendered (see :class:`CameraFrame`).
+CHANNELS = ("rgb", "depth", "segmentation", "bayer")
+
+
+def _check_channels(channels):
+    channels = tuple(channels)
+    for channel in channels:
+        if channel not in CHANNELS:
+            raise ValueError(
+                "Invalid channel '{}'.  Valid channels are {}".format(
+                    channel, CHANNELS
+                )
+            )
+    return channels
+
+
+class CameraFrame:
+    """Channels of an image rendered by :meth:`Camera.render`.
+
+    Only the requested channels are available, the others are None.  The
+    buffers returned by pyBullet are only converted when the corresponding
+    attribute is accessed for the first time.
+    """
+
+    def __init__(
+        self,
+        channels,
+        width,
+        height,
+        rgba_buffer,
+        depth_buffer,
+        segmentation_buffer,
+        near_plane_distance,
+        far_plane_distance,
+        read_only=False,
+    ):
+        self.channels = channels
+        self._shape = (height, width)
+        self._buffers = {
+            "rgba": rgba_buffer,
+            "depth": depth_buffer,
+            "segmentation": segmentation_buffer,
+        }
+        self._near = near_plane_distance
+        self._far = far_plane_distance
+        self._read_only = read_only
+        self._converted = {}
+
+    def __getstate__(self):
+        # only transfer the requested channels, not the raw buffers
+        for channel in self.channels:
+            getattr(self, channel)
+        state = dict(self.__dict__)
+        state["_buffers"] = None
+        return state
+
+    def _get(self, channel, convert):
+        if channel not in self.channels:
+            return None
+        if channel not in self._converted:
+            array = convert()
+            if self._read_only:
+                array.flags.writeable = False
+            self._converted[channel] = array
+        return self._converted[channel]
+
+    @property
+    def rgb(self) -> typing.Optional[np.ndarray]:
+        """(array, shape=(height, width, 3)): RGB image."""
+        return self._get("rgb", self._convert_rgb)
+
+    @property
+    def depth(self) -> typing.Optional[np.ndarray]:
+        """(array, shape=(height, width)): Depth in meters.
+
+        This is the distance of the rendered surface to the image plane of
+        the camera.
+        """
+        return self._get("depth", self._convert_depth)
+
+    @property
+    def segmentation(self) -> typing.Optional[np.ndarray]:
+        """(array, shape=(height, width)): Segmentation mask.
+
+        Contains the unique id of the body that is visible in each pixel (see
+        the documentation of ``pybullet.getCameraImage``) or -1 for the
+        background.
+        """
+        return self._get("segmentation", self._convert_segmentation)
+
+    @property
+    def bayer(self) -> typing.Optional[np.ndarray]:
+        """(array, shape=(height, width, 1)): BG-Bayer pattern.
+
+        See :func:`rbg_to_bayer_bg`.
+        """
+        return self._get("bayer", self._convert_bayer)
+
+    def _convert_rgb(self):
+        rgba = np.reshape(
+            np.asarray(self._buffers["rgba"], dtype=np.uint8),
+            self._shape + (4,),
+        )
+        # remove the alpha channel
+        return rgba[:, :, :3]
+
+    def _convert_depth(self):
+        depth_buffer = np.reshape(
+            np.asarray(self._buffers["depth"], dtype=np.float32), self._shape
+        )
+        # convert the non-linear OpenGL depth buffer values to metric depth
+        near, far = self._near, self._far
+        return far * near / (far - (far - near) * depth_buffer)
+
+    def _convert_segmentation(self):
+        return np.reshape(
+            np.asarray(self._buffers["segmentation"], dtype=np.int32),
+            self._shape,
+        )
+
+    def _convert_bayer(self):
+        rgba = np.reshape(
+            np.asarray(self._buffers["rgba"], dtype=np.uint8),
+            self._shape + (4,),
+        )
+        return rbg_to_bayer_bg(rgba)
+
 
 class Camera(object):
     """Represents a camera in the simulation environment."""
@@ -17,6 +147,7 @@ class Camera(object):
         near_plane_distance=0.001,
         far_plane_distance=100.0,
         pybullet_client=pybullet,
+        roi=None,
         **kwargs,
     ):
         """Initialize.
@@ -35,11 +166,17 @@ class Camera(object):
             far_plane_distance: see OpenGL's documentation for details
             target_position: where should the camera be pointed at
             camera_up_vector: the up axis of the camera
+            roi:  Region of interest (x, y, width, height) in pixels of the
+                image of size ``image_size``.  If set, only this part of the
+                image is rendered (the resulting images have the size of the
+                region of interest).
         """
         self._kwargs = kwargs
         self._pybullet_client = pybullet_client
         self._width = image_size[0]
         self._height = image_size[1]
+        self._near = near_plane_distance
+        self._far = far_plane_distance
 
         camera_rot = Rotation.from_quat(camera_orientation)
         target_position = camera_rot.apply([0, 0, 1])
@@ -60,6 +197,87 @@ class Camera(object):
             **self._kwargs,
         )
 
+        if roi is not None:
+            self._set_roi(roi)
+
+    def _set_roi(self, roi):
+        """Restrict the rendered image to the given region of interest.
+
+        The projection matrix is modified such that the region of interest
+        covers the whole normalized device coordinate range, so only the
+        pixels inside of it are rendered.
+        """
+        x, y, width, height = roi
+        if (
+            x < 0
+            or y < 0
+            or width <= 0
+            or height <= 0
+            or x + width > self._width
+            or y + height > self._height
+        ):
+            raise ValueError(
+                "Region of interest {} is not inside of the image of size"
+                " {}".format(roi, (self._width, self._height))
+            )
+
+        # map the ROI in normalized device coordinates to [-1, 1]
+        crop = np.array(
+            [
+                [
+                    self._width / width,
+                    0,
+                    0,
+                    (self._width - 2 * x - width) / width,
+                ],
+                [
+                    0,
+                    self._height / height,
+                    0,
+                    (height - self._height + 2 * y) / height,
+                ],
+                [0, 0, 1, 0],
+                [0, 0, 0, 1],
+            ]
+        )
+        projection = np.reshape(self._proj_matrix, (4, 4)).T
+        # pyBullet expects a flat list in column-major order
+        self._proj_matrix = tuple((crop @ projection).T.flatten())
+        self._width = width
+        self._height = height
+
+    @property
+    def projection_matrix(self) -> np.ndarray:
+        """Matrix (4x4) that maps world coordinates to clip coordinates.
+
+        This is the product of the projection and the view matrix of the
+        camera.
+        """
+        # pyBullet matrices are stored in column-major order
+        view = np.reshape(self._view_matrix, (4, 4)).T
+        projection = np.reshape(self._proj_matrix, (4, 4)).T
+        return projection @ view
+
+    def project_points(
+        self, points: np.ndarray
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Project points into the image of the camera.
+
+        This is done analytically, i.e. without rendering anything.  See
+        :func:`project_points` for details.
+
+        Args:
+            points (array, shape=(..., N, 3)): Points in world coordinates.
+
+        Returns:
+            Tuple (pixels, visible) with arrays of shapes (..., N, 2) and
+            (..., N).
+        """
+        pixels, visible = project_points(
+            [self.projection_matrix], (self._width, self._height), points
+        )
+        return pixels[0], visible[0]
+
     def get_image(
         self, renderer=pybullet.ER_BULLET_HARDWARE_OPENGL
     ) -> np.ndarray:
@@ -76,41 +294,144 @@ class Camera(object):
             (array, shape=(height, width, 3)):  Rendered RGB image from the
                 simulated camera.
         """
-        (_, _, img, _, _) = self._pybullet_client.getCameraImage(
-            width=self._width,
-            height=self._height,
-            viewMatrix=self._view_matrix,
-            projectionMatrix=self._proj_matrix,
-            renderer=renderer,
-            **self._kwargs,
+        return self.render(("rgb",), renderer).rgb
+
+    def render(
+        self,
+        channels=("rgb",),
+        renderer=pybullet.ER_BULLET_HARDWARE_OPENGL,
+        read_only=False,
+    ) -> CameraFrame:
+        """Render the given channels of the camera image.
+
+        Args:
+            channels:  Names of the channels that are needed (see
+                :data:`CHANNELS`).  Computation of the segmentation mask is
+                skipped if it is not requested.
+            renderer:  See :meth:`get_image`.
+            read_only:  If true, the arrays of the returned frame are set
+                read-only.
+
+        Returns:
+            The rendered frame.  Only the requested channels are set.
+        """
+        channels = _check_channels(channels)
+
+        kwargs = dict(self._kwargs)
+        if "segmentation" not in channels:
+            kwargs["flags"] = (
+                kwargs.get("flags", 0) | pybullet.ER_NO_SEGMENTATION_MASK
+            )
+
+        (_, _, rgba, depth, segmentation) = (
+            self._pybullet_client.getCameraImage(
+                width=self._width,
+                height=self._height,
+                viewMatrix=self._view_matrix,
+                projectionMatrix=self._proj_matrix,
+                renderer=renderer,
+                **kwargs,
+            )
+        )
+
+        return CameraFrame(
+            channels,
+            self._width,
+            self._height,
+            rgba,
+            depth,
+            segmentation,
+            self._near,
+            self._far,
+            read_only=read_only,
         )
-        # remove the alpha channel
-        return img[:, :, :3]
 
 
 class TriFingerCameras:
-    """Simulate the three cameras of the TriFinger platform."""
+    """Simulate the three cameras of the TriFinger platform.
 
-    def __init__(self, **kwargs):
-        self.cameras = [
+    Optionally, the rendered images can be cached:  If :attr:`cache_tolerance`
+    is set, the state of the scene (base poses and joint positions of all
+    bodies in the simulation) is stored together with the images.  When images
+    are requested again and no value of the state changed by more than the
+    tolerance, the cached images are returned instead of rendering new ones.
+    This saves a lot of time when the scene is static (e.g. while waiting for
+    the robot to settle).  Note that changes that do not affect the poses
+    (e.g. of the color of an object) are not detected.
+
+    Besides RGB images, depth images, segmentation masks and Bayer patterns
+    can be rendered (see :meth:`render`).  Only the requested channels are
+    converted to arrays.
+    """
+
+    def __init__(
+        self,
+        cache_tolerance=None,
+        channels=("rgb",),
+        image_sizes=None,
+        rois=None,
+        **kwargs,
+    ):
+        """Initialize.
+
+        Args:
+            cache_tolerance (float):  Initial value of
+                :attr:`cache_tolerance`.
+            channels:  Channels that are rendered by :meth:`render` (see
+                :data:`CHANNELS`).
+            image_sizes:  Optional list with the image size (width, height)
+                of each camera.  Overwrites ``image_size`` of ``kwargs``.
+            rois:  Optional list with the region of interest of each camera
+                (see :class:`Camera`).  Entries can be None to render the
+                full image of a camera.
+            kwargs:  Keyword arguments that are passed to :class:`Camera`.
+        """
+        #: Channels that are rendered by :meth:`render` if no channels are
+        #: specified there.
+        self.channels = _check_channels(channels)
+        #: Maximum change of any value of the scene state (positions in
+        #: meters, quaternion components and joint angles in radian) for which
+        #: cached images are returned.  Set to 0 to only use the cache if the
+        #: scene is exactly the same.  Set to None to disable the cache.
+        self.cache_tolerance = cache_tolerance
+        #: Number of times cached images were returned.
+        self.cache_hits = 0
+        #: Number of times images were rendered while the cache was enabled.
+        self.cache_misses = 0
+
+        self._pybullet_client = kwargs.get("pybullet_client", pybullet)
+        self._client_kwargs = {}
+        if "physicsClientId" in kwargs:
+            self._client_kwargs["physicsClientId"] = kwargs["physicsClientId"]
+        # tuple (body_ids, state, frames) of the last rendered frames
+        self._cache = None
+
+        poses = [
             # camera60
-            Camera(
-                camera_position=[0.2496, 0.2458, 0.4190],
-                camera_orientation=[0.3760, 0.8690, -0.2918, -0.1354],
-                **kwargs,
-            ),
+            ([0.2496, 0.2458, 0.4190], [0.3760, 0.8690, -0.2918, -0.1354]),
             # camera180
-            Camera(
-                camera_position=[0.0047, -0.2834, 0.4558],
-                camera_orientation=[0.9655, -0.0098, -0.0065, -0.2603],
-                **kwargs,
-            ),
+            ([0.0047, -0.2834, 0.4558], [0.9655, -0.0098, -0.0065, -0.2603]),
             # camera300
+            ([-0.2470, 0.2513, 0.3943], [-0.3633, 0.8686, -0.3141, 0.1220]),
+        ]
+        if image_sizes is None:
+            image_sizes = [kwargs.pop("image_size", (270, 270))] * len(poses)
+        else:
+            kwargs.pop("image_size", None)
+        if rois is None:
+            rois = [None] * len(poses)
+
+        self.cameras = [
             Camera(
-                camera_position=[-0.2470, 0.2513, 0.3943],
-                camera_orientation=[-0.3633, 0.8686, -0.3141, 0.1220],
+                camera_position=position,
+                camera_orientation=orientation,
+                image_size=image_size,
+                roi=roi,
                 **kwargs,
-            ),
+            )
+            for (position, orientation), image_size, roi in zip(
+                poses, image_sizes, rois
+            )
         ]
 
     def get_images(self) -> typing.List[np.ndarray]:
@@ -120,18 +441,238 @@ class TriFingerCameras:
             List of RGB images, one per camera.  Order is [camera60, camera180,
             camera300].  See Camera.get_image() for details.
         """
-        return [c.get_image() for c in self.cameras]
+        return [frame.rgb for frame in self.render(("rgb",))]
+
+    def render(self, channels=None) -> typing.List[CameraFrame]:
+        """Render the given channels of all cameras.
+
+        Computation of the segmentation mask is skipped in pyBullet if it is
+        not requested and the other buffers are only converted to arrays when
+        they are accessed (see :class:`CameraFrame`).
+
+        Args:
+            channels:  Names of the channels that are needed (see
+                :data:`CHANNELS`).  Defaults to :attr:`channels`.
+
+        Returns:
+            List of frames, one per camera (in the same order as in
+            :meth:`get_images`).
+        """
+        if channels is None:
+            channels = self.channels
+        channels = _check_channels(channels)
+
+        if self.cache_tolerance is None:
+            return [c.render(channels) for c in self.cameras]
+
+        body_ids, state = self._get_scene_state()
+        if self._cache is not None:
+            cached_body_ids, cached_state, cached_frames = self._cache
+            if (
+                body_ids == cached_body_ids
+                and set(channels) <= set(cached_frames[0].channels)
+                and np.all(
+                    np.abs(state - cached_state) <= self.cache_tolerance
+                )
+            ):
+                self.cache_hits += 1
+                return list(cached_frames)
+
+        self.cache_misses += 1
+        # the arrays are shared by all calls that hit the cache, so make sure
+        # they are not modified
+        frames = [c.render(channels, read_only=True) for c in self.cameras]
+        self._cache = (body_ids, state, frames)
+
+        return list(frames)
+
+    def project_points(
+        self, points: np.ndarray
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Project points into the images of all cameras.
+
+        This is done analytically, i.e. without rendering anything.  See
+        :func:`project_points` for details.
+
+        Args:
+            points (array, shape=(..., N, 3)): Points in world coordinates,
+                e.g. with an additional leading dimension for multiple time
+                steps.
+
+        Returns:
+            Tuple (pixels, visible) with arrays of shapes (3, ..., N, 2) and
+            (3, ..., N).  The first dimension corresponds to the cameras (in
+            the same order as in :meth:`get_images`).
+        """
+        image_sizes = {(c._width, c._height) for c in self.cameras}
+        if len(image_sizes) == 1:
+            return project_points(
+                [c.projection_matrix for c in self.cameras],
+                image_sizes.pop(),
+                points,
+            )
+
+        pixels, visible = zip(
+            *(c.project_points(points) for c in self.cameras)
+        )
+        return np.stack(pixels), np.stack(visible)
+
+    def project_keypoints(
+        self, object_position, object_orientation, tip_positions
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Project the corners of the cube and the finger tips into the images.
+
+        This can be used to get observations of 2D keypoints without
+        rendering images.
+
+        Args:
+            object_position (array, shape=(..., 3)): Position of the cube.
+            object_orientation (array, shape=(..., 4)): Orientation of the
+                cube as quaternion (x, y, z, w).
+            tip_positions (array, shape=(..., n_tips, 3)): Positions of the
+                finger tips, e.g. computed with ``forward_kinematics_batch``
+                of :class:`~trifinger_simulation.pinocchio_utils.Kinematics`.
+
+        Returns:
+            Tuple (pixels, visible) as returned by :meth:`project_points` for
+            the points ``[corner_0, ..., corner_7, tip_0, ...]``, i.e. arrays
+            of shapes (3, ..., 8 + n_tips, 2) and (3, ..., 8 + n_tips).  The
+            corners are in the order of
+            :func:`.move_cube.get_cube_corner_positions`.
+        """
+        object_position = np.asarray(object_position, dtype=float)
+        object_orientation = np.asarray(object_orientation, dtype=float)
+        batch_shape = object_position.shape[:-1]
+
+        corners = move_cube.get_cube_corner_positions(
+            move_cube.Pose(
+                object_position.reshape(-1, 3),
+                object_orientation.reshape(-1, 4),
+            )
+        ).reshape(batch_shape + (8, 3))
+        points = np.concatenate(
+            [corners, np.asarray(tip_positions, dtype=float)], axis=-2
+        )
+
+        return self.project_points(points)
+
+    def clear_cache(self):
+        """Discard the cached images, so the next call renders new ones."""
+        self._cache = None
+
+    def _get_scene_state(self):
+        """Get the state of all bodies in the simulation.
+
+        Returns:
+            Tuple (body_ids, state) with the ids of the bodies and an array
+            with their base poses and joint positions.
+        """
+        client = self._pybullet_client
+        n_bodies = client.getNumBodies(**self._client_kwargs)
+        body_ids = tuple(
+            client.getBodyUniqueId(i, **self._client_kwargs)
+            for i in range(n_bodies)
+        )
 
-    def get_bayer_images(self) -> typing.List[np.ndarray]:
+        state = []
+        for body_id in body_ids:
+            position, orientation = client.getBasePositionAndOrientation(
+                body_id, **self._client_kwargs
+            )
+            state.extend(position)
+            state.extend(orientation)
+
+            n_joints = client.getNumJoints(body_id, **self._client_kwargs)
+            if n_joints > 0:
+                joint_states = client.getJointStates(
+                    body_id, range(n_joints), **self._client_kwargs
+                )
+                state.extend(joint_state[0] for joint_state in joint_states)
+
+        return body_ids, np.array(state)
+
+    def get_bayer_images(
+        self, out: typing.Optional[typing.Sequence[np.ndarray]] = None
+    ) -> typing.List[np.ndarray]:
         """Get Bayer images.
 
         Same as get_images() but returning the images as BG-Bayer patterns
-        instead of RGB.
+        instead of RGB.  If the cache is enabled, the Bayer images are
+        computed from the cached RGB images.
+
+        Args:
+            out:  Optional list of arrays (one per camera) into which the
+                Bayer images are written.  See :func:`rbg_to_bayer_bg`.
         """
-        return [rbg_to_bayer_bg(c.get_image()) for c in self.cameras]
+        if out is None:
+            out = [None] * len(self.cameras)
+        elif len(out) != len(self.cameras):
+            raise ValueError(
+                "Expected {} output arrays but got {}".format(
+                    len(self.cameras), len(out)
+                )
+            )
+
+        return [
+            rbg_to_bayer_bg(image, out=o)
+            for image, o in zip(self.get_images(), out)
+        ]
+
+
+def project_points(
+    projection_matrices: typing.Sequence[np.ndarray],
+    image_size: typing.Tuple[int, int],
+    points: np.ndarray,
+) -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Project points into the images of multiple cameras.
+
+    The pixel coordinates are given as (x, y) with x pointing right and y
+    pointing down, with the origin in the top left corner of the image.  The
+    pixel in row r and column c of the image covers the area
+    ``[c, c + 1) x [r, r + 1)``, so its center is at (c + 0.5, r + 0.5).
+
+    A point is considered as visible if it is in front of the camera and
+    within its field of view and clipping planes.  Occlusions are not
+    considered.
+
+    Args:
+        projection_matrices: For each camera a 4x4 matrix mapping world
+            coordinates to clip coordinates (see
+            :attr:`Camera.projection_matrix`).
+        image_size: Size (width, height) of the images.
+        points (array, shape=(..., N, 3)): Points in world coordinates.
 
+    Returns:
+        Tuple (pixels, visible) with the pixel coordinates of the points in
+        each camera (array of shape (n_cameras, ..., N, 2)) and a boolean
+        array of shape (n_cameras, ..., N) indicating if the point is visible
+        in the camera.
+    """
+    points = np.asarray(points, dtype=float)
+    matrices = np.asarray(projection_matrices, dtype=float)
+    width, height = image_size
+
+    # clip coordinates of all points in all cameras
+    homogeneous_points = np.concatenate(
+        [points, np.ones(points.shape[:-1] + (1,))], axis=-1
+    )
+    clip = np.einsum("cij,...j->c...i", matrices, homogeneous_points)
+    w = clip[..., 3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndc = clip[..., :3] / w[..., np.newaxis]
+
+    pixels = np.empty(ndc.shape[:-1] + (2,))
+    pixels[..., 0] = (ndc[..., 0] + 1) / 2 * width
+    pixels[..., 1] = (1 - ndc[..., 1]) / 2 * height
+
+    visible = (w > 0) & np.all(np.abs(ndc) <= 1, axis=-1)
 
-def rbg_to_bayer_bg(image: np.ndarray) -> np.ndarray:
+    return pixels, visible
+
+
+def rbg_to_bayer_bg(
+    image: np.ndarray, out: typing.Optional[np.ndarray] = None
+) -> np.ndarray:
     """Convert an rgb image to a BG Bayer pattern.
 
     This can be used to generate simulated raw camera data in Bayer format.
@@ -141,36 +682,41 @@ def rbg_to_bayer_bg(image: np.ndarray) -> np.ndarray:
 
     Args:
         image: RGB image.
+        out: Optional array of shape (height, width, 1) and dtype uint8 into
+            which the result is written.  Use this to avoid allocating a new
+            array for every image.
 
     Returns:
         Bayer pattern based on the input image.  Height and width are the same
         as of the input image.  The image can be converted using OpenCV's
-        `COLOR_BAYER_BG2*`.
+        `COLOR_BAYER_BG2*`.  If out is given, it is returned.
     """
     # there is only one channel but it still needs the third dimension, so that
     # the conversion to a cv::Mat in C++ is easier
-    bayer_img = np.zeros((image.shape[0], image.shape[1], 1), dtype=np.uint8)
+    shape = (image.shape[0], image.shape[1], 1)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape or out.dtype != np.uint8:
+        raise ValueError(
+            "out needs to have shape {} and dtype uint8 but has shape {} and"
+            " dtype {}".format(shape, out.shape, out.dtype)
+        )
 
     # channel names, assuming input is RGB
     CHANNEL_RED = 0
     CHANNEL_GREEN = 1
     CHANNEL_BLUE = 2
 
-    # channel map to get the following pattern (called "BG" in OpenCV):
+    # take every second pixel of the corresponding channel to get the
+    # following pattern (called "BG" in OpenCV):
     #
     #   RG
     #   GB
     #
-    channel_map = {
-        (0, 0): CHANNEL_RED,
-        (1, 0): CHANNEL_GREEN,
-        (0, 1): CHANNEL_GREEN,
-        (1, 1): CHANNEL_BLUE,
-    }
-
-    for r in range(image.shape[0]):
-        for c in range(image.shape[1]):
-            channel = channel_map[(r % 2, c % 2)]
-            bayer_img[r, c] = image[r, c, channel]
-
-    return bayer_img
+    bayer = out[:, :, 0]
+    bayer[0::2, 0::2] = image[0::2, 0::2, CHANNEL_RED]
+    bayer[1::2, 0::2] = image[1::2, 0::2, CHANNEL_GREEN]
+    bayer[0::2, 1::2] = image[0::2, 1::2, CHANNEL_GREEN]
+    bayer[1::2, 1::2] = image[1::2, 1::2, CHANNEL_BLUE]
+
+    return out
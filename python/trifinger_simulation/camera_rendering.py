@@ -0,0 +1,374 @@
+"""Rendering of camera images in a separate simulation.
+
+:class:`SceneRenderer` rebuilds the scene of a
+:class:`~trifinger_simulation.TriFingerPlatform` (robot, stage and cube) in
+its own pyBullet client and renders the images of the three cameras for given
+states of robot and cube.  No physics is simulated, the bodies are simply
+moved to the given state before rendering.
+
+:class:`AsyncCameraRenderer` runs a :class:`SceneRenderer` in a background
+worker process, so that images can be rendered while the simulation
+continues.
+
+:func:`render_action_log` renders the camera images of an episode afterwards,
+using only the states stored in its action log.
+"""
+import concurrent.futures
+import math
+import multiprocessing
+import os
+import typing
+
+import numpy as np
+
+from . import action_log, camera, collision_objects
+from .sim_finger import SimFinger
+
+
+class SceneRenderer:
+    """Render camera images for given states of the TriFinger platform.
+
+    The robot (including the stage) and the cube are loaded into a new
+    pyBullet client in DIRECT mode.  Other objects that may exist in the
+    simulation of the platform (e.g. goal markers) are not part of the scene.
+    """
+
+    def __init__(self, **camera_kwargs):
+        """Initialize.
+
+        Args:
+            camera_kwargs:  Keyword arguments that are passed to
+                :class:`~trifinger_simulation.camera.TriFingerCameras`, e.g.
+                ``image_size``.
+        """
+        self.simfinger = SimFinger(
+            finger_type="trifingerpro", compute_tip_forces=False
+        )
+        client_id = self.simfinger._pybullet_client_id
+        self.cube = collision_objects.Block(pybullet_client_id=client_id)
+        self.cameras = camera.TriFingerCameras(
+            physicsClientId=client_id, **camera_kwargs
+        )
+
+    def set_state(self, joint_positions, object_position, object_orientation):
+        """Move robot and cube to the given state.
+
+        Args:
+            joint_positions:  Joint positions of the robot.
+            object_position:  Position (x, y, z) of the cube.
+            object_orientation:  Orientation (x, y, z, w) of the cube.
+        """
+        self.simfinger.reset_finger_positions_and_velocities(joint_positions)
+        self.cube.set_state(object_position, object_orientation)
+
+    def render(
+        self, joint_positions, object_position, object_orientation
+    ) -> typing.List[np.ndarray]:
+        """Render the camera images for the given state.
+
+        Args:
+            joint_positions:  Joint positions of the robot.
+            object_position:  Position (x, y, z) of the cube.
+            object_orientation:  Orientation (x, y, z, w) of the cube.
+
+        Returns:
+            List of RGB images, one per camera (see
+            :meth:`~trifinger_simulation.camera.TriFingerCameras.get_images`).
+        """
+        self.set_state(joint_positions, object_position, object_orientation)
+        return self.cameras.get_images()
+
+    def render_frames(
+        self, joint_positions, object_position, object_orientation
+    ) -> typing.List[camera.CameraFrame]:
+        """Render the frames with all configured channels for the given state.
+
+        Same as :meth:`render` but returns the frames of
+        :meth:`~trifinger_simulation.camera.TriFingerCameras.render`.
+        """
+        self.set_state(joint_positions, object_position, object_orientation)
+        return self.cameras.render()
+
+
+# renderer of a render worker process, see _init_render_worker()
+_worker_renderer = None
+
+
+def _init_render_worker(camera_kwargs):
+    global _worker_renderer
+
+    _worker_renderer = SceneRenderer(**camera_kwargs)
+
+
+def _render_in_worker(joint_positions, object_position, object_orientation):
+    # only the requested channels are pickled, see CameraFrame
+    return _worker_renderer.render_frames(
+        joint_positions, object_position, object_orientation
+    )
+
+
+def _render_chunk_in_worker(args):
+    images_file, start, states = args
+
+    images = np.load(images_file, mmap_mode="r+")
+    for i, state in enumerate(zip(*states)):
+        images[start + i] = _worker_renderer.render(*state)
+    images.flush()
+
+    return len(states[0])
+
+
+class AsyncCameraRenderer:
+    """Render camera images in a background worker process.
+
+    The worker process creates a :class:`SceneRenderer` on start-up.  Images
+    for a given state are requested with :meth:`submit`, which returns
+    immediately.  The rendering is done in the worker while the caller
+    continues (e.g. with stepping the simulation) and the images are
+    retrieved from the returned future once they are needed.
+    """
+
+    def __init__(self, context=None, **camera_kwargs):
+        """Initialize.
+
+        Args:
+            context:  The multiprocessing context used to create the worker.
+                Defaults to the default context of :mod:`multiprocessing`.
+            camera_kwargs:  Keyword arguments that are passed to
+                :class:`~trifinger_simulation.camera.TriFingerCameras`.
+        """
+        if context is None:
+            context = multiprocessing.get_context()
+
+        # Note: ProcessPoolExecutor only supports an initializer since Python
+        # 3.7, so use a pool with a single worker instead.
+        self._pool = context.Pool(
+            1, initializer=_init_render_worker, initargs=(camera_kwargs,)
+        )
+        # futures of the requests that are not rendered yet
+        self._pending_futures = set()
+
+    def submit(
+        self, joint_positions, object_position, object_orientation
+    ) -> concurrent.futures.Future:
+        """Request images for the given state.
+
+        The state is copied, so the given arrays may be modified afterwards.
+
+        Args:
+            joint_positions:  Joint positions of the robot.
+            object_position:  Position (x, y, z) of the cube.
+            object_orientation:  Orientation (x, y, z, w) of the cube.
+
+        Returns:
+            Future that resolves to the list of
+            :class:`~trifinger_simulation.camera.CameraFrame`, one per camera.
+        """
+        future = concurrent.futures.Future()
+        self._pending_futures.add(future)
+
+        def set_result(frames):
+            self._pending_futures.discard(future)
+            # the images of a cancelled request are discarded
+            if future.set_running_or_notify_cancel():
+                future.set_result(frames)
+
+        def set_exception(exception):
+            self._pending_futures.discard(future)
+            if future.set_running_or_notify_cancel():
+                future.set_exception(exception)
+
+        self._pool.apply_async(
+            _render_in_worker,
+            (
+                np.array(joint_positions),
+                np.array(object_position),
+                np.array(object_orientation),
+            ),
+            callback=set_result,
+            error_callback=set_exception,
+        )
+
+        return future
+
+    def close(self):
+        """Stop the worker process and wait until it has exited.
+
+        Requests that are not rendered yet are cancelled.  The renderer
+        cannot be used anymore afterwards.
+        """
+        self._pool.terminate()
+        self._pool.join()
+
+        for future in list(self._pending_futures):
+            future.cancel()
+        self._pending_futures.clear()
+
+    def __del__(self):
+        """Clean up."""
+        # the pool does not exist if the initialization failed
+        if hasattr(self, "_pool"):
+            self.close()
+
+
+#: Name of the file with the images in the output of
+#: :func:`render_action_log`.
+IMAGES_FILENAME = "images.npy"
+#: Name of the file with the time indices in the output of
+#: :func:`render_action_log`.
+TIME_INDICES_FILENAME = "time_indices.npy"
+
+
+def render_action_log(
+    logfile,
+    output_dir,
+    rate_fps=10,
+    time_step_s=0.004,
+    n_workers=None,
+    chunk_size=50,
+    context=None,
+    camera_rate_fps=10,
+    **camera_kwargs,
+):
+    """Render the camera images of an episode from its action log.
+
+    The robot and object states stored in the log are rendered with
+    :class:`SceneRenderer`, no physics is simulated.  This way images of an
+    episode can be created afterwards with any rate and resolution, instead of
+    enabling the (slow) cameras while running it.  The frame rate is limited
+    to the camera rate of the recording platform, though (see below).
+
+    The frames are split into chunks that are rendered by a pool of worker
+    processes.  Each worker writes its chunks directly to the output array,
+    which is stored as a single memory-mapped ``.npy`` file, so the images are
+    never held in memory completely.  Note that only the rendering is chunked,
+    the file itself is one contiguous array that can be loaded with
+    ``numpy.load(filename, mmap_mode="r")``.
+
+    Note that the object poses in the log are the ones of the camera
+    observations of :class:`~trifinger_simulation.TriFingerPlatform`, so they
+    are only updated with the camera rate of the platform (10 Hz).  Higher
+    frame rates would only repeat the same states and are therefore not
+    supported.  To not combine the current joint positions with an outdated
+    object pose, each frame is rendered at the camera update that is closest
+    to its time.
+
+    Args:
+        logfile (str): Path to the action log (binary format, see
+            :mod:`~trifinger_simulation.action_log`).
+        output_dir (str): Directory to which the output is written.  It is
+            created if it does not exist.  Contains the files
+            :data:`IMAGES_FILENAME` (array of shape
+            ``(n_frames, 3, height, width, 3)`` with the RGB images of the
+            three cameras per frame) and :data:`TIME_INDICES_FILENAME` (array
+            with the time index of each frame).
+        rate_fps (float): Frame rate in frames per second.  Must not be
+            higher than ``camera_rate_fps``.
+        time_step_s (float): Time step of the simulation in which the log was
+            recorded.
+        n_workers (int): Number of worker processes.  Defaults to the number
+            of CPUs (but not more than the number of chunks).
+        chunk_size (int): Number of frames per chunk.
+        context: The multiprocessing context used to create the workers.
+            Defaults to the default context of :mod:`multiprocessing`.
+        camera_rate_fps (float): Camera rate of the platform with which the
+            log was recorded, i.e. the rate with which object poses are
+            logged.
+        camera_kwargs: Keyword arguments that are passed to
+            :class:`~trifinger_simulation.camera.TriFingerCameras`, e.g.
+            ``image_size=(width, height)``.  All cameras need to have the same
+            image size, so ``image_sizes`` and ``rois`` are not supported.
+
+    Returns:
+        Tuple (images, time_indices) with the images as read-only memory-mapped
+        array and the time indices.
+
+    Raises:
+        ValueError: If ``rate_fps`` is not positive or higher than
+            ``camera_rate_fps`` or if ``image_sizes`` or ``rois`` is given.
+    """
+    if rate_fps <= 0:
+        raise ValueError("Invalid frame rate {} fps.".format(rate_fps))
+    if rate_fps > camera_rate_fps:
+        raise ValueError(
+            "Frame rate {} fps is higher than the camera rate of the log ({}"
+            " fps), with which the object poses are logged.".format(
+                rate_fps, camera_rate_fps
+            )
+        )
+    for name in ("image_sizes", "rois"):
+        if camera_kwargs.get(name) is not None:
+            raise ValueError(
+                "'{}' is not supported, all cameras need to have the same"
+                " image size.".format(name)
+            )
+
+    log = action_log.ActionLog.read(logfile)
+    t = log.get_column("t")
+
+    # steps of the camera updates of TriFingerPlatform, at which the object
+    # pose in the log is updated
+    update_interval = (1.0 / camera_rate_fps) / time_step_s
+    n_updates = math.ceil(len(t) / update_interval)
+    update_indices = np.ceil(np.arange(n_updates) * update_interval)
+    update_indices = update_indices[update_indices < len(t)].astype(int)
+
+    # render each frame at the camera update closest to its time
+    n_frames = math.ceil(len(t) * time_step_s * rate_fps)
+    frame_times_s = np.arange(n_frames) / rate_fps
+    closest_updates = np.floor(frame_times_s * camera_rate_fps + 0.5)
+    closest_updates = np.minimum(closest_updates, len(update_indices) - 1)
+    frame_indices = update_indices[closest_updates.astype(int)]
+
+    joint_positions = log.get_column("robot_position")[frame_indices]
+    object_positions = log.get_column("object_position")[frame_indices]
+    object_orientations = log.get_column("object_orientation")[frame_indices]
+    time_indices = t[frame_indices]
+
+    width, height = camera_kwargs.get("image_size", (270, 270))
+    os.makedirs(output_dir, exist_ok=True)
+    images_file = os.path.join(output_dir, IMAGES_FILENAME)
+    images = np.lib.format.open_memmap(
+        images_file,
+        mode="w+",
+        dtype=np.uint8,
+        shape=(len(frame_indices), 3, height, width, 3),
+    )
+    del images
+    np.save(os.path.join(output_dir, TIME_INDICES_FILENAME), time_indices)
+
+    chunks = [
+        (
+            images_file,
+            start,
+            tuple(
+                states[start : start + chunk_size]
+                for states in (
+                    joint_positions,
+                    object_positions,
+                    object_orientations,
+                )
+            ),
+        )
+        for start in range(0, len(frame_indices), chunk_size)
+    ]
+
+    if chunks:
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        n_workers = min(n_workers, len(chunks))
+
+        if context is None:
+            context = multiprocessing.get_context()
+
+        with context.Pool(
+            n_workers,
+            initializer=_init_render_worker,
+            initargs=(camera_kwargs,),
+        ) as pool:
+            for _ in pool.imap_unordered(
+                _render_chunk_in_worker, chunks, chunksize=1
+            ):
+                pass
+
+    return np.load(images_file, mmap_mode="r"), time_indices
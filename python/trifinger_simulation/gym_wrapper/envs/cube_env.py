@@ -1,7 +1,11 @@
 """Gym environment for the Real Robot Challenge Phase 1 (Simulation)."""
 import enum
+import inspect
+import warnings
 
 import gym
+import numpy as np
+import pybullet
 
 from trifinger_simulation import TriFingerPlatform
 from trifinger_simulation import visual_objects
@@ -19,13 +23,23 @@ class RandomInitializer:
         """
         self.difficulty = difficulty
 
-    def get_initial_state(self):
-        """Get a random initial object pose (always on the ground)."""
-        return move_cube.sample_goal(difficulty=-1)
+    def get_initial_state(self, rng=None):
+        """Get a random initial object pose (always on the ground).
 
-    def get_goal(self):
-        """Get a random goal depending on the difficulty."""
-        return move_cube.sample_goal(difficulty=self.difficulty)
+        Args:
+            rng:  Random number generator used for sampling.  If not set,
+                :data:`move_cube.random` is used.
+        """
+        return move_cube.sample_goal(difficulty=-1, rng=rng)
+
+    def get_goal(self, rng=None):
+        """Get a random goal depending on the difficulty.
+
+        Args:
+            rng:  Random number generator used for sampling.  If not set,
+                :data:`move_cube.random` is used.
+        """
+        return move_cube.sample_goal(difficulty=self.difficulty, rng=rng)
 
 
 class FixedInitializer:
@@ -52,15 +66,53 @@ class FixedInitializer:
         self.initial_state = initial_state
         self.goal = goal
 
-    def get_initial_state(self):
+    def get_initial_state(self, rng=None):
         """Get the initial state that was set in the constructor."""
         return self.initial_state
 
-    def get_goal(self):
+    def get_goal(self, rng=None):
         """Get the goal that was set in the constructor."""
         return self.goal
 
 
+def _accepts_rng(method):
+    """Check if the given method accepts the keyword argument ``rng``."""
+    parameters = inspect.signature(method).parameters.values()
+    return any(
+        p.name == "rng" or p.kind == inspect.Parameter.VAR_KEYWORD
+        for p in parameters
+    )
+
+
+def sample_from_initializer(initializer, rng):
+    """Get initial object pose and goal from the given initializer.
+
+    The random number generator is only passed to initializers whose methods
+    accept the keyword argument ``rng``.  Initializers with the old signature
+    without arguments are still supported but deprecated.
+
+    Args:
+        initializer:  The initializer (see :class:`RandomInitializer`).
+        rng:  Random number generator passed to the initializer.
+
+    Returns:
+        Tuple (initial_object_pose, goal_object_pose).
+    """
+    poses = []
+    for method in (initializer.get_initial_state, initializer.get_goal):
+        if _accepts_rng(method):
+            poses.append(method(rng=rng))
+        else:
+            warnings.warn(
+                "Initializer methods without the argument 'rng' are"
+                " deprecated.",
+                DeprecationWarning,
+            )
+            poses.append(method())
+
+    return tuple(poses)
+
+
 class ActionType(enum.Enum):
     """Different action types that can be used to control the robot."""
 
@@ -89,19 +141,43 @@ class CubeEnv(gym.GoalEnv):
         action_type=ActionType.POSITION,
         frameskip=1,
         visualization=False,
+        reuse_platform=False,
+        compute_tip_forces=True,
     ):
         """Initialize.
 
         Args:
             initializer: Initializer class for providing initial cube pose and
                 goal pose.  See :class:`RandomInitializer` and
-                :class:`FixedInitializer`.
+                :class:`FixedInitializer`.  Its methods
+                ``get_initial_state`` and ``get_goal`` are called with the
+                random number generator of the environment as keyword
+                argument ``rng`` (see :meth:`seed`), which is None if the
+                environment is not seeded.  Methods without this argument
+                are deprecated (see :func:`sample_from_initializer`).
             action_type (ActionType): Specify which type of actions to use.
                 See :class:`ActionType` for details.
             frameskip (int):  Number of actual control steps to be performed in
                 one call of step().
             visualization (bool): If true, the pyBullet GUI is run for
                 visualization.
+            reuse_platform (bool): If true, the simulation is only created in
+                the first call of reset().  Later resets restore the initial
+                state of the existing simulation (see
+                :meth:`TriFingerPlatform.reset`) instead of creating a new
+                one, which is much faster.  For this, the platform is created
+                with ``deterministic_overlapping_pairs``, so every episode is
+                the same as with a new platform with this setting.
+
+                **Important:** This setting is off by default, so the
+                physics differ from an environment without
+                ``reuse_platform``.  Episodes with the same seed and actions
+                may therefore result in different trajectories and rewards
+                than with ``reuse_platform=False``.
+            compute_tip_forces (bool): Set to false to skip the computation
+                of the tip forces in the simulation.  They are not part of the
+                observations of this environment, so this only affects
+                direct use of the platform (see :class:`TriFingerPlatform`).
         """
         # Basic initialization
         # ====================
@@ -109,6 +185,8 @@ class CubeEnv(gym.GoalEnv):
         self.initializer = initializer
         self.action_type = action_type
         self.visualization = visualization
+        self.reuse_platform = reuse_platform
+        self.compute_tip_forces = compute_tip_forces
 
         # TODO: The name "frameskip" makes sense for an atari environment but
         # not really for our scenario.  The name is also misleading as
@@ -121,6 +199,10 @@ class CubeEnv(gym.GoalEnv):
         # will be initialized in reset()
         self.platform = None
 
+        # will be initialized in seed().  If the environment is not seeded,
+        # the module-level generator move_cube.random is used.
+        self.np_random = None
+
         # Create the action and observation spaces
         # ========================================
 
@@ -164,6 +246,12 @@ class CubeEnv(gym.GoalEnv):
     def compute_reward(self, achieved_goal, desired_goal, info):
         """Compute the reward for the given achieved and desired goal.
 
+        The goals can also be batches of goals (e.g. for hindsight experience
+        replay), given as dictionaries with stacked arrays of shape (N, 3)
+        ("position") and (N, 4) ("orientation").  In this case, ``info`` can
+        either be a single info dictionary or a sequence of N of them and the
+        rewards of all goals are computed at once.
+
         Args:
             achieved_goal (dict): Current pose of the object.
             desired_goal (dict): Goal pose of the object.
@@ -172,8 +260,8 @@ class CubeEnv(gym.GoalEnv):
 
         Returns:
             float: The reward that corresponds to the provided achieved goal
-            w.r.t. to the desired goal. Note that the following should always
-            hold true::
+            w.r.t. to the desired goal (array of shape (N,) for batches of
+            goals). Note that the following should always hold true::
 
                 ob, reward, done, info = env.step()
                 assert reward == env.compute_reward(
@@ -182,12 +270,46 @@ class CubeEnv(gym.GoalEnv):
                     info,
                 )
         """
+        if np.ndim(achieved_goal["position"]) == 2:
+            return self._compute_rewards(achieved_goal, desired_goal, info)
+
         return -move_cube.evaluate_state(
             move_cube.Pose.from_dict(desired_goal),
             move_cube.Pose.from_dict(achieved_goal),
             info["difficulty"],
         )
 
+    def _compute_rewards(self, achieved_goal, desired_goal, info):
+        """Batched version of :meth:`compute_reward`."""
+        goal_pose = move_cube.Pose.from_dict(desired_goal)
+        positions = achieved_goal["position"]
+        orientations = achieved_goal["orientation"]
+
+        if isinstance(info, dict):
+            return -move_cube.evaluate_states(
+                goal_pose, positions, orientations, info["difficulty"]
+            )
+
+        # the samples may have different difficulty levels
+        difficulties = np.array([i["difficulty"] for i in info])
+        rewards = np.empty(len(difficulties))
+        goal_positions = np.broadcast_to(
+            goal_pose.position, np.shape(positions)
+        )
+        goal_orientations = np.broadcast_to(
+            goal_pose.orientation, np.shape(orientations)
+        )
+        for difficulty in np.unique(difficulties):
+            mask = difficulties == difficulty
+            rewards[mask] = -move_cube.evaluate_states(
+                move_cube.Pose(goal_positions[mask], goal_orientations[mask]),
+                np.asarray(positions)[mask],
+                np.asarray(orientations)[mask],
+                difficulty,
+            )
+
+        return rewards
+
     def step(self, action):
         """Run one timestep of the environment's dynamics.
 
@@ -251,22 +373,41 @@ class CubeEnv(gym.GoalEnv):
         return observation, reward, is_done, self.info
 
     def reset(self):
-        # reset simulation
-        del self.platform
-
         # initialize simulation
         initial_robot_position = (
             TriFingerPlatform.spaces.robot_position.default
         )
-        initial_object_pose = self.initializer.get_initial_state()
-        goal_object_pose = self.initializer.get_goal()
-
-        self.platform = TriFingerPlatform(
-            visualization=self.visualization,
-            initial_robot_position=initial_robot_position,
-            initial_object_pose=initial_object_pose,
+        initial_object_pose, goal_object_pose = sample_from_initializer(
+            self.initializer, self.np_random
         )
 
+        if self.reuse_platform and self.platform is not None:
+            # the goal marker is not part of the stored initial state of the
+            # platform, so it needs to be removed before restoring it
+            if self.visualization:
+                client_id = self.platform.simfinger._pybullet_client_id
+                pybullet.removeBody(
+                    self.goal_marker.body_id, physicsClientId=client_id
+                )
+
+            self.platform.reset(
+                initial_robot_position=initial_robot_position,
+                initial_object_pose=initial_object_pose,
+            )
+        else:
+            # reset simulation
+            if self.platform is not None:
+                self.platform.close()
+            del self.platform
+
+            self.platform = TriFingerPlatform(
+                visualization=self.visualization,
+                initial_robot_position=initial_robot_position,
+                initial_object_pose=initial_object_pose,
+                deterministic_overlapping_pairs=self.reuse_platform,
+                compute_tip_forces=self.compute_tip_forces,
+            )
+
         self.goal = {
             "position": goal_object_pose.position,
             "orientation": goal_object_pose.orientation,
@@ -290,6 +431,10 @@ class CubeEnv(gym.GoalEnv):
     def seed(self, seed=None):
         """Sets the seed for this env’s random number generator.
 
+        The generator is used for sampling initial states and goals.  It is
+        separate for each environment instance, so multiple environments in
+        one process can be seeded independently.
+
         .. note::
 
            Spaces need to be seeded separately.  E.g. if you want to sample
@@ -302,9 +447,12 @@ class CubeEnv(gym.GoalEnv):
             a single seed, so the list contains only one element.
         """
         self.np_random, seed = gym.utils.seeding.np_random(seed)
-        move_cube.random = self.np_random
         return [seed]
 
+    def close(self):
+        if self.platform is not None:
+            self.platform.close()
+
     def _create_observation(self, t):
         robot_observation = self.platform.get_robot_observation(t)
         camera_observation = self.platform.get_camera_observation(t)
@@ -25,6 +25,7 @@ class TriFingerPush(gym.Env):
         control_rate_s,
         finger_type,
         enable_visualization,
+        compute_tip_forces=True,
     ):
         """Intializes the constituents of the pushing environment.
 
@@ -44,6 +45,9 @@ class TriFingerPush(gym.Env):
                 :meth:`.finger_types_data.get_valid_finger_types`
             enable_visualization (bool): if the simulation env is to be
                 visualized
+            compute_tip_forces (bool): Set to False to skip the computation
+                of the tip forces in the simulation (they are not used by
+                this environment).
         """
 
         #: an instance of the simulated robot depending on the desired
@@ -51,6 +55,7 @@ class TriFingerPush(gym.Env):
         self.finger = SimFinger(
             finger_type=finger_type,
             enable_visualization=enable_visualization,
+            compute_tip_forces=compute_tip_forces,
         )
 
         self.num_fingers = finger_types_data.get_number_of_fingers(finger_type)
@@ -109,6 +114,10 @@ class TriFingerPush(gym.Env):
         #: a logger to enable logging of observations if desired
         self.logger = DataLogger()
 
+        # will be initialized in seed().  If the environment is not seeded,
+        # the global generator of numpy is used.
+        self.np_random = None
+
         #: the object that has to be pushed
         self.block = collision_objects.Block()
 
@@ -244,18 +253,20 @@ class TriFingerPush(gym.Env):
         """
         # resets the finger to a random position
         action = sample.feasible_random_joint_positions_for_reaching(
-            self.finger, self.spaces.action_bounds
+            self.finger, self.spaces.action_bounds, rng=self.np_random
         )
         observation = self.finger.reset_finger_positions_and_velocities(action)
 
         #: the episode target for the agent which is sampled randomly
         #: for each episode
-        self.goal = sample.random_position_in_arena(height_limits=0.0425)
+        self.goal = sample.random_position_in_arena(
+            height_limits=0.0425, rng=self.np_random
+        )
 
         #: the position from which the object is initialized at the
         #: beginning of each episode
         self.block_position = sample.random_position_in_arena(
-            height_limits=0.0425
+            height_limits=0.0425, rng=self.np_random
         )
 
         self.goal_marker.set_state([self.goal])
@@ -268,3 +279,17 @@ class TriFingerPush(gym.Env):
             self._get_state(observation, action, True),
             self.unscaled_observation_space,
         )
+
+    def seed(self, seed=None):
+        """Sets the seed for this env’s random number generator.
+
+        The generator is used for sampling initial joint positions, object
+        positions and goals.  It is separate for each environment instance,
+        so multiple environments in one process can be seeded independently.
+
+        Returns:
+            List of seeds used by this environment.  This environment only uses
+            a single seed, so the list contains only one element.
+        """
+        self.np_random, seed = gym.utils.seeding.np_random(seed)
+        return [seed]
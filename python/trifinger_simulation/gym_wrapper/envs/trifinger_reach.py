@@ -27,6 +27,7 @@ class TriFingerReach(gym.Env):
         use_real_robot=False,
         finger_config_suffix="0",
         synchronize=False,
+        compute_tip_forces=True,
     ):
         """Intializes the constituents of the reaching environment.
 
@@ -66,6 +67,9 @@ class TriFingerReach(gym.Env):
             synchronize (bool): Set this to True if you want to train
                 independently on three fingers in separate processes, but
                 have them synchronized. ([default] False)
+            compute_tip_forces (bool): Set to False to skip the computation
+                of the tip forces in the simulation (they are not used by
+                this environment).  ([default] True)
         """
         #: an instance of a simulated, or a real robot depending on
         #: what is desired.
@@ -82,6 +86,7 @@ class TriFingerReach(gym.Env):
             self.finger = SimFinger(
                 finger_type=finger_type,
                 enable_visualization=enable_visualization,
+                compute_tip_forces=compute_tip_forces,
             )
 
         self.num_fingers = finger_types_data.get_number_of_fingers(finger_type)
@@ -137,6 +142,10 @@ class TriFingerReach(gym.Env):
         #: a logger to enable logging of observations if desired
         self.logger = DataLogger()
 
+        # will be initialized in seed().  If the environment is not seeded,
+        # the global generator of numpy is used.
+        self.np_random = None
+
         # sets up smooothing
         if "is_test" in smoothing_params:
             self.smoothing_start_episode = 0
@@ -182,7 +191,6 @@ class TriFingerReach(gym.Env):
         else:
             self.next_start_time = None
 
-        self.seed()
         self.reset()
 
     def _compute_reward(self, observation, goal):
@@ -341,14 +349,14 @@ class TriFingerReach(gym.Env):
 
         # resets the finger to a random position
         action = sample.feasible_random_joint_positions_for_reaching(
-            self.finger, self.spaces.action_bounds
+            self.finger, self.spaces.action_bounds, rng=self.np_random
         )
         observation = self.finger.reset_finger_positions_and_velocities(action)
 
         # generates a random goal for the next episode
         target_joint_config = np.asarray(
             sample.feasible_random_joint_positions_for_reaching(
-                self.finger, self.spaces.action_bounds
+                self.finger, self.spaces.action_bounds, rng=self.np_random
             )
         )
         self.goal = self.finger.kinematics.forward_kinematics(
@@ -366,6 +374,20 @@ class TriFingerReach(gym.Env):
             self.unscaled_observation_space,
         )
 
+    def seed(self, seed=None):
+        """Sets the seed for this env’s random number generator.
+
+        The generator is used for sampling initial joint positions and goals.
+        It is separate for each environment instance, so multiple
+        environments in one process can be seeded independently.
+
+        Returns:
+            List of seeds used by this environment.  This environment only uses
+            a single seed, so the list contains only one element.
+        """
+        self.np_random, seed = gym.utils.seeding.np_random(seed)
+        return [seed]
+
     def update_smoothing(self):
         """
         Update the smoothing coefficient with which the action to be
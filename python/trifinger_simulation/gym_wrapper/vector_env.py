@@ -0,0 +1,133 @@
+"""Vectorized environment with shared-memory data exchange."""
+import sys
+import traceback
+
+import gym
+from gym.vector.async_vector_env import AsyncState
+from gym.vector.utils import write_to_shared_memory
+
+
+class SharedMemoryVectorEnv(gym.vector.AsyncVectorEnv):
+    """Run multiple environments in parallel worker processes.
+
+    This is gym's ``AsyncVectorEnv`` with shared memory for the observations
+    (i.e. they are not pickled and sent through pipes like in
+    ``SubprocVecEnv`` of stable-baselines), extended by the following:
+
+    Environments that reach the end of an episode are automatically reset
+    inside their worker.  In this case the observation returned by
+    :meth:`step` is the first observation of the new episode and the last
+    observation of the finished episode is provided in the info dictionary
+    of the environment with key "terminal_observation".
+
+    Errors in a worker (including errors when creating the environment) are
+    raised in the main process as ``RuntimeError`` with the traceback of the
+    worker.
+
+    This can be used for any environment with observation and action spaces
+    that are composed of the default gym spaces (e.g. ``CubeEnv`` or the
+    ``ExamplePushingTrainingEnv`` of the examples).
+
+    Example:
+
+    .. code-block:: python
+
+        env = SharedMemoryVectorEnv(
+            [lambda: CubeEnv(RandomInitializer(difficulty=1))] * 4
+        )
+        env.seed(0)
+        observations = env.reset()
+        observations, rewards, dones, infos = env.step(actions)
+    """
+
+    def __init__(self, env_fns, context=None, copy=True):
+        """Initialize.
+
+        Args:
+            env_fns (list of callable): Functions that create the
+                environments (one per worker process).
+            context (str): Start method of the worker processes (e.g.
+                "fork", "forkserver" or "spawn").  If None, the default of
+                the platform is used.
+            copy (bool): If true, :meth:`reset` and :meth:`step` return
+                copies of the observations.  If false, they return views on
+                the shared memory which are overwritten in the next step.
+        """
+        super().__init__(
+            env_fns,
+            shared_memory=True,
+            copy=copy,
+            context=context,
+            worker=_worker,
+        )
+
+    def _raise_if_errors(self, successes):
+        # The replies of all workers are received before checking for errors,
+        # so no call is pending anymore.  AsyncVectorEnv keeps the state in
+        # this case, so close() would wait for the replies again.
+        if not all(successes):
+            self._state = AsyncState.DEFAULT
+        super()._raise_if_errors(successes)
+
+
+def _worker(index, env_fn, pipe, parent_pipe, shared_memory, error_queue):
+    # Same as the shared-memory worker of gym's AsyncVectorEnv but with
+    # "terminal_observation" in the info of the last step of an episode and
+    # errors reported with their traceback.
+    parent_pipe.close()
+
+    env = None
+    try:
+        env = env_fn()
+        observation_space = env.observation_space
+
+        while True:
+            command, data = pipe.recv()
+
+            if command == "reset":
+                observation = env.reset()
+                write_to_shared_memory(
+                    index, observation, shared_memory, observation_space
+                )
+                pipe.send((None, True))
+
+            elif command == "step":
+                observation, reward, done, info = env.step(data)
+                if done:
+                    info = dict(info, terminal_observation=observation)
+                    observation = env.reset()
+
+                write_to_shared_memory(
+                    index, observation, shared_memory, observation_space
+                )
+                pipe.send(((None, reward, done, info), True))
+
+            elif command == "seed":
+                env.seed(data)
+                pipe.send((None, True))
+
+            elif command == "close":
+                pipe.send((None, True))
+                break
+
+            elif command == "_check_observation_space":
+                pipe.send((data == observation_space, True))
+
+            else:
+                raise RuntimeError(
+                    "Received unknown command '{}'.".format(command)
+                )
+    except (KeyboardInterrupt, Exception):
+        error_message = "Error in worker {}:\n{}".format(
+            index, "".join(traceback.format_exception(*sys.exc_info()))
+        )
+        error_queue.put((index, RuntimeError, error_message))
+        if env is None:
+            # The environment could not be created.  Wait for the first
+            # command of the main process (which is sent right after starting
+            # the workers), so that the error is received as its reply.
+            pipe.recv()
+        pipe.send((None, False))
+    finally:
+        if env is not None:
+            env.close()
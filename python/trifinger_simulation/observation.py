@@ -14,7 +14,8 @@ class Observation:
         velocity (array, shape=(n_joints,)):  Joint velocities in rad/s.
         torque (array, shape=(n_joints,)):  Joint torques in Nm.
         tip_force (array, shape=(n_fingers,)):  Measurement of the push sensors
-            on the finger tips.
+            on the finger tips.  None if the computation of tip forces is
+            disabled in the simulation.
     """
 
     def __init__(self):
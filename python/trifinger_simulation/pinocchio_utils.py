@@ -1,7 +1,356 @@
+import hashlib
+import os
+import tempfile
 import typing
+import warnings
 
 import numpy as np
 import pinocchio
+from scipy.spatial import cKDTree
+
+
+def _get_revolute_joint_axis(joint_model) -> np.ndarray:
+    """Get the rotation axis of a revolute joint in the joint frame."""
+    joint = joint_model.extract()
+    name = joint.shortname()
+
+    if name in ("JointModelRX", "JointModelRY", "JointModelRZ"):
+        return np.eye(3)["XYZ".index(name[-1])]
+    elif name == "JointModelRevoluteUnaligned":
+        return np.asarray(joint.axis, dtype=float).reshape(3)
+    else:
+        raise ValueError(
+            "Joint type {} is not supported by the analytical forward"
+            " kinematics.".format(name)
+        )
+
+
+class _AnalyticalKinematics:
+    """Closed-form kinematics of the finger tips in NumPy.
+
+    Each finger is a serial chain of revolute joints.  The offsets and axes of
+    the joints are read from the pinocchio model once.  The tip positions are
+    then computed for all configurations and fingers at once by moving the
+    tip, starting in the frame of the last joint, down the chain: rotate it
+    around the joint axis and transform it to the parent frame with the fixed
+    joint placement.
+
+    By Rodrigues' formula, the rotation by angle q around axis a is
+    ``R(q) = a a^T + cos(q) (I - a a^T) + sin(q) [a]_x``.  Together with the
+    rotation P of the joint placement, the three constant matrices
+    ``P a a^T``, ``P (I - a a^T)`` and ``P [a]_x`` are precomputed per joint,
+    so each step of the chain is a single batched matrix product.
+
+    On the TriFinger robots, the fingers are the same chain, arranged at 0,
+    120 and 240 degrees around the centre.  In pinocchio's model this shows as
+    identical joint placements except for the first joint of each finger,
+    whose placement contains the rotation around the centre.  This rotation is
+    thus applied as the last step of the chain, without any special handling
+    of the finger arrangement.
+
+    :meth:`tip_positions_and_jacobians` additionally provides the Jacobians
+    of the tips w.r.t. the joints of the corresponding finger (used by the
+    inverse kinematics).
+    """
+
+    def __init__(self, robot_model, tip_link_ids: typing.Sequence[int]):
+        """Extract the kinematic chains of the fingers from the model.
+
+        Args:
+            robot_model:  The pinocchio model of the robot.
+            tip_link_ids:  Frame IDs of the finger tips.
+        """
+        q_indices = []
+        matrices = []
+        axes = []
+        rotations = []
+        translations = []
+        tip_offsets = []
+
+        for link_id in tip_link_ids:
+            frame = robot_model.frames[link_id]
+            # "parent" is deprecated in newer versions of pinocchio
+            joint_id = getattr(frame, "parentJoint", None)
+            if joint_id is None:
+                joint_id = frame.parent
+
+            tip_offsets.append(np.asarray(frame.placement.translation))
+
+            # walk the chain from the tip to the root (joint 0 is "universe")
+            chain = []
+            while joint_id > 0:
+                chain.append(joint_id)
+                joint_id = robot_model.parents[joint_id]
+            chain.reverse()
+
+            q_indices.append([robot_model.joints[j].idx_q for j in chain])
+            finger_matrices = []
+            axes.append([])
+            rotations.append([])
+            for j in chain:
+                a = _get_revolute_joint_axis(robot_model.joints[j])
+                axes[-1].append(a)
+                rotations[-1].append(robot_model.jointPlacements[j].rotation)
+                aa = np.outer(a, a)
+                cross = np.array(
+                    [[0, -a[2], a[1]], [a[2], 0, -a[0]], [-a[1], a[0], 0]]
+                )
+                P = robot_model.jointPlacements[j].rotation
+                finger_matrices.append(
+                    np.concatenate([P @ aa, P @ (np.eye(3) - aa), P @ cross])
+                )
+            matrices.append(finger_matrices)
+            translations.append(
+                [robot_model.jointPlacements[j].translation for j in chain]
+            )
+
+        if len(set(len(idx) for idx in q_indices)) != 1:
+            raise ValueError(
+                "Analytical forward kinematics requires all fingers to have"
+                " the same number of joints."
+            )
+
+        # shape (n_fingers, n_finger_joints)
+        self.q_indices = np.array(q_indices)
+        # shape (n_fingers, n_finger_joints, 9, 3), the three matrices stacked
+        self.matrices = np.array(matrices)
+        # shape (n_fingers, n_finger_joints, 3) and (..., 3, 3)
+        self.axes = np.array(axes)
+        self.rotations = np.array(rotations)
+        # shape (n_fingers, n_finger_joints, 3, 1)
+        self.translations = np.array(translations)[..., np.newaxis]
+        # shape (n_fingers, 3, 1)
+        self.tip_offsets = np.array(tip_offsets)[..., np.newaxis]
+
+    def __call__(self, joint_positions: np.ndarray) -> np.ndarray:
+        """Compute the tip positions.
+
+        Args:
+            joint_positions:  Array of shape (N, n_joints).
+
+        Returns:
+            Array of shape (N, n_fingers, 3) with the tip positions.
+        """
+        n = len(joint_positions)
+
+        # (n_fingers, n_finger_joints, 1, N)
+        angles = joint_positions.T[self.q_indices][:, :, np.newaxis]
+        cos = np.cos(angles)
+        sin = np.sin(angles)
+
+        # Positions are stored as (n_fingers, 3, N), so that each step is a
+        # batched matrix product (n_fingers, 9, 3) @ (n_fingers, 3, N).
+        # Start with the tip in the frame of the last joint.
+        v = np.broadcast_to(self.tip_offsets, (len(self.q_indices), 3, n))
+
+        for i in reversed(range(self.q_indices.shape[1])):
+            products = self.matrices[:, i] @ v
+            v = (
+                products[:, 0:3]
+                + cos[:, i] * products[:, 3:6]
+                + sin[:, i] * products[:, 6:9]
+                + self.translations[:, i]
+            )
+
+        return np.ascontiguousarray(v.transpose(2, 0, 1))
+
+    def tip_positions_and_jacobians(
+        self, joint_positions: np.ndarray
+    ) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """Compute the tip positions and their Jacobians.
+
+        Args:
+            joint_positions:  Array of shape (N, n_joints).
+
+        Returns:
+            tuple: Tip positions of shape (N, n_fingers, 3) and Jacobians of
+            shape (N, n_fingers, 3, n_finger_joints).  The Jacobian of a
+            finger only covers the joints of that finger (see
+            :attr:`q_indices`), as the tip does not depend on the other ones.
+        """
+        n = len(joint_positions)
+        n_fingers, n_finger_joints = self.q_indices.shape
+
+        angles = joint_positions[:, self.q_indices]
+        cos = np.cos(angles)[..., np.newaxis, np.newaxis]
+        sin = np.sin(angles)[..., np.newaxis, np.newaxis]
+
+        # go up the chain, keeping track of orientation and origin of the
+        # current joint frame in the world
+        orientation = np.broadcast_to(np.eye(3), (n, n_fingers, 3, 3))
+        origin = np.zeros((n, n_fingers, 3))
+        joint_axes = np.empty((n, n_fingers, n_finger_joints, 3))
+        joint_origins = np.empty((n, n_fingers, n_finger_joints, 3))
+        for i in range(n_finger_joints):
+            origin = origin + np.einsum(
+                "nfij,fj->nfi", orientation, self.translations[:, i, :, 0]
+            )
+            orientation = orientation @ self.rotations[:, i]
+
+            axis = self.axes[:, i]
+            joint_axes[:, :, i] = np.einsum("nfij,fj->nfi", orientation, axis)
+            joint_origins[:, :, i] = origin
+
+            # rotation around the joint axis (Rodrigues' formula)
+            aa = np.einsum("fi,fj->fij", axis, axis)
+            cross = np.cross(axis[:, np.newaxis], np.eye(3)).transpose(0, 2, 1)
+            joint_rotation = (
+                aa + cos[:, :, i] * (np.eye(3) - aa) + sin[:, :, i] * cross
+            )
+            orientation = orientation @ joint_rotation
+
+        tips = origin + np.einsum(
+            "nfij,fj->nfi", orientation, self.tip_offsets[..., 0]
+        )
+
+        # the tip moves with omega x r for rotation omega around a joint
+        jacobians = np.cross(
+            joint_axes, tips[:, :, np.newaxis] - joint_origins
+        ).transpose(0, 1, 3, 2)
+
+        return tips, jacobians
+
+
+def _get_default_cache_dir() -> str:
+    cache_home = os.environ.get(
+        "XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")
+    )
+    return os.path.join(cache_home, "trifinger_simulation")
+
+
+class WarmStartTable:
+    """Table of tip positions and joint configurations to seed the IK.
+
+    For each finger, the joint space within the joint limits of the URDF is
+    sampled on a regular grid and the corresponding tip positions are stored
+    in a KD-tree.  :meth:`query` returns, for given tip targets, the joint
+    configuration whose tip positions are closest to them, which is a good
+    initial guess for the inverse kinematics.
+
+    Since building the table takes a moment, it is cached on disk by
+    :meth:`load_or_build`, keyed by a hash of the URDF file.
+    """
+
+    def __init__(self, kinematics: "Kinematics", resolution: int = 25):
+        """Build the table.
+
+        Args:
+            kinematics:  Kinematics of the robot.
+            resolution:  Number of grid points per joint.
+        """
+        analytical = kinematics._get_analytical_kinematics()
+        lower = kinematics.robot_model.lowerPositionLimit
+        upper = kinematics.robot_model.upperPositionLimit
+        n_fingers, n_finger_joints = analytical.q_indices.shape
+        n_entries = resolution ** n_finger_joints
+
+        #: Number of grid points per joint.
+        self.resolution = resolution
+
+        # (n_fingers, n_entries, n_finger_joints)
+        self.joint_positions = np.empty(
+            (n_fingers, n_entries, n_finger_joints)
+        )
+        q = np.zeros((n_entries, kinematics.robot_model.nq))
+        for f, idx in enumerate(analytical.q_indices):
+            axes = [np.linspace(lower[i], upper[i], resolution) for i in idx]
+            grid = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+            self.joint_positions[f] = grid.reshape(-1, n_finger_joints)
+            q[:, idx] = self.joint_positions[f]
+
+        # (n_fingers, n_entries, 3)
+        self.tip_positions = analytical(q).transpose(1, 0, 2)
+
+        self._init_trees(analytical.q_indices, kinematics.robot_model.nq)
+
+    def _init_trees(self, q_indices, n_joints):
+        self._q_indices = q_indices
+        self._n_joints = n_joints
+        self._trees = [cKDTree(tips) for tips in self.tip_positions]
+
+    @classmethod
+    def load_or_build(
+        cls,
+        kinematics: "Kinematics",
+        resolution: int = 25,
+        cache_dir: typing.Optional[str] = None,
+    ) -> "WarmStartTable":
+        """Load the table from the cache or build and cache it.
+
+        Args:
+            kinematics:  Kinematics of the robot.
+            resolution:  Number of grid points per joint.
+            cache_dir:  Directory of the cache.  Defaults to
+                ``$XDG_CACHE_HOME/trifinger_simulation`` (or
+                ``~/.cache/trifinger_simulation``).
+
+        Returns:
+            The warm-start table.
+        """
+        if cache_dir is None:
+            cache_dir = _get_default_cache_dir()
+
+        # the table depends on the URDF, the tip links and the resolution
+        key = hashlib.sha256()
+        with open(kinematics.finger_urdf_path, "rb") as fh:
+            key.update(fh.read())
+        key.update(repr(list(kinematics.tip_link_ids)).encode())
+        key.update(repr(resolution).encode())
+        cache_file = os.path.join(
+            cache_dir, "ik_warm_start_{}.npz".format(key.hexdigest())
+        )
+
+        analytical = kinematics._get_analytical_kinematics()
+
+        if os.path.exists(cache_file):
+            table = cls.__new__(cls)
+            with np.load(cache_file) as data:
+                table.resolution = int(data["resolution"])
+                table.joint_positions = data["joint_positions"]
+                table.tip_positions = data["tip_positions"]
+            table._init_trees(
+                analytical.q_indices, kinematics.robot_model.nq
+            )
+            return table
+
+        table = cls(kinematics, resolution)
+
+        # write to a temporary file first, so that concurrent processes never
+        # see an incomplete file
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".npz")
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(
+                    fh,
+                    resolution=table.resolution,
+                    joint_positions=table.joint_positions,
+                    tip_positions=table.tip_positions,
+                )
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            warnings.warn(
+                "Failed to cache IK warm-start table: {}".format(e)
+            )
+
+        return table
+
+    def query(self, tip_target_positions: np.ndarray) -> np.ndarray:
+        """Get initial joint configurations for the given tip targets.
+
+        Args:
+            tip_target_positions:  Array of shape (N, n_fingers, 3).
+
+        Returns:
+            Array of shape (N, n_joints) with the joint configuration of the
+            nearest table entry for each finger.
+        """
+        targets = np.asarray(tip_target_positions, dtype=float)
+        q = np.zeros((len(targets), self._n_joints))
+        for f, (tree, idx) in enumerate(zip(self._trees, self._q_indices)):
+            _, nearest = tree.query(targets[:, f])
+            q[:, idx] = self.joint_positions[f][nearest]
+        return q
 
 
 class Kinematics:
@@ -9,17 +358,35 @@ class Kinematics:
 
     Provides forward and inverse kinematics functions for a Finger robot with
     arbitrarily many independent fingers.
+
+    Two backends are available for the forward kinematics:
+
+    - "pinocchio" (default): Uses pinocchio's general forward kinematics.
+    - "numpy": Closed-form forward kinematics of the finger chains in
+      vectorized NumPy.  This is much faster for large batches of
+      configurations (see :meth:`forward_kinematics_batch`).  The results
+      match the ones of pinocchio up to numerical precision.
+
+    The inverse kinematics (:meth:`inverse_kinematics` and
+    :meth:`inverse_kinematics_batch`) always uses the closed-form model of the
+    "numpy" backend.
     """
 
     def __init__(
-        self, finger_urdf_path: str, tip_link_names: typing.Iterable[str]
+        self,
+        finger_urdf_path: str,
+        tip_link_names: typing.Iterable[str],
+        backend: str = "pinocchio",
     ):
         """Initializes the robot model.
 
         Args:
             finger_urdf_path:  Path to the URDF file describing the robot.
             tip_link_names:  Names of the finger tip frames, one per finger.
+            backend:  Backend used for the forward kinematics.  Either
+                "pinocchio" or "numpy".
         """
+        self.finger_urdf_path = finger_urdf_path
         self.robot_model = pinocchio.buildModelFromUrdf(finger_urdf_path)
         self.data = self.robot_model.createData()
         self.tip_link_ids = [
@@ -27,6 +394,42 @@ class Kinematics:
             for link_name in tip_link_names
         ]
 
+        if backend not in ("pinocchio", "numpy"):
+            raise ValueError("Invalid backend '{}'".format(backend))
+        self.backend = backend
+
+        # created on first use, except for the "numpy" backend
+        self._analytical_kinematics = None
+        if backend == "numpy":
+            self._get_analytical_kinematics()
+
+        #: Table for initial guesses of the inverse kinematics, see
+        #: :meth:`enable_warm_start`.
+        self.warm_start_table = None
+
+    def enable_warm_start(
+        self, resolution: int = 25, cache_dir: typing.Optional[str] = None
+    ):
+        """Use a warm-start table for the inverse kinematics.
+
+        Loads (or builds) a :class:`WarmStartTable`, which is then used by
+        :meth:`inverse_kinematics_batch` if no initial guess is given.
+
+        Args:
+            resolution:  See :meth:`WarmStartTable.load_or_build`.
+            cache_dir:  See :meth:`WarmStartTable.load_or_build`.
+        """
+        self.warm_start_table = WarmStartTable.load_or_build(
+            self, resolution, cache_dir
+        )
+
+    def _get_analytical_kinematics(self) -> _AnalyticalKinematics:
+        if self._analytical_kinematics is None:
+            self._analytical_kinematics = _AnalyticalKinematics(
+                self.robot_model, self.tip_link_ids
+            )
+        return self._analytical_kinematics
+
     def forward_kinematics(self, joint_positions) -> typing.List[np.ndarray]:
         """Compute end-effector positions for the given joint configuration.
 
@@ -37,6 +440,10 @@ class Kinematics:
             List of end-effector positions. Each position is given as an
             np.array with x,y,z positions.
         """
+        if self.backend == "numpy":
+            q = np.asarray(joint_positions, dtype=float).reshape(1, -1)
+            return list(self._analytical_kinematics(q)[0])
+
         pinocchio.framesForwardKinematics(
             self.robot_model,
             self.data,
@@ -48,6 +455,47 @@ class Kinematics:
             for link_id in self.tip_link_ids
         ]
 
+    def forward_kinematics_batch(self, joint_positions) -> np.ndarray:
+        """Compute end-effector positions for multiple joint configurations.
+
+        Same as :meth:`forward_kinematics` but for a batch of configurations.
+        With the "pinocchio" backend, the result is written directly to a
+        NumPy array and only the placements of the tip frames are updated,
+        which makes this considerably faster than calling
+        :meth:`forward_kinematics` in a loop.  The "numpy" backend computes all
+        configurations at once.
+
+        Args:
+            joint_positions:  Array of shape (N, n_joints) with one joint
+                configuration per row.
+
+        Returns:
+            Array of shape (N, n_fingers, 3) with the end-effector positions
+            for each configuration.
+        """
+        joint_positions = np.asarray(joint_positions, dtype=float)
+        if joint_positions.ndim != 2:
+            raise ValueError(
+                "Expected array of shape (N, n_joints) but got {}".format(
+                    joint_positions.shape
+                )
+            )
+
+        if self.backend == "numpy":
+            return self._analytical_kinematics(joint_positions)
+
+        tip_positions = np.empty(
+            (len(joint_positions), len(self.tip_link_ids), 3)
+        )
+        for i, q in enumerate(joint_positions):
+            pinocchio.forwardKinematics(self.robot_model, self.data, q)
+            for j, link_id in enumerate(self.tip_link_ids):
+                tip_positions[i, j] = pinocchio.updateFramePlacement(
+                    self.robot_model, self.data, link_id
+                ).translation
+
+        return tip_positions
+
     def _inverse_kinematics_step(
         self, frame_id: int, xdes: np.ndarray, q0: np.ndarray
     ) -> typing.Tuple[np.ndarray, np.ndarray]:
@@ -123,23 +571,147 @@ class Kinematics:
     ) -> typing.Tuple[np.ndarray, typing.List[np.ndarray]]:
         """Inverse kinematics for the whole manipulator.
 
+        Solves all fingers at once with :meth:`inverse_kinematics_batch`.
+
         Args:
             tip_target_positions: List of finger tip target positions, one for
                 each finger.
-            joint_angles_guess: See :meth:`inverse_kinematics_one_finger`.
-            tolerance: See :meth:`inverse_kinematics_one_finger`.
-            max_iterations: See :meth:`inverse_kinematics_one_finger`.
+            joint_angles_guess: Initial guess for the joint angles.
+            tolerance: Position error tolerance.  Stop if the error is less
+                then that.
+            max_iterations: Max. number of iterations.
 
         Returns:
             tuple: First element is the joint configuration, second element is
             a list of (x,y,z)-errors of the tip positions.
         """
-        q = joint_angles_guess
-        errors = []
-        for i, pos in enumerate(tip_target_positions):
-            q, err = self.inverse_kinematics_one_finger(
-                i, pos, q, tolerance, max_iterations
+        q, errors, _ = self.inverse_kinematics_batch(
+            np.asarray(tip_target_positions, dtype=float)[np.newaxis],
+            np.asarray(joint_angles_guess, dtype=float)[np.newaxis],
+            tolerance,
+            max_iterations,
+        )
+
+        return q[0], list(errors[0])
+
+    def inverse_kinematics_batch(
+        self,
+        tip_target_positions: np.ndarray,
+        joint_angles_guess: typing.Optional[np.ndarray] = None,
+        tolerance: float = 0.005,
+        max_iterations: int = 1000,
+        damping: float = 0.01,
+    ) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Inverse kinematics for a batch of targets.
+
+        Uses damped least squares with an adaptive step size on the 3x3
+        Jacobian blocks of the fingers (the tip of a finger only depends on
+        the joints of that finger), so all fingers of all targets are solved
+        at once.  The step size of a finger is doubled (up to a full step)
+        after a step that reduced the error and halved otherwise, in which
+        case the step is discarded.
+
+        Args:
+            tip_target_positions: Array of shape (N, n_fingers, 3) with the
+                tip target positions of all fingers for each of the N
+                targets.
+            joint_angles_guess: Initial guess for the joint angles.  Either
+                one of shape (n_joints,), which is used for all targets, or
+                one per target of shape (N, n_joints).  If not set, the
+                guesses are taken from the warm-start table if it was
+                enabled with :meth:`enable_warm_start`.  Otherwise the
+                centre of the joint limits is used for all targets.
+            tolerance: Position error tolerance.  A finger is not moved
+                anymore once its error is less than that.
+            max_iterations: Max. number of iterations.
+            damping: Damping factor of the least squares solution.  Higher
+                values make the solver more robust close to singularities but
+                slow down convergence.
+
+        Returns:
+            tuple: Joint configurations of shape (N, n_joints), (x,y,z)-errors
+            of the tip positions of shape (N, n_fingers, 3) and the number of
+            iterations needed for each target of shape (N,).  Targets for
+            which the error of any finger is still above ``tolerance`` after
+            ``max_iterations`` (or where the solver got stuck) have
+            ``max_iterations`` iterations.
+        """
+        kinematics = self._get_analytical_kinematics()
+        idx = kinematics.q_indices
+
+        targets = np.asarray(tip_target_positions, dtype=float)
+        if targets.ndim != 3 or targets.shape[1:] != (len(idx), 3):
+            raise ValueError(
+                "Expected targets of shape (N, {}, 3) but got {}".format(
+                    len(idx), targets.shape
+                )
+            )
+        n = len(targets)
+        if joint_angles_guess is None and self.warm_start_table is not None:
+            q = self.warm_start_table.query(targets)
+        else:
+            if joint_angles_guess is None:
+                joint_angles_guess = (
+                    self.robot_model.lowerPositionLimit
+                    + self.robot_model.upperPositionLimit
+                ) / 2
+            q = np.array(
+                np.broadcast_to(joint_angles_guess, (n, self.robot_model.nq)),
+                dtype=float,
             )
-            errors.append(err)
 
-        return q, errors
+        tips, jacobians = kinematics.tip_positions_and_jacobians(q)
+        errors = targets - tips
+        error_norms = np.linalg.norm(errors, axis=-1)
+        step_sizes = np.ones(error_norms.shape)
+        # fingers that still need to be moved
+        active = error_norms >= tolerance
+        iterations = np.zeros(n, dtype=int)
+        damping_matrix = damping ** 2 * np.eye(3)
+
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+            iterations += active.any(axis=1)
+
+            # dq = J^T (J J^T + damping^2 I)^-1 err for each finger
+            jacobians_t = jacobians.swapaxes(-1, -2)
+            dq = (
+                jacobians_t
+                @ np.linalg.solve(
+                    jacobians @ jacobians_t + damping_matrix,
+                    errors[..., np.newaxis],
+                )
+            )[..., 0]
+
+            q_new = q.copy()
+            q_new[:, idx] += (step_sizes * active)[..., np.newaxis] * dq
+            new_tips, new_jacobians = kinematics.tip_positions_and_jacobians(
+                q_new
+            )
+            new_errors = targets - new_tips
+            new_error_norms = np.linalg.norm(new_errors, axis=-1)
+
+            accept = active & (new_error_norms < error_norms)
+            q[:, idx] = np.where(
+                accept[..., np.newaxis], q_new[:, idx], q[:, idx]
+            )
+            jacobians = np.where(
+                accept[..., np.newaxis, np.newaxis], new_jacobians, jacobians
+            )
+            errors = np.where(accept[..., np.newaxis], new_errors, errors)
+            error_norms = np.where(accept, new_error_norms, error_norms)
+
+            step_sizes = np.where(
+                accept,
+                np.minimum(step_sizes * 2, 1.0),
+                np.where(active, step_sizes / 2, step_sizes),
+            )
+            # stop fingers that converged or got stuck (e.g. because the
+            # target is out of reach)
+            active = (error_norms >= tolerance) & (step_sizes > 1e-10)
+
+        # targets that did not converge count as having used all iterations
+        iterations[(error_norms >= tolerance).any(axis=1)] = max_iterations
+
+        return q, errors, iterations
@@ -0,0 +1,293 @@
+"""Replay of action logs.
+
+Functions to replay an action log (as stored by
+:meth:`~trifinger_simulation.TriFingerPlatform.store_action_log`) in
+simulation, verify that the replay matches the log and compute the
+accumulated reward of the episode.
+
+:func:`replay_action_logs` replays multiple logs in parallel.
+"""
+import multiprocessing
+import typing
+
+import numpy as np
+
+from . import action_log, trifinger_platform
+from .tasks import move_cube
+
+
+def replay_action_log(
+    logfile,
+    difficulty,
+    initial_pose,
+    goal_pose,
+    platform=None,
+    episode_length=None,
+):
+    """Replay an action log and compute the accumulated reward.
+
+    The simulation is initialised according to the given initial pose and the
+    logged actions are applied one by one.  In each step it is verified that
+    the observations of the replay match the logged ones and in the end that
+    the final object pose matches the logged one.
+
+    The simulation uses the same ``deterministic_overlapping_pairs`` setting
+    as the one in which the log was recorded (logs in the old pickle format
+    were recorded without it).
+
+    Args:
+        logfile (str): Path to the action log file.
+        difficulty (int): The difficulty level of the goal (for reward
+            computation).
+        initial_pose (move_cube.Pose): Initial pose of the cube.
+        goal_pose (move_cube.Pose): Goal pose of the cube.
+        platform (TriFingerPlatform): If set, this platform is reset and used
+            for the replay instead of creating a new one.  This avoids the
+            cost of setting up a new simulation when replaying many logs.
+            Only a platform with deterministic overlapping pairs behaves
+            exactly like a new one after a reset, so a new platform is still
+            created if the log was recorded without them or if the setting
+            of the platform does not match the log.
+        episode_length (int): Expected number of actions in the log.
+            Defaults to :data:`move_cube.episode_length`.
+
+    Returns:
+        float: The accumulated reward of the replay.
+
+    Raises:
+        AssertionError: If the log does not match the given initial pose or
+            the replay does not match the log.
+    """
+    if episode_length is None:
+        episode_length = move_cube.episode_length
+
+    log = action_log.load_action_log(logfile)
+
+    # verify that the initial object pose matches with the one in the log file
+    np.testing.assert_array_almost_equal(
+        initial_pose.position,
+        log["initial_object_pose"].position,
+        err_msg=(
+            "Given initial object position does not match with log file."
+        ),
+    )
+    np.testing.assert_array_almost_equal(
+        initial_pose.orientation,
+        log["initial_object_pose"].orientation,
+        err_msg=(
+            "Given initial object orientation does not match with log file."
+        ),
+    )
+
+    deterministic_overlapping_pairs = log.get(
+        "deterministic_overlapping_pairs", False
+    )
+    if (
+        platform is None
+        or not deterministic_overlapping_pairs
+        or not platform.deterministic_overlapping_pairs
+    ):
+        platform = trifinger_platform.TriFingerPlatform(
+            visualization=False,
+            initial_object_pose=initial_pose,
+            deterministic_overlapping_pairs=deterministic_overlapping_pairs,
+        )
+    else:
+        platform.reset(initial_object_pose=initial_pose)
+
+    # verify that the robot is initialized to the same position as in the log
+    # file
+    initial_robot_position = platform.get_robot_observation(0).position
+    np.testing.assert_array_almost_equal(
+        initial_robot_position,
+        log["initial_robot_position"],
+        err_msg=("Initial robot position does not match with log file."),
+    )
+
+    # verify that the number of logged actions matches with the episode length
+    n_actions = len(log["actions"])
+    assert (
+        n_actions == episode_length
+    ), "Number of actions in log does not match with expected episode length."
+
+    # the reward is computed for all steps at once in the end
+    cube_positions = np.empty((n_actions, 3))
+    cube_orientations = np.empty((n_actions, 4))
+    for i, logged_action in enumerate(log["actions"]):
+        action = logged_action["action"]
+
+        t = platform.append_desired_action(action)
+
+        robot_obs = platform.get_robot_observation(t)
+        cube_pose = platform.get_object_pose(t)
+        cube_positions[i] = cube_pose.position
+        cube_orientations[i] = cube_pose.orientation
+
+        assert logged_action["t"] == t
+
+        np.testing.assert_array_almost_equal(
+            robot_obs.position,
+            logged_action["robot_observation"].position,
+            err_msg=(
+                "Step %d: Recorded robot position does not match with"
+                " the one achieved by the replay" % t
+            ),
+        )
+        np.testing.assert_array_almost_equal(
+            robot_obs.torque,
+            logged_action["robot_observation"].torque,
+            err_msg=(
+                "Step %d: Recorded robot torque does not match with"
+                " the one achieved by the replay" % t
+            ),
+        )
+        np.testing.assert_array_almost_equal(
+            robot_obs.velocity,
+            logged_action["robot_observation"].velocity,
+            err_msg=(
+                "Step %d: Recorded robot velocity does not match with"
+                " the one achieved by the replay" % t
+            ),
+        )
+
+        np.testing.assert_array_almost_equal(
+            cube_pose.position,
+            logged_action["object_pose"].position,
+            err_msg=(
+                "Step %d: Recorded object position does not match with"
+                " the one achieved by the replay" % t
+            ),
+        )
+        np.testing.assert_array_almost_equal(
+            cube_pose.orientation,
+            logged_action["object_pose"].orientation,
+            err_msg=(
+                "Step %d: Recorded object orientation does not match with"
+                " the one achieved by the replay" % t
+            ),
+        )
+
+    cube_pose = platform.get_object_pose(t)
+    final_pose = log["final_object_pose"]["pose"]
+
+    # verify that actual and logged final object pose match
+    np.testing.assert_array_almost_equal(
+        cube_pose.position,
+        final_pose.position,
+        decimal=3,
+        err_msg=(
+            "Recorded object position does not match with the one"
+            " achieved by the replay"
+        ),
+    )
+    np.testing.assert_array_almost_equal(
+        cube_pose.orientation,
+        final_pose.orientation,
+        decimal=3,
+        err_msg=(
+            "Recorded object orientation does not match with the one"
+            " achieved by the replay"
+        ),
+    )
+
+    costs = move_cube.evaluate_states(
+        goal_pose, cube_positions, cube_orientations, difficulty
+    )
+    # accumulate in step order like the rewards are added up during the
+    # episode (np.sum uses pairwise summation)
+    accumulated_reward = -float(np.cumsum(costs)[-1]) if len(costs) else 0.0
+
+    return accumulated_reward
+
+
+class ReplaySample(typing.NamedTuple):
+    """Arguments for the replay of one action log.
+
+    See :func:`replay_action_log` for the meaning of the fields.
+    """
+
+    logfile: str
+    difficulty: int
+    initial_pose: move_cube.Pose
+    goal_pose: move_cube.Pose
+
+
+# platform of a replay worker process, see _init_replay_worker()
+_worker_platform = None
+_worker_episode_length = None
+
+
+def _init_replay_worker(episode_length):
+    global _worker_platform, _worker_episode_length
+
+    _worker_platform = trifinger_platform.TriFingerPlatform(
+        visualization=False, deterministic_overlapping_pairs=True
+    )
+    _worker_episode_length = episode_length
+
+
+def _replay_in_worker(sample):
+    try:
+        return replay_action_log(
+            sample.logfile,
+            sample.difficulty,
+            sample.initial_pose,
+            sample.goal_pose,
+            platform=_worker_platform,
+            episode_length=_worker_episode_length,
+        )
+    except Exception as e:
+        # AssertionErrors of numpy.testing do not name the file
+        raise RuntimeError(
+            "Replay of {} failed.  Output: {}".format(sample.logfile, e)
+        ) from None
+
+
+def replay_action_logs(
+    samples, n_workers=None, episode_length=None, context=None
+):
+    """Replay multiple action logs in parallel.
+
+    The samples are distributed over a pool of worker processes.  Each worker
+    creates one :class:`~trifinger_simulation.TriFingerPlatform` on start-up
+    and resets it for every sample it replays, so the cost of starting Python,
+    importing the simulation and creating the platform is only paid once per
+    worker instead of once per sample.
+
+    Since a reset platform behaves exactly like a new one, the rewards are
+    the same as when calling :func:`replay_action_log` for each sample.
+
+    Args:
+        samples (Sequence[ReplaySample]): The logs to replay.
+        n_workers (int): Number of worker processes.  Defaults to the number
+            of CPUs (but not more than the number of samples).
+        episode_length (int): See :func:`replay_action_log`.
+        context: The multiprocessing context used to create the workers.
+            Defaults to the default context of :mod:`multiprocessing`.
+
+    Yields:
+        float: The accumulated reward of each sample, in the order of
+        ``samples``.  A reward is yielded as soon as it and all previous ones
+        are available.
+
+    Raises:
+        RuntimeError: If the replay of a sample fails.
+    """
+    samples = [ReplaySample(*sample) for sample in samples]
+    if not samples:
+        return
+
+    if n_workers is None:
+        n_workers = multiprocessing.cpu_count()
+    n_workers = min(n_workers, len(samples))
+
+    if context is None:
+        context = multiprocessing.get_context()
+
+    with context.Pool(
+        n_workers,
+        initializer=_init_replay_worker,
+        initargs=(episode_length,),
+    ) as pool:
+        # samples take long, so hand them out one by one to balance the load
+        yield from pool.imap(_replay_in_worker, samples, chunksize=1)
@@ -1,12 +1,26 @@
 import numpy as np
-import random
 import math
+import weakref
+
+
+#: Joint ranges (of a single finger) from which the candidates of the
+#: "separated" sampling strategy are drawn.
+_SEPARATED_LOW = np.array([-np.pi / 2, np.deg2rad(-77.5), np.deg2rad(-172)])
+_SEPARATED_HIGH = np.array([np.pi / 2, np.deg2rad(257.5), np.deg2rad(-2)])
+
+#: Minimum number of candidates that are drawn and checked at once.
+_SEPARATED_BLOCK_SIZE = 64
+
+#: Accepted samples of the "separated" strategy that were not yet returned,
+#: stored per finger as tuple (rng, bounds_key, samples).
+_separated_sample_pools = weakref.WeakKeyDictionary()
 
 
 def random_position_in_arena(
     height_limits=(0.05, 0.15),
     angle_limits=(-2 * math.pi, 2 * math.pi),
     radius_limits=(0.0, 0.15),
+    rng=None,
 ):
     """
     Set a new position in the arena for the interaction object, which
@@ -18,17 +32,23 @@ def random_position_in_arena(
         angle_limits: the range of angles to sample from
         radius_limits: distance range from the centre of the
             arena at which a sampled point can lie
+        rng: Random number generator (``numpy.random.RandomState`` or
+            ``numpy.random.Generator``).  If not set, the global ``np.random``
+            is used.
 
     Returns:
         The random position of the target set in the arena.
     """
-    angle = random.uniform(*angle_limits)
-    radial_distance = max(radius_limits) * np.sqrt(random.random())
+    if rng is None:
+        rng = np.random
+
+    angle = rng.uniform(*angle_limits)
+    radial_distance = max(radius_limits) * np.sqrt(rng.random())
 
     if isinstance(height_limits, (int, float)):
         height_z = height_limits
     else:
-        height_z = random.uniform(*height_limits)
+        height_z = rng.uniform(*height_limits)
 
     object_position = [
         radial_distance * math.cos(angle),
@@ -43,6 +63,7 @@ def random_joint_positions(
     number_of_fingers,
     lower_bounds=[-math.radians(30), -math.radians(60), -math.radians(100)],
     upper_bounds=[math.radians(30), math.radians(60), math.radians(2)],
+    rng=None,
 ):
     """Sample a random joint configuration for each finger.
 
@@ -53,30 +74,31 @@ def random_joint_positions(
             joint of a single finger.  The same values will be used for all
             fingers if number_of_fingers > 1.  Unit: radian.
         upper_bounds: Upper position bounds of the joints.  See lower_bounds.
+        rng: Random number generator.  See :func:`random_position_in_arena`.
 
     Returns:
         Flat list of joint positions.
     """
-    list_to_return = [
-        random.uniform(lower, upper)
-        for i in range(number_of_fingers)
-        for lower, upper in zip(lower_bounds, upper_bounds)
-    ]
-    return list_to_return
+    if rng is None:
+        rng = np.random
+
+    return rng.uniform(
+        np.tile(lower_bounds, number_of_fingers),
+        np.tile(upper_bounds, number_of_fingers),
+    ).tolist()
 
 
 def feasible_random_joint_positions_for_reaching(
-    finger, action_bounds, sampling_strategy="separated"
+    finger,
+    action_bounds,
+    sampling_strategy="separated",
+    number_of_samples=None,
+    rng=None,
+    use_pool=False,
 ):
     """
     Sample random joint configuration with low risk of collisions.
 
-    In case of only one finger, this just calls
-    random_joint_positions().
-
-    In case of three fingers, the sampling strategy depends on
-    self.sampling_strategy.
-
     Args:
         finger (SimFinger): A SimFinger object
         action_bounds (dict): The limits of the action space used by the
@@ -95,12 +117,30 @@ def feasible_random_joint_positions_for_reaching(
             - "triangle": Samples a position somewhere in the workspace and
                   places the tips of the free fingers around it with fixed
                   distance.
+        number_of_samples (int): If set, this number of configurations is
+            sampled at once.
+        rng: Random number generator.  See :func:`random_position_in_arena`.
+        use_pool (bool): Keep surplus samples of the "separated" strategy for
+            the following calls.  See
+            :func:`sample_separated_joint_positions`.
 
     Returns:
-        Flat list of joint angles.
+        Flat list of joint angles.  If number_of_samples is set, an array of
+        shape ``(number_of_samples, n_joints)`` with one configuration per row
+        is returned instead.
     """
+    if number_of_samples is not None and sampling_strategy != "separated":
+        return np.array(
+            [
+                feasible_random_joint_positions_for_reaching(
+                    finger, action_bounds, sampling_strategy, rng=rng
+                )
+                for _ in range(number_of_samples)
+            ]
+        )
+
     if sampling_strategy == "uniform":
-        return random_joint_positions(finger.number_of_fingers)
+        return random_joint_positions(finger.number_of_fingers, rng=rng)
 
     elif sampling_strategy == "triangle":
         # this sampling strategy is deprecated (for now)
@@ -109,7 +149,7 @@ def feasible_random_joint_positions_for_reaching(
                 "Sampling strategy 'triangle' cannot"
                 " be used with a single finger."
             )
-        random_position = random_position_in_arena()
+        random_position = random_position_in_arena(rng=rng)
         tip_positions = get_tip_positions_around_position(
             finger.number_of_fingers, random_position
         )
@@ -122,36 +162,17 @@ def feasible_random_joint_positions_for_reaching(
         return joint_positions
 
     elif sampling_strategy == "separated":
+        n = 1 if number_of_samples is None else number_of_samples
+        joint_positions = sample_separated_joint_positions(
+            finger,
+            action_bounds,
+            n * finger.number_of_fingers,
+            rng,
+            use_pool=use_pool,
+        ).reshape(n, -1)
 
-        def sample_point_in_angle_limits():
-            while True:
-                joint_pos = np.random.uniform(
-                    low=[-np.pi / 2, np.deg2rad(-77.5), np.deg2rad(-172)],
-                    high=[np.pi / 2, np.deg2rad(257.5), np.deg2rad(-2)],
-                )
-                tip_pos = finger.kinematics.forward_kinematics(
-                    np.concatenate(
-                        [joint_pos for i in range(finger.number_of_fingers)]
-                    ),
-                )[0]
-                dist_to_center = np.linalg.norm(tip_pos[:2])
-                angle = np.arccos(tip_pos[0] / dist_to_center)
-                if (
-                    (np.pi / 6 < angle < 5 / 6 * np.pi)
-                    and (tip_pos[1] > 0)
-                    and (0.02 < dist_to_center < 0.2)
-                    and np.all((action_bounds["low"])[0:3] < joint_pos)
-                    and np.all((action_bounds["high"])[0:3] > joint_pos)
-                ):
-                    return joint_pos
-
-        joint_positions = np.concatenate(
-            [
-                sample_point_in_angle_limits()
-                for i in range(finger.number_of_fingers)
-            ]
-        )
-
+        if number_of_samples is None:
+            return joint_positions[0]
         return joint_positions
 
     else:
@@ -160,6 +181,135 @@ def feasible_random_joint_positions_for_reaching(
         )
 
 
+def _is_separated_sample_feasible(finger, action_bounds, joint_positions):
+    """Check the acceptance conditions of the "separated" strategy.
+
+    Args:
+        finger (SimFinger): A SimFinger object
+        action_bounds (dict): See
+            :func:`feasible_random_joint_positions_for_reaching`.
+        joint_positions (array-like): Candidate joint positions of a single
+            finger, shape (N, 3).
+
+    Returns:
+        Boolean array of shape (N,) that is True for accepted candidates.
+    """
+    # the candidates are evaluated for the first finger (all fingers use the
+    # same joint positions here, only the tip of the first one is used)
+    tip_positions = finger.kinematics.forward_kinematics_batch(
+        np.tile(joint_positions, (1, finger.number_of_fingers))
+    )[:, 0]
+
+    dist_to_center = np.linalg.norm(tip_positions[:, :2], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        angle = np.arccos(tip_positions[:, 0] / dist_to_center)
+
+    return (
+        (np.pi / 6 < angle)
+        & (angle < 5 / 6 * np.pi)
+        & (tip_positions[:, 1] > 0)
+        & (0.02 < dist_to_center)
+        & (dist_to_center < 0.2)
+        & np.all(np.asarray(action_bounds["low"])[0:3] < joint_positions, 1)
+        & np.all(np.asarray(action_bounds["high"])[0:3] > joint_positions, 1)
+    )
+
+
+def sample_separated_joint_positions(
+    finger, action_bounds, n, rng=None, use_pool=False
+):
+    """Sample joint positions of single fingers for the "separated" strategy.
+
+    Candidates are drawn in blocks and checked all at once using the batched
+    forward kinematics.
+
+    Optionally, accepted samples that are not needed for the current call are
+    kept in a small pool (per finger and generator) and returned by the
+    following calls.  This saves time when drawing few samples per call, but
+    the result of a call then depends on the previous calls, so re-seeding
+    the generator does not reproduce the samples.  Use
+    :func:`clear_sample_pool` after re-seeding to get reproducible samples.
+
+    Args:
+        finger (SimFinger): A SimFinger object
+        action_bounds (dict): See
+            :func:`feasible_random_joint_positions_for_reaching`.
+        n (int): Number of samples.
+        rng: Random number generator.  See :func:`random_position_in_arena`.
+        use_pool (bool): Set to true to use the pool of surplus samples (see
+            above).  Requires an explicit ``rng``.
+
+    Returns:
+        Array of shape (n, 3) with the joint positions of one finger per row.
+        The samples are given in the frame of the first finger and can be
+        used for any of the fingers.
+
+    Raises:
+        ValueError: If ``use_pool`` is set without giving ``rng``.
+    """
+    if rng is None:
+        if use_pool:
+            raise ValueError(
+                "The sample pool can only be used with an explicit random"
+                " number generator."
+            )
+        rng = np.random
+
+    bounds_key = (
+        tuple(action_bounds["low"][0:3]),
+        tuple(action_bounds["high"][0:3]),
+    )
+    pool_rng, pool_key, pool = _separated_sample_pools.get(
+        finger, (None, None, None)
+    )
+    if not use_pool or pool_rng is not rng or pool_key != bounds_key:
+        pool = np.empty((0, 3))
+
+    samples = [pool]
+    n_accepted = len(pool)
+    n_tried = n_new = 0
+    while n_accepted < n:
+        # choose the block size based on the acceptance rate so far
+        rate = max(n_new / n_tried, 0.01) if n_tried else 0.1
+        n_candidates = max(
+            _SEPARATED_BLOCK_SIZE, int(1.25 * (n - n_accepted) / rate)
+        )
+        candidates = rng.uniform(
+            low=_SEPARATED_LOW, high=_SEPARATED_HIGH, size=(n_candidates, 3)
+        )
+        accepted = candidates[
+            _is_separated_sample_feasible(finger, action_bounds, candidates)
+        ]
+        samples.append(accepted)
+        n_accepted += len(accepted)
+        n_new += len(accepted)
+        n_tried += n_candidates
+
+    samples = np.concatenate(samples)
+    if use_pool:
+        # do not let the pool grow beyond the size of a block
+        _separated_sample_pools[finger] = (
+            rng,
+            bounds_key,
+            samples[n : n + _SEPARATED_BLOCK_SIZE],
+        )
+
+    return samples[:n]
+
+
+def clear_sample_pool(finger=None):
+    """Discard pooled samples of :func:`sample_separated_joint_positions`.
+
+    Args:
+        finger (SimFinger): Only clear the pool of this finger.  If not set,
+            the pools of all fingers are cleared.
+    """
+    if finger is None:
+        _separated_sample_pools.clear()
+    else:
+        _separated_sample_pools.pop(finger, None)
+
+
 def get_tip_positions_around_position(number_of_fingers, position):
     """
     Compute finger tip positions close to the given target position
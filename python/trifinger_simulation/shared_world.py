@@ -0,0 +1,143 @@
+import numpy as np
+import pybullet
+import pybullet_data
+
+
+class SharedWorld:
+    """
+    A single pyBullet world in which multiple robots are simulated.
+
+    Normally every :class:`~trifinger_simulation.SimFinger` (and thus every
+    :class:`~trifinger_simulation.TriFingerPlatform`) creates its own pyBullet
+    client.  By passing a SharedWorld instance to them instead, all robots are
+    placed in the same world.  Each robot, together with its stage and objects,
+    is put into its own *cell*.  The cells are arranged in a row along the
+    x-axis, far enough apart that they never interact.  All positions
+    provided by the robot/platform API (e.g. object poses) are relative to the
+    origin of the cell, so the cells behave the same as separate simulations.
+
+    Since all cells share one simulation, they are stepped in lockstep: the
+    world is only stepped once *all* robots in it have received an action for
+    the current step (via ``append_desired_action``).  Observations of time
+    step ``t + 1`` are therefore only available once this has happened.  The
+    benefit is that a single ``stepSimulation`` call advances all cells.
+
+    Example:
+
+    .. code-block:: python
+
+        world = SharedWorld()
+        platforms = [TriFingerPlatform(shared_world=world) for _ in range(4)]
+
+        for platform in platforms:
+            t = platform.append_desired_action(platform.Action())
+        # all platforms have an action now, so the world has been stepped
+        for platform in platforms:
+            observation = platform.get_robot_observation(t + 1)
+
+    Note that a robot cannot be removed from the world again.
+
+    Attributes:
+        time_step_s (float): Time (in seconds) between two simulation steps.
+        cell_spacing (float): Distance (in meters) between the origins of two
+            neighbouring cells.
+    """
+
+    def __init__(
+        self, time_step_s=0.004, enable_visualization=False, cell_spacing=2.0
+    ):
+        """
+        Create the world.
+
+        Args:
+            time_step_s (float): Time (in seconds) between two simulation
+                steps.  All robots in the world need to use this time step.
+            enable_visualization (bool): Set this to 'True' for a GUI
+                interface to the simulation.
+            cell_spacing (float): Distance (in meters) between the origins of
+                two neighbouring cells.
+        """
+        self.time_step_s = time_step_s
+        self.cell_spacing = cell_spacing
+
+        if enable_visualization:
+            self.pybullet_client_id = pybullet.connect(pybullet.GUI)
+        else:
+            self.pybullet_client_id = pybullet.connect(pybullet.DIRECT)
+
+        _kwargs = {"physicsClientId": self.pybullet_client_id}
+
+        pybullet.setAdditionalSearchPath(
+            pybullet_data.getDataPath(), **_kwargs
+        )
+        pybullet.setGravity(0, 0, -9.81, **_kwargs)
+        pybullet.setTimeStep(self.time_step_s, **_kwargs)
+        # Process overlapping pairs in a fixed order, so that the result of a
+        # simulation step does not depend on the order in which the objects
+        # were added.
+        pybullet.setPhysicsEngineParameter(
+            deterministicOverlappingPairs=1, **_kwargs
+        )
+        # one (infinite) ground plane for all cells
+        pybullet.loadURDF("plane_transparent.urdf", [0, 0, 0], **_kwargs)
+
+        self._robots = []
+        self._has_action = []
+
+    @property
+    def number_of_robots(self):
+        """Number of robots (i.e. cells) in the world."""
+        return len(self._robots)
+
+    def _add_robot(self, robot):
+        """Add a robot to the world.
+
+        This is called by :class:`~trifinger_simulation.SimFinger` when it is
+        created with this world.
+
+        Args:
+            robot (SimFinger): The robot.
+
+        Returns:
+            array: Position of the origin of the robot's cell in the world.
+        """
+        if robot.time_step_s != self.time_step_s:
+            raise ValueError(
+                "Time step of the robot ({}) does not match the one of the"
+                " world ({}).".format(robot.time_step_s, self.time_step_s)
+            )
+
+        cell_index = len(self._robots)
+        self._robots.append(robot)
+        self._has_action.append(False)
+        robot._cell_index = cell_index
+
+        return np.array([cell_index * self.cell_spacing, 0.0, 0.0])
+
+    def _step_simulation(self, robot):
+        """Mark that the robot has an action and step once all have one.
+
+        This is called by :meth:`SimFinger._step_simulation` after the action
+        of the robot has been applied.
+        """
+        if self._has_action[robot._cell_index]:
+            raise RuntimeError(
+                "Robot {} already received an action for this step.  The"
+                " world is only stepped once all robots received an"
+                " action.".format(robot._cell_index)
+            )
+        self._has_action[robot._cell_index] = True
+
+        if all(self._has_action):
+            pybullet.stepSimulation(physicsClientId=self.pybullet_client_id)
+            for other_robot in self._robots:
+                other_robot._update_state()
+            self._has_action = [False] * len(self._robots)
+
+    def _is_waiting(self, robot):
+        """Check if the robot has an action but the world was not stepped."""
+        return self._has_action[robot._cell_index]
+
+    def __del__(self):
+        if pybullet.isConnected(physicsClientId=self.pybullet_client_id):
+            pybullet.disconnect(physicsClientId=self.pybullet_client_id)
@@ -35,7 +35,9 @@ class SimFinger:
         finger_type,
         time_step=0.004,
         enable_visualization=False,
-        sim_joint_friction=0.
+        sim_joint_friction=0.,
+        compute_tip_forces=True,
+        shared_world=None,
     ):
         """
         Constructor, initializes the physical world we will work in.
@@ -52,6 +54,19 @@ class SimFinger:
             sim_joint_friction (float or float array): Set this to non-zero 
                 to apply negative forces on applied torques to simulate joint
                 friction 
+            compute_tip_forces (bool): Set this to False to skip the
+                computation of the tip forces.  The ``tip_force`` field of the
+                observations is set to None in this case.  If enabled, the
+                tip forces are computed in every step (also if they are not
+                accessed), as the contacts of a step cannot be queried anymore
+                once the simulation is stepped.  Use this if the tip forces are
+                not needed, as querying the contacts from the simulation is
+                rather expensive.
+            shared_world (SharedWorld): If set, the robot is added to this
+                world instead of creating a new pyBullet client.  See
+                :class:`~trifinger_simulation.SharedWorld` for details.  In
+                this case ``enable_visualization`` is ignored (it is
+                configured by the world).
         """
         self.finger_type = finger_types_data.check_finger_type(finger_type)
         self.number_of_fingers = finger_types_data.get_number_of_fingers(
@@ -83,12 +98,23 @@ class SimFinger:
 
         self._t = -1
 
+        self.compute_tip_forces = compute_tip_forces
+
+        self._shared_world = shared_world
+
         self.__create_link_lists()
         self.__set_urdf_path()
-        self._pybullet_client_id = self.__connect_to_pybullet(
-            enable_visualization
-        )
+        if shared_world is None:
+            self._pybullet_client_id = self.__connect_to_pybullet(
+                enable_visualization
+            )
+            #: Position of the robot base in the world frame.
+            self.base_position = np.zeros(3)
+        else:
+            self._pybullet_client_id = shared_world.pybullet_client_id
+            self.base_position = shared_world._add_robot(self)
         self.__setup_pybullet_simulation()
+        self._update_state()
 
         self.kinematics = pinocchio_utils.Kinematics(
             self.finger_urdf_path, self.tip_link_names
@@ -148,6 +174,15 @@ class SimFinger:
             observation = self._observation_t
 
         elif t == self._t + 1:
+            if (
+                self._shared_world is not None
+                and self._shared_world._is_waiting(self)
+            ):
+                raise RuntimeError(
+                    "Observation of the next step is not available yet.  The"
+                    " shared world is only stepped once all robots received"
+                    " an action."
+                )
             # observation from after action_t was applied
             observation = self._get_latest_observation()
 
@@ -285,8 +320,23 @@ class SimFinger:
                 joint_velocities[i],
                 physicsClientId=self._pybullet_client_id,
             )
+        self._update_state()
         return self._get_latest_observation()
 
+    def _reset_time_index(self):
+        """Reset time index and applied torque to their initial values.
+
+        After calling this, the finger behaves as if it was just created, i.e.
+        the next call of :meth:`append_desired_action` will return t = 0.
+        This does not change the state of the simulation, use
+        :meth:`reset_finger_positions_and_velocities` for this.
+        """
+        self._t = -1
+        try:
+            del self.__applied_torque
+        except AttributeError:
+            pass
+
     def _get_latest_observation(self):
         """Get observation of the current state.
 
@@ -295,18 +345,10 @@ class SimFinger:
             torques of the joints.
         """
         observation = Observation()
-        current_joint_states = pybullet.getJointStates(
-            self.finger_id,
-            self.pybullet_joint_indices,
-            physicsClientId=self._pybullet_client_id,
-        )
-
-        observation.position = np.array(
-            [joint[0] for joint in current_joint_states]
-        )
-        observation.velocity = np.array(
-            [joint[1] for joint in current_joint_states]
-        )
+        # the cached joint states are read-only and replaced in every step, so
+        # give the observation its own (writable) copies
+        observation.position = self._joint_positions.copy()
+        observation.velocity = self._joint_velocities.copy()
         # pybullet.getJointStates only contains actual joint torques in
         # POSITION_CONTROL and VELOCITY_CONTROL mode.  In TORQUE_CONTROL mode
         # only zeros are reported, the actual torque is exactly the same as the
@@ -318,35 +360,62 @@ class SimFinger:
             # self.__applied_torque does not exist), set it to zero
             observation.torque = np.zeros(len(observation.velocity))
 
-        finger_contact_states = [
-            pybullet.getContactPoints(
-                bodyA=self.finger_id,
-                linkIndexA=tip,
-                physicsClientId=self._pybullet_client_id,
+        if self.compute_tip_forces:
+            # the contacts only change when stepping the simulation, so the
+            # tip forces are computed only once per step and then shared by
+            # all observations of that step
+            if self.__tip_forces is None:
+                self.__tip_forces = self.__compute_tip_forces()
+            observation.tip_force = self.__tip_forces.copy()
+        else:
+            observation.tip_force = None
+
+        return observation
+
+    def __compute_tip_forces(self):
+        """Compute the simulated push sensor measurements of the finger tips.
+
+        Returns:
+            array, shape=(n_fingers,): Simulated push sensor value for each
+            finger tip.
+        """
+        # get all contacts of the robot at once and sum up the normal forces
+        # per tip link (contacts of other links are ignored)
+        contact_points = pybullet.getContactPoints(
+            bodyA=self.finger_id,
+            physicsClientId=self._pybullet_client_id,
+        )
+        if contact_points:
+            link_indices = np.fromiter(
+                (contact_point[3] for contact_point in contact_points),
+                dtype=int,
+                count=len(contact_points),
             )
-            for tip in self.pybullet_tip_link_indices
-        ]
-        tip_forces = []
-        for i in range(len(finger_contact_states)):
-            directed_contact_force = 0.0
-            try:
-                for contact_point in finger_contact_states[i]:
-                    directed_contact_force += np.array(contact_point[9])
-            except IndexError:
-                pass
-            tip_forces.append(directed_contact_force)
-        observation.tip_force = np.array(tip_forces)
+            normal_forces = np.fromiter(
+                (contact_point[9] for contact_point in contact_points),
+                dtype=float,
+                count=len(contact_points),
+            )
+            finger_indices = self.__link_to_finger_index[link_indices]
+            is_tip = finger_indices >= 0
+            tip_forces = np.bincount(
+                finger_indices[is_tip],
+                weights=normal_forces[is_tip],
+                minlength=self.number_of_fingers,
+            ).astype(float)
+        else:
+            tip_forces = np.zeros(self.number_of_fingers)
 
         # The measurement of the push sensor of the real robot lies in the
         # interval [0, 1].  It does not go completely to zero, so add a bit of
         # "no contact" offset.  It saturates somewhere around 5 N.
         push_sensor_saturation_force_N = 5.0
         push_sensor_no_contact_value = 0.05
-        observation.tip_force /= push_sensor_saturation_force_N
-        observation.tip_force += push_sensor_no_contact_value
-        np.clip(observation.tip_force, 0.0, 1.0, out=observation.tip_force)
+        tip_forces /= push_sensor_saturation_force_N
+        tip_forces += push_sensor_no_contact_value
+        np.clip(tip_forces, 0.0, 1.0, out=tip_forces)
 
-        return observation
+        return tip_forces
 
     def _set_desired_action(self, desired_action):
         """Set the given action after performing safety checks.
@@ -403,10 +472,22 @@ class SimFinger:
     def _step_simulation(self):
         """
         Step the simulation to go to the next world state.
+
+        If the robot is part of a shared world, the world is only stepped
+        once all its robots reached this point.
         """
-        pybullet.stepSimulation(
-            physicsClientId=self._pybullet_client_id,
-        )
+        if self._shared_world is not None:
+            self._shared_world._step_simulation(self)
+        else:
+            pybullet.stepSimulation(
+                physicsClientId=self._pybullet_client_id,
+            )
+            self._update_state()
+
+    def _update_state(self):
+        """Update the cached state after the simulation has changed."""
+        self.__read_joint_states()
+        self.__tip_forces = None
 
     def _disconnect_from_pybullet(self):
         """Disconnect from the simulation.
@@ -414,11 +495,41 @@ class SimFinger:
         Disconnects from the simulation and sets simulation to disabled to
         avoid any further function calls to it.
         """
+        # a shared world is owned by the SharedWorld instance
+        if self._shared_world is not None:
+            return
+
         if pybullet.isConnected(physicsClientId=self._pybullet_client_id):
             pybullet.disconnect(
                 physicsClientId=self._pybullet_client_id,
             )
 
+    def __read_joint_states(self):
+        """Read the current joint positions and velocities from pyBullet.
+
+        This needs to be called whenever the state of the simulation changes
+        (i.e. after stepping or resetting).  The values are stored in
+        ``_joint_positions`` and ``_joint_velocities`` and are shared by the
+        controller and the safety checks (observations get copies), so that
+        the joint states only need to be read once per step.  To ensure that
+        the shared arrays are not modified by accident, they are set
+        read-only.
+        """
+        current_joint_states = pybullet.getJointStates(
+            self.finger_id,
+            self.pybullet_joint_indices,
+            physicsClientId=self._pybullet_client_id,
+        )
+
+        self._joint_positions = np.array(
+            [joint[0] for joint in current_joint_states]
+        )
+        self._joint_velocities = np.array(
+            [joint[1] for joint in current_joint_states]
+        )
+        self._joint_positions.flags.writeable = False
+        self._joint_velocities.flags.writeable = False
+
     def __set_pybullet_motor_torques(self, motor_torques):
 
         pybullet.setJointMotorControlArray(
@@ -448,15 +559,7 @@ class SimFinger:
             +self.max_motor_torque,
         )
 
-        current_joint_states = pybullet.getJointStates(
-            self.finger_id,
-            self.pybullet_joint_indices,
-            physicsClientId=self._pybullet_client_id,
-        )
-        current_velocity = np.array(
-            [joint[1] for joint in current_joint_states]
-        )
-        applied_torques -= self.safety_kd * current_velocity
+        applied_torques -= self.safety_kd * self._joint_velocities
 
         applied_torques = np.clip(
             np.asarray(applied_torques),
@@ -485,22 +588,10 @@ class SimFinger:
         if kd is None:
             kd = self.velocity_gains
 
-        current_joint_states = pybullet.getJointStates(
-            self.finger_id,
-            self.pybullet_joint_indices,
-            physicsClientId=self._pybullet_client_id,
-        )
-        current_position = np.array(
-            [joint[0] for joint in current_joint_states]
-        )
-        current_velocity = np.array(
-            [joint[1] for joint in current_joint_states]
-        )
-
-        position_error = joint_positions - current_position
+        position_error = joint_positions - self._joint_positions
 
         position_feedback = np.asarray(kp) * position_error
-        velocity_feedback = np.asarray(kd) * current_velocity
+        velocity_feedback = np.asarray(kd) * self._joint_velocities
 
         joint_torques = position_feedback - velocity_feedback
 
@@ -558,25 +649,27 @@ class SimFinger:
         Set the physical parameters of the world in which the simulation
         will run, and import the models to be simulated
         """
-        pybullet.setAdditionalSearchPath(
-            pybullet_data.getDataPath(),
-            physicsClientId=self._pybullet_client_id,
-        )
-        pybullet.setGravity(
-            0,
-            0,
-            -9.81,
-            physicsClientId=self._pybullet_client_id,
-        )
-        pybullet.setTimeStep(
-            self.time_step_s, physicsClientId=self._pybullet_client_id
-        )
+        # a shared world is already set up by the SharedWorld instance
+        if self._shared_world is None:
+            pybullet.setAdditionalSearchPath(
+                pybullet_data.getDataPath(),
+                physicsClientId=self._pybullet_client_id,
+            )
+            pybullet.setGravity(
+                0,
+                0,
+                -9.81,
+                physicsClientId=self._pybullet_client_id,
+            )
+            pybullet.setTimeStep(
+                self.time_step_s, physicsClientId=self._pybullet_client_id
+            )
 
-        pybullet.loadURDF(
-            "plane_transparent.urdf",
-            [0, 0, 0],
-            physicsClientId=self._pybullet_client_id,
-        )
+            pybullet.loadURDF(
+                "plane_transparent.urdf",
+                [0, 0, 0],
+                physicsClientId=self._pybullet_client_id,
+            )
         self.__load_robot_urdf()
         self.__set_pybullet_params()
         self.__load_stage()
@@ -659,7 +752,7 @@ class SimFinger:
         """
         Load the single/trifinger model from the corresponding urdf
         """
-        finger_base_position = [0, 0, 0.0]
+        finger_base_position = self.base_position
         finger_base_orientation = pybullet.getQuaternionFromEuler(
             [0, 0, 0], physicsClientId=self._pybullet_client_id
         )
@@ -703,6 +796,15 @@ class SimFinger:
         self.pybullet_tip_link_indices = [
             link_name_to_index[name] for name in self.tip_link_names
         ]
+        # map link index -> index of the finger if it is a tip link, -1
+        # otherwise (pyBullet uses index -1 for the base link, so add one
+        # additional entry, which is accessed for negative indices)
+        self.__link_to_finger_index = np.full(
+            len(link_name_to_index) + 1, -1, dtype=int
+        )
+        self.__link_to_finger_index[self.pybullet_tip_link_indices] = range(
+            self.number_of_fingers
+        )
         # joint and link indices are the same in pybullet
         self.pybullet_joint_indices = self.pybullet_link_indices
 
@@ -722,7 +824,7 @@ class SimFinger:
         if self.finger_type in ["fingerone", "fingeredu"]:
             collision_objects.import_mesh(
                 mesh_path("Stage_simplified.stl"),
-                position=[0, 0, 0],
+                position=self.base_position,
                 is_concave=True,
                 pybullet_client_id=self._pybullet_client_id,
             )
@@ -733,14 +835,14 @@ class SimFinger:
             if high_border:
                 collision_objects.import_mesh(
                     mesh_path("trifinger_table_without_border.stl"),
-                    position=[0, 0, 0],
+                    position=self.base_position,
                     is_concave=False,
                     color_rgba=table_colour,
                     pybullet_client_id=self._pybullet_client_id,
                 )
                 collision_objects.import_mesh(
                     mesh_path("high_table_boundary.stl"),
-                    position=[0, 0, 0],
+                    position=self.base_position,
                     is_concave=True,
                     color_rgba=high_border_colour,
                     pybullet_client_id=self._pybullet_client_id,
@@ -748,7 +850,7 @@ class SimFinger:
             else:
                 collision_objects.import_mesh(
                     mesh_path("BL-M_Table_ASM_big.stl"),
-                    position=[0, 0, 0],
+                    position=self.base_position,
                     is_concave=True,
                     color_rgba=table_colour,
                     pybullet_client_id=self._pybullet_client_id,
@@ -758,14 +860,14 @@ class SimFinger:
             high_border_colour = (0.95, 0.95, 0.95, 1.0)
             collision_objects.import_mesh(
                 mesh_path("trifinger_table_without_border.stl"),
-                position=[0, 0, 0],
+                position=self.base_position,
                 is_concave=False,
                 color_rgba=table_colour,
                 pybullet_client_id=self._pybullet_client_id,
             )
             collision_objects.import_mesh(
                 mesh_path("edu/frame_wall.stl"),
-                position=[0, 0, 0],
+                position=self.base_position,
                 is_concave=True,
                 color_rgba=high_border_colour,
                 pybullet_client_id=self._pybullet_client_id,
@@ -0,0 +1,218 @@
+import numpy as np
+import pybullet
+
+from trifinger_simulation.observation import Observation
+from trifinger_simulation.sim_finger import SimFinger
+
+
+class SimFingerPool:
+    """
+    Multiple independent simulated robots with a batched interface.
+
+    Creates ``number_of_robots`` :class:`~trifinger_simulation.SimFinger`
+    instances (each with its own pyBullet client) and controls all of them
+    with a single call per step.  Actions are given as arrays of shape
+    ``(number_of_robots, n_joints)`` and the PD controller and safety checks
+    are computed for all robots at once, so the per-robot Python overhead is
+    reduced to the unavoidable pyBullet calls.
+
+    Controller and safety checks behave exactly like the ones of
+    :class:`~trifinger_simulation.SimFinger`, so a robot of the pool follows
+    the same trajectory as a single SimFinger that receives the same actions.
+
+    Attributes:
+        robots (list of SimFinger): The simulated robots.
+        number_of_robots (int): Number of robots in the pool.
+        n_joints (int): Number of joints of each robot.
+        position_gains (array, shape=(number_of_robots, n_joints)): Default
+            P-gains of the position controller.
+        velocity_gains (array, shape=(number_of_robots, n_joints)): Default
+            D-gains of the position controller.
+        safety_kd (array, shape=(number_of_robots, n_joints)): D-gains used
+            for velocity damping in the safety check.
+        max_motor_torque (float): Maximum torque that can be applied to each
+            motor.
+    """
+
+    def __init__(self, number_of_robots, finger_type, time_step=0.004):
+        """
+        Create the simulated robots.
+
+        Args:
+            number_of_robots (int): Number of robots in the pool.
+            finger_type (string): Name of the finger type.  See
+                :class:`~trifinger_simulation.SimFinger`.
+            time_step (float): Time (in seconds) between two simulation steps.
+        """
+        if number_of_robots < 1:
+            raise ValueError("number_of_robots cannot be less than 1.")
+
+        self.robots = [
+            SimFinger(
+                finger_type=finger_type,
+                time_step=time_step,
+                compute_tip_forces=False,
+            )
+            for _ in range(number_of_robots)
+        ]
+        self.number_of_robots = number_of_robots
+        self.n_joints = len(self.robots[0].pybullet_joint_indices)
+
+        self.position_gains = np.stack(
+            [robot.position_gains for robot in self.robots]
+        )
+        self.velocity_gains = np.stack(
+            [robot.velocity_gains for robot in self.robots]
+        )
+        self.safety_kd = np.stack([robot.safety_kd for robot in self.robots])
+        self.max_motor_torque = self.robots[0].max_motor_torque
+
+        self._applied_torque = np.zeros((number_of_robots, self.n_joints))
+
+    def reset(self, joint_positions, joint_velocities=None):
+        """
+        Reset the joint positions and velocities of all robots.
+
+        Args:
+            joint_positions (array-like, shape=(number_of_robots, n_joints)):
+                Angular position for each joint of each robot.
+            joint_velocities (array-like, shape=(number_of_robots, n_joints)):
+                Angular velocities for each joint of each robot.  If None,
+                velocities are set to 0.
+
+        Returns:
+            Observation: The state of the robots after the reset.  See
+            :meth:`get_observation`.
+        """
+        joint_positions = self.__check_shape(
+            joint_positions, "joint_positions"
+        )
+        if joint_velocities is None:
+            joint_velocities = np.zeros_like(joint_positions)
+        else:
+            joint_velocities = self.__check_shape(
+                joint_velocities, "joint_velocities"
+            )
+
+        for robot, position, velocity in zip(
+            self.robots, joint_positions, joint_velocities
+        ):
+            robot.reset_finger_positions_and_velocities(position, velocity)
+
+        self._applied_torque = np.zeros((self.number_of_robots, self.n_joints))
+
+        return self.get_observation()
+
+    def step(self, torque=None, position=None, kp=None, kd=None):
+        """
+        Apply the given actions to all robots and step the simulations.
+
+        The arguments have the same meaning as the fields of
+        :class:`~trifinger_simulation.Action`, with an additional first
+        dimension for the robots.
+
+        Args:
+            torque (array-like, shape=(number_of_robots, n_joints)): Torque
+                commands.  Defaults to zero.
+            position (array-like, shape=(number_of_robots, n_joints)): Target
+                positions for the position controller.  Set to NaN to disable
+                position control for a joint.  Defaults to all NaN.
+            kp (array-like, shape=(number_of_robots, n_joints)): P-gains for
+                the position controller.  NaN entries are replaced by the
+                default gains.
+            kd (array-like, shape=(number_of_robots, n_joints)): D-gains for
+                the position controller.  NaN entries are replaced by the
+                default gains.
+
+        Returns:
+            Observation: The state of the robots after the step.  See
+            :meth:`get_observation`.
+        """
+        current_position = np.stack(
+            [robot._joint_positions for robot in self.robots]
+        )
+        current_velocity = np.stack(
+            [robot._joint_velocities for robot in self.robots]
+        )
+
+        if torque is None:
+            torque_command = np.zeros((self.number_of_robots, self.n_joints))
+        else:
+            torque_command = self.__check_shape(torque, "torque").copy()
+
+        if position is not None:
+            position = self.__check_shape(position, "position")
+            kp = self.__get_gains(kp, "kp", self.position_gains)
+            kd = self.__get_gains(kd, "kd", self.velocity_gains)
+
+            position_error = position - current_position
+            pd_torque = kp * position_error - kd * current_velocity
+            # set nan entries to zero (nans occur on joints for which the
+            # target position was set to nan)
+            pd_torque[np.isnan(pd_torque)] = 0.0
+
+            torque_command += pd_torque
+
+        # safety checks (see SimFinger)
+        applied_torque = np.clip(
+            torque_command, -self.max_motor_torque, +self.max_motor_torque
+        )
+        applied_torque -= self.safety_kd * current_velocity
+        applied_torque = np.clip(
+            applied_torque, -self.max_motor_torque, +self.max_motor_torque
+        )
+
+        for robot, robot_torque in zip(self.robots, applied_torque):
+            pybullet.setJointMotorControlArray(
+                bodyUniqueId=robot.finger_id,
+                jointIndices=robot.pybullet_joint_indices,
+                controlMode=pybullet.TORQUE_CONTROL,
+                forces=robot_torque,
+                physicsClientId=robot._pybullet_client_id,
+            )
+            robot._step_simulation()
+
+        self._applied_torque = applied_torque
+
+        return self.get_observation()
+
+    def get_observation(self):
+        """
+        Get the current state of all robots.
+
+        Returns:
+            Observation: Observation with fields ``position``, ``velocity``
+            and ``torque`` being arrays of shape ``(number_of_robots,
+            n_joints)``.  ``torque`` is the torque that was applied in the
+            last step.  ``tip_force`` is not computed and set to None.
+        """
+        observation = Observation()
+        observation.position = np.stack(
+            [robot._joint_positions for robot in self.robots]
+        )
+        observation.velocity = np.stack(
+            [robot._joint_velocities for robot in self.robots]
+        )
+        observation.torque = self._applied_torque.copy()
+        observation.tip_force = None
+
+        return observation
+
+    def __check_shape(self, array, name):
+        """Convert to float array and verify that it has the correct shape."""
+        array = np.asarray(array, dtype=float)
+        expected_shape = (self.number_of_robots, self.n_joints)
+        if array.shape != expected_shape:
+            raise ValueError(
+                "Invalid shape of {}: Expected {} but got {}.".format(
+                    name, expected_shape, array.shape
+                )
+            )
+        return array
+
+    def __get_gains(self, gains, name, defaults):
+        """Replace NaN entries in gains with values from defaults."""
+        if gains is None:
+            return defaults
+        gains = self.__check_shape(gains, name)
+        return np.where(np.isnan(gains), defaults, gains)
@@ -1,12 +1,15 @@
 """Functions for sampling, validating and evaluating "move cube" goals."""
+import enum
 import json
 
 import numpy as np
 from scipy.spatial.transform import Rotation
 
 
-#: Random number generator.  Replace with a seeded version for deterministic
-#: samples.
+#: Random number generator that is used by the sampling functions if no
+#: generator is passed to them explicitly.  Replace with a seeded version for
+#: deterministic samples.  When using multiple environments in one process,
+#: better pass a separate generator to each call instead of sharing this one.
 random = np.random.RandomState()
 
 
@@ -52,6 +55,25 @@ class InvalidGoalError(Exception):
         self.orientation = orientation
 
 
+class InvalidGoalReason(enum.IntEnum):
+    """Reasons for a goal to be invalid, as reported by :func:`validate_goals`.
+
+    The checks are done in the order of the values, for an invalid goal only
+    the first failing check is reported.
+    """
+
+    #: The goal is valid.
+    VALID = 0
+    #: Position is outside of the arena circle.
+    OUTSIDE_ARENA = 1
+    #: Position is too low.
+    TOO_LOW = 2
+    #: Position is too high.
+    TOO_HIGH = 3
+    #: Position of a corner is too low.
+    CORNER_TOO_LOW = 4
+
+
 class Pose:
     """Represents a pose given by position and orientation."""
 
@@ -95,19 +117,27 @@ def get_cube_corner_positions(pose):
     """Get the positions of the cube's corners with the given pose.
 
     Args:
-        pose (Pose):  Pose of the cube.
+        pose (Pose):  Pose of the cube.  Position and orientation can also be
+            arrays of shape (N, 3) and (N, 4) to get the corners of multiple
+            poses at once.
 
     Returns:
         (array, shape=(8, 3)): Positions of the corners of the cube in the
-            given pose.
+            given pose.  For multiple poses, the shape is (N, 8, 3).
     """
     rotation = Rotation.from_quat(pose.orientation)
     translation = np.asarray(pose.position)
 
-    return rotation.apply(_cube_corners) + translation
+    if translation.ndim == 1:
+        return rotation.apply(_cube_corners) + translation
+    else:
+        return (
+            np.einsum("nij,kj->nki", rotation.as_matrix(), _cube_corners)
+            + translation[:, np.newaxis, :]
+        )
 
 
-def sample_goal(difficulty):
+def sample_goal(difficulty, rng=None):
     """Sample a goal pose for the cube.
 
     Args:
@@ -118,6 +148,9 @@ def sample_goal(difficulty):
             - 2: Fixed goal position in the air with x,y = 0.  No orientation.
             - 3: Random goal position in the air, no orientation.
             - 4: Random goal pose in the air, including orientation.
+        rng:  Random number generator (``numpy.random.RandomState`` or
+            ``numpy.random.Generator``).  If not set, the module-level
+            :data:`random` is used.
 
     Returns:
         Pose: Goal pose of the cube relative to the world frame.  Note that
@@ -127,10 +160,13 @@ def sample_goal(difficulty):
     """
     # difficulty -1 is for initialization
 
+    if rng is None:
+        rng = random
+
     def random_xy():
         # sample uniform position in circle (https://stackoverflow.com/a/50746409)
-        radius = _max_cube_com_distance_to_center * np.sqrt(random.random())
-        theta = random.uniform(0, 2 * np.pi)
+        radius = _max_cube_com_distance_to_center * np.sqrt(rng.random())
+        theta = rng.uniform(0, 2 * np.pi)
 
         # x,y-position of the cube
         x = radius * np.cos(theta)
@@ -139,7 +175,7 @@ def sample_goal(difficulty):
         return x, y
 
     def random_yaw_orientation():
-        yaw = random.uniform(0, 2 * np.pi)
+        yaw = rng.uniform(0, 2 * np.pi)
         orientation = Rotation.from_euler("z", yaw)
         return orientation.as_quat()
 
@@ -162,15 +198,15 @@ def sample_goal(difficulty):
 
     elif difficulty == 3:
         x, y = random_xy()
-        z = random.uniform(_min_height, _max_height)
+        z = rng.uniform(_min_height, _max_height)
         orientation = np.array([0, 0, 0, 1])
 
     elif difficulty == 4:
         x, y = random_xy()
         # Set minimum height such that the cube does not intersect with the
         # ground in any orientation
-        z = random.uniform(_cube_3d_radius, _max_height)
-        orientation = Rotation.random(random_state=random).as_quat()
+        z = rng.uniform(_cube_3d_radius, _max_height)
+        orientation = Rotation.random(random_state=rng).as_quat()
 
     else:
         raise ValueError("Invalid difficulty %d" % difficulty)
@@ -226,6 +262,138 @@ def validate_goal(goal):
         )
 
 
+def sample_goals(difficulty, n, rng=None):
+    """Sample multiple goal poses for the cube at once.
+
+    Vectorized version of :func:`sample_goal`.  The goals follow the same
+    distribution but, as the random numbers are drawn in a different order,
+    they are not the same as when calling :func:`sample_goal` n times.
+
+    Args:
+        difficulty (int):  Difficulty level (see :func:`sample_goal`).
+        n (int):  Number of goals.
+        rng:  Random number generator (``numpy.random.RandomState`` or
+            ``numpy.random.Generator``).  If not set, the module-level
+            :data:`random` is used.
+
+    Returns:
+        Tuple (positions, orientations) with arrays of shape (n, 3) and (n, 4)
+        containing the goal positions and orientations (as quaternions
+        (x, y, z, w)).
+    """
+    if rng is None:
+        rng = random
+
+    def random_xy():
+        # sample uniform position in circle (see sample_goal())
+        radius = _max_cube_com_distance_to_center * np.sqrt(
+            rng.uniform(size=n)
+        )
+        theta = rng.uniform(0, 2 * np.pi, size=n)
+
+        return radius * np.cos(theta), radius * np.sin(theta)
+
+    def random_yaw_orientations():
+        half_yaw = rng.uniform(0, 2 * np.pi, size=n) / 2
+        zeros = np.zeros(n)
+        return np.stack(
+            [zeros, zeros, np.sin(half_yaw), np.cos(half_yaw)], axis=1
+        )
+
+    no_orientations = np.tile([0.0, 0.0, 0.0, 1.0], (n, 1))
+
+    if difficulty == -1:  # for initialization
+        # on the ground, random yaw
+        x, y = random_xy()
+        z = np.full(n, _min_height)
+        orientations = random_yaw_orientations()
+
+    elif difficulty == 1:
+        x, y = random_xy()
+        z = np.full(n, _min_height)
+        orientations = no_orientations
+
+    elif difficulty == 2:
+        x = np.zeros(n)
+        y = np.zeros(n)
+        z = np.full(n, _min_height + 0.05)
+        orientations = no_orientations
+
+    elif difficulty == 3:
+        x, y = random_xy()
+        z = rng.uniform(_min_height, _max_height, size=n)
+        orientations = no_orientations
+
+    elif difficulty == 4:
+        x, y = random_xy()
+        # Set minimum height such that the cube does not intersect with the
+        # ground in any orientation
+        z = rng.uniform(_cube_3d_radius, _max_height, size=n)
+        orientations = Rotation.random(n, random_state=rng).as_quat()
+
+    else:
+        raise ValueError("Invalid difficulty %d" % difficulty)
+
+    return np.stack([x, y, z], axis=1), orientations
+
+
+def validate_goals(positions, orientations):
+    """Validate multiple goal poses at once.
+
+    Vectorized version of :func:`validate_goal`.  Instead of raising an error
+    for invalid goals, the result of the checks is returned.
+
+    Args:
+        positions (array, shape=(N, 3)):  Goal positions.
+        orientations (array, shape=(N, 4)):  Goal orientations as quaternions
+            (x, y, z, w).
+
+    Returns:
+        Tuple (valid, reasons) with a boolean array of shape (N,) that is True
+        for valid goals and an integer array of shape (N,) with the
+        :class:`InvalidGoalReason` of each goal.
+
+    Raises:
+        ValueError:  If the given arrays do not have the expected shapes.
+    """
+    positions = np.asarray(positions, dtype=float)
+    orientations = np.asarray(orientations, dtype=float)
+    if positions.ndim != 2 or positions.shape[1] != 3:
+        raise ValueError("positions need to have shape (N, 3)")
+    if orientations.shape != (len(positions), 4):
+        raise ValueError("orientations need to have shape (N, 4)")
+
+    # even if the CoM is above _min_height, a corner could be intersecting with
+    # the bottom depending on the orientation.  The lowest corner is the one
+    # for which the z-offsets of all three cube axes are negative.
+    q = orientations / np.linalg.norm(orientations, axis=1, keepdims=True)
+    x, y, z, w = q.T
+    # third row of the rotation matrix of q
+    rotation_z = np.stack(
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+        axis=1,
+    )
+    min_corner_z = positions[:, 2] - np.abs(rotation_z) @ _CUBOID_HALF_SIZE
+
+    reasons = np.full(len(positions), InvalidGoalReason.VALID, dtype=int)
+    # go through the checks in reverse order, so the first failing check
+    # overwrites the others
+    for reason, invalid in (
+        # allow a bit below zero to compensate numerical inaccuracies
+        (InvalidGoalReason.CORNER_TOO_LOW, min_corner_z < -1e-10),
+        (InvalidGoalReason.TOO_HIGH, positions[:, 2] > _max_height),
+        (InvalidGoalReason.TOO_LOW, positions[:, 2] < _min_height),
+        (
+            InvalidGoalReason.OUTSIDE_ARENA,
+            np.linalg.norm(positions[:, :2], axis=1)
+            > _max_cube_com_distance_to_center,
+        ),
+    ):
+        reasons[invalid] = reason
+
+    return reasons == InvalidGoalReason.VALID, reasons
+
+
 def validate_goal_file(filename):
     """Validate given goal file.
 
@@ -317,6 +485,100 @@ def evaluate_state(goal_pose, actual_pose, difficulty):
         raise ValueError("Invalid difficulty %d" % difficulty)
 
 
+def _rotated_y_axes(orientations):
+    """Rotate the y-axis by each of the given quaternions.
+
+    Args:
+        orientations (array, shape=(N, 4)):  Quaternions (x, y, z, w).  They
+            don't need to be normalized.
+
+    Returns:
+        (array, shape=(N, 3)): The y-axis rotated by each quaternion.
+    """
+    # normalize like scipy.spatial.transform.Rotation.from_quat does
+    q = orientations / np.linalg.norm(orientations, axis=1, keepdims=True)
+    x, y, z, w = q.T
+
+    # second column of the rotation matrix of q
+    return np.stack(
+        [
+            2 * (x * y - z * w),
+            1 - 2 * (x * x + z * z),
+            2 * (y * z + x * w),
+        ],
+        axis=1,
+    )
+
+
+def evaluate_states(goal_pose, positions, orientations, difficulty):
+    """Compute costs of multiple cube poses at once.  Less is better.
+
+    Vectorized version of :func:`evaluate_state`, e.g. to compute the cost of
+    all steps of a trajectory in a single call.  The results match those of
+    :func:`evaluate_state` for each pose up to numerical precision.
+
+    Args:
+        goal_pose:  Goal pose of the cube.  Its position and orientation can
+            also be arrays of shape (N, 3) and (N, 4) to use a different goal
+            for each pose.
+        positions (array, shape=(N, 3)):  Actual positions of the cube.
+        orientations (array, shape=(N, 4)):  Actual orientations of the cube
+            as quaternions (x, y, z, w).  Only used for difficulty 4.
+        difficulty:  The difficulty level of the goal (see
+            :func:`sample_goal`).
+
+    Returns:
+        (array, shape=(N,)): Cost of each actual pose w.r.t. to the goal
+        pose.
+    """
+    positions = np.asarray(positions, dtype=float).reshape(-1, 3)
+    goal_position = np.asarray(goal_pose.position, dtype=float)
+
+    def weighted_position_errors():
+        range_xy_dist = _ARENA_RADIUS * 2
+        range_z_dist = _max_height
+
+        xy_dist = np.linalg.norm(
+            goal_position[..., :2] - positions[:, :2], axis=1
+        )
+        z_dist = np.abs(goal_position[..., 2] - positions[:, 2])
+
+        # weight xy- and z-parts by their expected range
+        return (xy_dist / range_xy_dist + z_dist / range_z_dist) / 2
+
+    if difficulty in (1, 2, 3):
+        # consider only 3d position
+        return weighted_position_errors()
+    elif difficulty == 4:
+        # consider whole pose
+        scaled_position_errors = weighted_position_errors()
+
+        orientations = np.asarray(orientations, dtype=float).reshape(-1, 4)
+        goal_orientations = np.asarray(
+            goal_pose.orientation, dtype=float
+        ).reshape(-1, 4)
+
+        goal_direction_vectors = _rotated_y_axes(goal_orientations)
+        actual_direction_vectors = _rotated_y_axes(orientations)
+
+        dot_products = np.einsum(
+            "ij,ij->i",
+            *np.broadcast_arrays(
+                goal_direction_vectors, actual_direction_vectors
+            )
+        )
+        # rounding errors may result in values slightly outside of [-1, 1]
+        orientation_errors = np.arccos(np.clip(dot_products, -1, 1))
+
+        # scale both position and orientation error to be within [0, 1] for
+        # their expected ranges
+        scaled_orientation_errors = orientation_errors / np.pi
+
+        return (scaled_position_errors + scaled_orientation_errors) / 2
+    else:
+        raise ValueError("Invalid difficulty %d" % difficulty)
+
+
 def goal_to_json(goal):
     """Convert goal object to JSON string.
 
@@ -1,12 +1,19 @@
-import pickle
+import os
 import warnings
 import numpy as np
 import gym
+import pybullet
 from types import SimpleNamespace
 
 from .tasks import move_cube
 from .sim_finger import SimFinger
-from . import camera, collision_objects, trifingerpro_limits
+from . import (
+    action_log,
+    camera,
+    camera_rendering,
+    collision_objects,
+    trifingerpro_limits,
+)
 
 
 class ObjectPose:
@@ -28,13 +35,22 @@ class ObjectPose:
 class CameraObservation:
     """Pure-python copy of trifinger_cameras.camera.CameraObservation."""
 
-    __slots__ = ["image", "timestamp"]
+    __slots__ = ["image", "timestamp", "depth", "segmentation", "bayer"]
 
     def __init__(self):
         #: array: The image.
         self.image = None
         #: float: Timestamp when the image was received.
         self.timestamp = None
+        #: array: Depth image in meters (only set if the "depth" channel is
+        #: enabled, see :class:`~trifinger_simulation.camera.CameraFrame`).
+        self.depth = None
+        #: array: Segmentation mask (only set if the "segmentation" channel
+        #: is enabled).
+        self.segmentation = None
+        #: array: BG-Bayer pattern of the image (only set if the "bayer"
+        #: channel is enabled).
+        self.bayer = None
 
 
 class TriCameraObjectObservation:
@@ -97,7 +113,13 @@ class TriFingerPlatform:
         enable_cameras=False,
         time_step_s=0.004,
         object_mass=None,
-        joint_friction=None
+        joint_friction=None,
+        shared_world=None,
+        action_log_file=None,
+        async_cameras=False,
+        camera_channels=("rgb",),
+        deterministic_overlapping_pairs=False,
+        compute_tip_forces=True,
     ):
         """Initialize.
 
@@ -113,13 +135,66 @@ class TriFingerPlatform:
                 still available but the images will not be initialized.  By
                 default this is disabled as rendering of images takes a lot of
                 computational power.  Therefore the cameras should only be
-                enabled if the images are actually used.
+                enabled if the images are actually used.  To skip rendering
+                while the scene does not change, enable the cache of
+                ``tricamera`` (see
+                :class:`~trifinger_simulation.camera.TriFingerCameras`).
             time_step_s (float):  Simulation time step duration in seconds.
             object_mass (float):  Mass of object loaded into simulator
             joint_friction (np.ndarray(shape=(9,), dtype=float)):
                 friction in individual joints which reduces applied torques
+            shared_world (SharedWorld):  If set, the platform is created as a
+                cell of this world instead of in its own pyBullet client.  See
+                :class:`~trifinger_simulation.SharedWorld`.  Rendering camera
+                images is not supported in this case.
+            action_log_file (str):  If set, the action log is streamed to
+                this file during the episode instead of being kept in memory
+                (see :class:`~trifinger_simulation.action_log.ActionLog`).
+                Use :meth:`store_action_log` to finish the file at the end of
+                the episode.  Each episode needs its own file, so pass a new
+                one to :meth:`reset`.
+            async_cameras (bool):  Set to true to render the camera images
+                in a background worker process instead of in the control
+                loop.  The worker renders a copy of the scene (robot, stage
+                and cube, see
+                :class:`~trifinger_simulation.camera_rendering.SceneRenderer`)
+                with the robot and object state of the camera update, while
+                the simulation continues.  :meth:`get_camera_observation`
+                only blocks if the images are not finished yet.  Note that
+                other objects (e.g. goal markers) are not visible in the
+                images in this mode.  Requires ``enable_cameras``.  Call
+                :meth:`close` to stop the worker process when the platform is
+                not needed anymore.
+            camera_channels:  Channels that are rendered for the camera
+                observations (see
+                :data:`~trifinger_simulation.camera.CHANNELS`).  The RGB
+                image is stored in the ``image`` attribute of the
+                observations, the other channels in the attributes with the
+                name of the channel.  Only requested channels are set.
+            deterministic_overlapping_pairs (bool):  Set to true to make
+                pyBullet process overlapping pairs of objects in a fixed
+                order.  This is needed for :meth:`reset` to behave exactly
+                like a newly created platform, so enable it if the platform
+                is reused for multiple episodes.  Note that it slightly
+                changes the result of the simulation, so episodes are not
+                the same as with the default setting.  The setting is stored
+                in the action log, so that logs are replayed with the same
+                setting (see :mod:`~trifinger_simulation.replay`).
+                Platforms in a shared world always use it (see
+                :class:`~trifinger_simulation.SharedWorld`).
+            compute_tip_forces (bool):  Set to false to skip the computation
+                of the tip forces in every step.  The ``tip_force`` field of
+                the robot observations is None in this case.  See
+                :class:`~trifinger_simulation.SimFinger`.
 
         """
+        if shared_world is not None and enable_cameras:
+            raise ValueError(
+                "Cameras are not supported for platforms in a shared world."
+            )
+        if async_cameras and not enable_cameras:
+            raise ValueError("async_cameras requires enable_cameras.")
+
         object_mass = object_mass or 0.016
         self.joint_friction = joint_friction
         #: Camera rate in frames per second.  Observations of camera and
@@ -129,12 +204,33 @@ class TriFingerPlatform:
         #: Set to true to render camera observations
         self.enable_cameras = enable_cameras
 
+        #: Whether pyBullet processes overlapping pairs in a fixed order (see
+        #: ``deterministic_overlapping_pairs`` of :meth:`__init__`).
+        self.deterministic_overlapping_pairs = (
+            deterministic_overlapping_pairs or shared_world is not None
+        )
+
         #: Simulation time step
         self._time_step = time_step_s
 
+        self._action_log_file = action_log_file
+        # files to which logs of this platform were streamed already
+        self._used_action_log_files = set()
+        self._action_log = None
+
         # first camera update in the first step
         self._next_camera_update_step = 0
 
+        if async_cameras:
+            self._camera_renderer = camera_rendering.AsyncCameraRenderer(
+                channels=camera_channels
+            )
+        else:
+            self._camera_renderer = None
+        # future of the images of the current camera observation if they are
+        # still being rendered by the asynchronous renderer
+        self._camera_images_future = None
+
         # Initialize robot, object and cameras
         # ====================================
 
@@ -142,10 +238,22 @@ class TriFingerPlatform:
             finger_type="trifingerpro",
             time_step=self._time_step,
             enable_visualization=visualization,
+            compute_tip_forces=compute_tip_forces,
+            shared_world=shared_world,
         )
+        self._shared_world = shared_world
 
         _kwargs = {"physicsClientId": self.simfinger._pybullet_client_id}
 
+        # Process overlapping pairs in a fixed order, so that the result of a
+        # simulation step does not depend on the history of the world.  This
+        # is needed for reset() to behave exactly like a new platform.  In a
+        # shared world this is already set by the world.
+        if deterministic_overlapping_pairs and shared_world is None:
+            pybullet.setPhysicsEngineParameter(
+                deterministicOverlappingPairs=1, **_kwargs
+            )
+
         if initial_robot_position is None:
             initial_robot_position = self.spaces.robot_position.default
 
@@ -160,14 +268,18 @@ class TriFingerPlatform:
             )
 
         self.cube = collision_objects.Block(
-            position=initial_object_pose.position,
+            position=np.add(
+                initial_object_pose.position, self.simfinger.base_position
+            ),
             orientation=initial_object_pose.orientation,
             #half_extents=[0.01, 0.04, 0.01],
             mass=object_mass,
             pybullet_client_id=self.simfinger._pybullet_client_id,
         )
 
-        self.tricamera = camera.TriFingerCameras(**_kwargs)
+        self.tricamera = camera.TriFingerCameras(
+            channels=camera_channels, **_kwargs
+        )
 
         # Forward some methods for convenience
         # ====================================
@@ -182,13 +294,128 @@ class TriFingerPlatform:
         # forward kinematics directly to simfinger
         self.forward_kinematics = self.simfinger.kinematics.forward_kinematics
 
+        # Store the initial state of the world, so it can be restored in
+        # reset() without rebuilding everything.  Go through reset() here as
+        # well, so that a new platform and a reset one are initialized in
+        # exactly the same way (this also initializes the action log).
+        # In a shared world, the state of the whole world would be restored,
+        # so the platform is reset manually in this case.
+        if shared_world is None:
+            self._initial_state_id = pybullet.saveState(**_kwargs)
+        self.reset(initial_robot_position, initial_object_pose)
+
+    def reset(
+        self,
+        initial_robot_position=None,
+        initial_object_pose=None,
+        action_log_file=None,
+    ):
+        """Reset the platform to a new initial state.
+
+        This is a faster alternative to creating a new
+        :class:`TriFingerPlatform` instance.  Instead of rebuilding the whole
+        simulation (pyBullet client, robot, stage, object and cameras), the
+        state of the world that was stored at construction time is restored
+        and robot and object are moved to the given initial state.
+
+        **Important:** Only if the platform was created with
+        ``deterministic_overlapping_pairs=True`` (which is not the default),
+        the resulting simulation behaves exactly the same as a newly created
+        platform (with the same setting).  Otherwise, results may differ
+        slightly.
+
+        For a platform in a :class:`~trifinger_simulation.SharedWorld`, only
+        robot and object of this platform are reset (including their
+        velocities).  This is only possible while the platform has no action
+        that is waiting for the world to be stepped, since pyBullet would
+        still apply its torques in the next step.  Note that the other cells
+        of the world continue with their current time index.
+
+        Args:
+            initial_robot_position: Initial robot joint angles.  If not set,
+                the default position is used.
+            initial_object_pose:  Initial pose for the manipulation object.
+                See :meth:`__init__`.  If not set, the default pose is used.
+            action_log_file (str):  File to which the action log of the new
+                episode is streamed.  Required if the platform streams its
+                action log (see :meth:`__init__`), as the file of the
+                previous episode is not overwritten.
+
+        Raises:
+            RuntimeError: If the platform is in a shared world and its last
+                action is still waiting for the world to be stepped.
+            ValueError: If the action log would be streamed to a file that
+                was already used for a previous episode of this platform.
+        """
+        if self._shared_world is not None and self._shared_world._is_waiting(
+            self.simfinger
+        ):
+            raise RuntimeError(
+                "Cannot reset the platform while its action is waiting for"
+                " the other platforms in the shared world."
+            )
+
+        if action_log_file is None:
+            action_log_file = self._action_log_file
+        if action_log_file is not None:
+            action_log_path = os.path.abspath(action_log_file)
+            if action_log_path in self._used_action_log_files:
+                raise ValueError(
+                    "The action log of a previous episode was already"
+                    " streamed to '{}'.  Pass a new action_log_file to"
+                    " reset().".format(action_log_file)
+                )
+
+        if initial_robot_position is None:
+            initial_robot_position = self.spaces.robot_position.default
+
+        if initial_object_pose is None:
+            initial_object_pose = move_cube.Pose(
+                position=self.spaces.object_position.default,
+                orientation=self.spaces.object_orientation.default,
+            )
+
+        if self._shared_world is None:
+            pybullet.restoreState(
+                stateId=self._initial_state_id,
+                physicsClientId=self.simfinger._pybullet_client_id,
+            )
+        else:
+            pybullet.resetBaseVelocity(
+                self.cube.block,
+                [0, 0, 0],
+                [0, 0, 0],
+                physicsClientId=self.simfinger._pybullet_client_id,
+            )
+
+        self.simfinger._reset_time_index()
+        self.simfinger.reset_finger_positions_and_velocities(
+            initial_robot_position
+        )
+        self.cube.set_state(
+            np.add(initial_object_pose.position, self.simfinger.base_position),
+            initial_object_pose.orientation,
+        )
+
+        self._next_camera_update_step = 0
+        self._discard_pending_camera_images()
+
         # Initialize log
         # ==============
-        self._action_log = {
-            "initial_robot_position": initial_robot_position,
-            "initial_object_pose": initial_object_pose,
-            "actions": [],
-        }
+        # a streamed log of the previous episode is finished as it is
+        if self._action_log is not None:
+            self._action_log.close()
+        if action_log_file is not None:
+            self._used_action_log_files.add(action_log_path)
+        self._action_log_file = action_log_file
+        self._action_log = action_log.ActionLog(
+            initial_robot_position,
+            initial_object_pose,
+            filename=self._action_log_file,
+            deterministic_overlapping_pairs=(
+                self.deterministic_overlapping_pairs
+            ),
+        )
 
     def get_time_step(self):
         """Get simulation time step in seconds."""
@@ -214,6 +441,12 @@ class TriFingerPlatform:
                 self._compute_camera_update_step_interval()
             )
             self._camera_observation_t = self._get_current_camera_observation()
+            if self._camera_renderer is not None:
+                # render while the simulation is stepped
+                self._discard_pending_camera_images()
+                self._camera_images_future = self._render_camera_images_async(
+                    self._camera_observation_t
+                )
 
         if self.joint_friction is not None:
             action.torque -= self.joint_friction
@@ -232,15 +465,11 @@ class TriFingerPlatform:
             )
 
         # write the desired action to the log
-        camera_obs = self.get_camera_observation(t)
-        robot_obs = self.get_robot_observation(t)
-        self._action_log["actions"].append(
-            {
-                "t": t,
-                "action": action,
-                "object_pose": camera_obs.object_pose,
-                "robot_observation": robot_obs,
-            }
+        self._action_log.append(
+            t,
+            action,
+            self.get_object_pose(t),
+            self.get_robot_observation(t),
         )
 
         return t
@@ -248,17 +477,55 @@ class TriFingerPlatform:
     def _get_current_object_pose(self):
         cube_state = self.cube.get_state()
         pose = ObjectPose()
-        pose.position = np.asarray(cube_state[0])
+        # position relative to the origin of the platform
+        pose.position = (
+            np.asarray(cube_state[0]) - self.simfinger.base_position
+        )
         pose.orientation = np.asarray(cube_state[1])
         pose.confidence = 1.0
 
         return pose
 
+    def get_object_pose(self, t):
+        """Get object pose at time step t.
+
+        Same as the ``object_pose`` of :meth:`get_camera_observation` but
+        without rendering any images and without warning if cameras are
+        disabled.
+
+        Args:
+            t:  The time index of the step for which the object pose is
+                requested.  Only the value returned by the last call of
+                :meth:`~append_desired_action` is valid.
+
+        Returns:
+            ObjectPose:  Estimate of the object pose.
+
+        Raises:
+            ValueError: If invalid time index ``t`` is passed.
+        """
+        current_t = self.simfinger._t
+
+        if t < 0:
+            raise ValueError("Cannot access time index less than zero.")
+        elif t == current_t:
+            return self._camera_observation_t.object_pose
+        elif t == current_t + 1:
+            pose = self._get_current_object_pose()
+            pose.timestamp = self.get_timestamp_ms(t) / 1000
+            return pose
+        else:
+            raise ValueError(
+                "Given time index t has to match with index of the current"
+                " step or the next one."
+            )
+
     def _get_current_camera_observation(self, t=None):
-        if self.enable_cameras:
-            images = self.tricamera.get_images()
+        # with the asynchronous renderer the images are filled in later
+        if self.enable_cameras and self._camera_renderer is None:
+            frames = self.tricamera.render()
         else:
-            images = [None] * 3
+            frames = None
 
         observation = TriCameraObjectObservation()
         # NOTE: The timestamp can only be set correctly after time step t
@@ -269,14 +536,45 @@ class TriFingerPlatform:
         else:
             timestamp = self.get_timestamp_ms(t)
 
-        for i, image in enumerate(images):
-            observation.cameras[i].image = image
-            observation.cameras[i].timestamp = timestamp
+        for camera_observation in observation.cameras:
+            camera_observation.timestamp = timestamp
+        if frames is not None:
+            self._set_camera_frames(observation, frames)
 
         observation.object_pose = self._get_current_object_pose()
 
         return observation
 
+    def _render_camera_images_async(self, observation):
+        """Request the images of the current state from the async renderer."""
+        return self._camera_renderer.submit(
+            self.simfinger._joint_positions,
+            observation.object_pose.position,
+            observation.object_pose.orientation,
+        )
+
+    @staticmethod
+    def _set_camera_images(observation, images_future):
+        """Wait for the rendered images and add them to the observation."""
+        TriFingerPlatform._set_camera_frames(
+            observation, images_future.result()
+        )
+
+    @staticmethod
+    def _set_camera_frames(observation, frames):
+        """Add the channels of the rendered frames to the observation."""
+        for camera_observation, frame in zip(observation.cameras, frames):
+            camera_observation.image = frame.rgb
+            camera_observation.depth = frame.depth
+            camera_observation.segmentation = frame.segmentation
+            camera_observation.bayer = frame.bayer
+
+    def _discard_pending_camera_images(self):
+        if self._camera_images_future is not None:
+            # the images are discarded once the worker has rendered them
+            self._camera_images_future.cancel()
+            self._camera_images_future = None
+
     def get_camera_observation(self, t):
         """Get camera observation at time step t.
 
@@ -308,28 +606,75 @@ class TriFingerPlatform:
         if t < 0:
             raise ValueError("Cannot access time index less than zero.")
         elif t == current_t:
+            if self._camera_images_future is not None:
+                self._set_camera_images(
+                    self._camera_observation_t, self._camera_images_future
+                )
+                self._camera_images_future = None
             return self._camera_observation_t
         elif t == current_t + 1:
-            return self._get_current_camera_observation(t)
+            observation = self._get_current_camera_observation(t)
+            if self._camera_renderer is not None:
+                self._set_camera_images(
+                    observation, self._render_camera_images_async(observation)
+                )
+            return observation
         else:
             raise ValueError(
                 "Given time index t has to match with index of the current"
                 " step or the next one."
             )
 
-    def store_action_log(self, filename):
-        """Store the action log to a JSON file.
+    def close(self):
+        """Stop the worker process of the asynchronous camera rendering.
+
+        Only has an effect if the platform was created with
+        ``async_cameras=True``.  Camera observations do not contain images
+        anymore afterwards.  Calling it more than once has no effect.
+        """
+        if self._camera_renderer is not None:
+            self._discard_pending_camera_images()
+            self._camera_renderer.close()
+            self._camera_renderer = None
+            self.enable_cameras = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def store_action_log(self, filename=None):
+        """Store the action log to a binary file.
+
+        See :mod:`trifinger_simulation.action_log` for the file format.  Use
+        :func:`trifinger_simulation.action_log.load_action_log` to load it.
+
+        If the platform was created with ``action_log_file``, the log has
+        been streamed to that file already and only the remaining steps and
+        the final object pose are written.  No further actions should be
+        appended after this until the next :meth:`reset`.
 
         Args:
-            filename (str):  Path to the JSON file to which the log shall be
+            filename (str):  Path to the file to which the log shall be
                 written.  If the file exists already, it will be overwritten.
+                Can be omitted if the log is streamed to ``action_log_file``.
         """
+        if self._action_log.is_streaming:
+            if filename is not None and filename != self._action_log_file:
+                raise ValueError(
+                    "The action log is streamed to '{}', it cannot be stored"
+                    " to a different file.".format(self._action_log_file)
+                )
+        elif filename is None:
+            raise ValueError("No filename given for the action log.")
+
         t = self.get_current_timeindex()
-        camera_obs = self.get_camera_observation(t)
-        self._action_log["final_object_pose"] = {
+        self._action_log.final_object_pose = {
             "t": t,
-            "pose": camera_obs.object_pose,
+            "pose": self.get_object_pose(t),
         }
-
-        with open(filename, "wb") as fh:
-            pickle.dump(self._action_log, fh)
+        if self._action_log.is_streaming:
+            self._action_log.close()
+        else:
+            self._action_log.write(filename)
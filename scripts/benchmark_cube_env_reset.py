@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Compare the reset rate of CubeEnv with and without reusing the platform.
+
+Without reusing, a completely new TriFingerPlatform (including pyBullet
+client, robot, stage, object and cameras) is created in every reset.  With
+reusing, the initial state of the existing simulation is restored instead.
+
+Note that reusing the platform enables deterministic overlapping pairs in
+pyBullet, which is off by default.  The episodes are therefore not the same as
+without reusing, even with the same seed.
+"""
+import argparse
+import time
+
+from trifinger_simulation.gym_wrapper.envs import cube_env
+
+
+def measure_resets_per_second(reuse_platform, num_resets, steps_per_episode):
+    env = cube_env.CubeEnv(
+        cube_env.RandomInitializer(difficulty=1),
+        reuse_platform=reuse_platform,
+    )
+    env.seed(0)
+    env.action_space.seed(0)
+
+    # the first reset always creates the platform, so do not include it in
+    # the measurement
+    env.reset()
+
+    reset_duration = 0.0
+    for _ in range(num_resets):
+        start = time.perf_counter()
+        env.reset()
+        reset_duration += time.perf_counter() - start
+
+        for _ in range(steps_per_episode):
+            env.step(env.action_space.sample())
+
+    return num_resets / reset_duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-resets",
+        type=int,
+        default=20,
+        help="Number of resets that are measured.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--steps-per-episode",
+        type=int,
+        default=100,
+        help="Number of steps executed between two resets."
+        "  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    print(
+        "Note: reuse_platform=True enables deterministic overlapping pairs, so"
+        " its episodes\ndiffer from the ones with reuse_platform=False (even"
+        " with the same seed).\n"
+    )
+    for reuse_platform in (False, True):
+        rate = measure_resets_per_second(
+            reuse_platform, args.num_resets, args.steps_per_episode
+        )
+        print(
+            "reuse_platform={}:\t{:.1f} resets/s".format(reuse_platform, rate)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compare single and batched forward kinematics.
+
+Computes the finger tip positions for a number of random joint configurations,
+once by calling ``Kinematics.forward_kinematics`` for each configuration and
+once with a single call of ``Kinematics.forward_kinematics_batch`` (with both
+the "pinocchio" and the "numpy" backend), and reports the achieved rates.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from trifinger_simulation.pinocchio_utils import Kinematics
+from trifinger_simulation.sim_finger import SimFinger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-configurations",
+        type=int,
+        default=100000,
+        help="Number of joint configurations.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--finger-type",
+        type=str,
+        default="trifingerpro",
+        help="Finger type.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    finger = SimFinger(finger_type=args.finger_type)
+    kinematics = finger.kinematics
+    numpy_kinematics = Kinematics(
+        finger.finger_urdf_path, finger.tip_link_names, backend="numpy"
+    )
+    n_joints = kinematics.robot_model.nq
+    joint_positions = np.random.uniform(
+        -np.pi, np.pi, size=(args.num_configurations, n_joints)
+    )
+
+    start = time.perf_counter()
+    for q in joint_positions:
+        kinematics.forward_kinematics(q)
+    single_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    kinematics.forward_kinematics_batch(joint_positions)
+    batch_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    numpy_kinematics.forward_kinematics_batch(joint_positions)
+    numpy_batch_duration = time.perf_counter() - start
+
+    for name, duration in (
+        ("forward_kinematics", single_duration),
+        ("forward_kinematics_batch", batch_duration),
+        ("forward_kinematics_batch (numpy)", numpy_batch_duration),
+    ):
+        print(
+            "{}:\t{:.3f} s ({:.0f} configurations/s)".format(
+                name, duration, args.num_configurations / duration
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare the inverse kinematics solvers of pinocchio_utils.Kinematics.
+
+Solves the inverse kinematics for random reachable tip targets (computed with
+the forward kinematics of random joint configurations around the initial
+position) with
+
+- the per-finger solver (``inverse_kinematics_one_finger`` for each finger),
+- ``inverse_kinematics`` (one target at a time) and
+- ``inverse_kinematics_batch`` (all targets at once)
+
+and reports the time per target and the reached tip errors.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from trifinger_simulation.sim_finger import SimFinger
+
+
+def report(name, duration, n_targets, errors):
+    print(
+        "{}:\t{:.3f} ms/target, max. error {:.5f}".format(
+            name,
+            duration / n_targets * 1000,
+            np.max(np.linalg.norm(errors, axis=-1)),
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-targets",
+        type=int,
+        default=200,
+        help="Number of tip targets.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.005,
+        help="Position error tolerance.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    kinematics = SimFinger(finger_type="trifingerpro").kinematics
+    initial_position = np.array([0, 0.9, -1.7] * 3)
+    joint_positions = initial_position + np.random.uniform(
+        -0.5, 0.5, size=(args.num_targets, 9)
+    )
+    targets = kinematics.forward_kinematics_batch(joint_positions)
+
+    start = time.perf_counter()
+    errors = []
+    for target in targets:
+        q = initial_position
+        for i, position in enumerate(target):
+            q, error = kinematics.inverse_kinematics_one_finger(
+                i, position, q, args.tolerance
+            )
+            errors.append(error)
+    report(
+        "per finger", time.perf_counter() - start, args.num_targets, errors
+    )
+
+    start = time.perf_counter()
+    errors = []
+    for target in targets:
+        _, error = kinematics.inverse_kinematics(
+            target, initial_position, args.tolerance
+        )
+        errors.append(error)
+    report(
+        "inverse_kinematics",
+        time.perf_counter() - start,
+        args.num_targets,
+        errors,
+    )
+
+    start = time.perf_counter()
+    _, errors, iterations = kinematics.inverse_kinematics_batch(
+        targets, initial_position, args.tolerance
+    )
+    report(
+        "inverse_kinematics_batch",
+        time.perf_counter() - start,
+        args.num_targets,
+        errors,
+    )
+    print(
+        "iterations: mean {:.1f}, max {}".format(
+            iterations.mean(), iterations.max()
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Compare K TriFingerPlatforms in one shared world with K separate clients.
+
+For each K, the platforms are stepped in lockstep with position actions and
+the total number of platform steps per second (summed over all platforms) is
+reported, once for platforms that each have their own pyBullet client and
+once for platforms that are cells of a single
+:class:`~trifinger_simulation.SharedWorld`.
+"""
+import argparse
+import time
+
+from trifinger_simulation import SharedWorld, TriFingerPlatform
+
+
+def measure_steps_per_second(num_platforms, num_steps, shared):
+    if shared:
+        world = SharedWorld()
+    else:
+        world = None
+
+    platforms = [
+        TriFingerPlatform(shared_world=world) for _ in range(num_platforms)
+    ]
+    actions = [
+        platform.Action(
+            position=TriFingerPlatform.spaces.robot_position.default
+        )
+        for platform in platforms
+    ]
+
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        for platform, action in zip(platforms, actions):
+            t = platform.append_desired_action(action)
+        for platform in platforms:
+            platform.get_robot_observation(t + 1)
+            platform.get_object_pose(t + 1)
+    duration = time.perf_counter() - start
+
+    return num_platforms * num_steps / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-steps",
+        type=int,
+        default=1000,
+        help="Number of steps per measurement.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--num-platforms",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16],
+        help="Values of K that are measured.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    print("K\tseparate\tshared\t[steps/s]")
+    for num_platforms in args.num_platforms:
+        separate = measure_steps_per_second(
+            num_platforms, args.num_steps, shared=False
+        )
+        shared = measure_steps_per_second(
+            num_platforms, args.num_steps, shared=True
+        )
+        print("{}\t{:.0f}\t\t{:.0f}".format(num_platforms, separate, shared))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Measure the number of control steps per second of SimFinger.
+
+Runs position control with a fixed target (which exercises the PD controller,
+the torque safety check and the observations) and reports the achieved rate
+for each of the given finger types.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from trifinger_simulation.sim_finger import SimFinger
+
+
+def measure_steps_per_second(finger_type, num_steps):
+    finger = SimFinger(finger_type=finger_type)
+    action = finger.Action(
+        position=np.array([0.0, 0.9, -1.7] * finger.number_of_fingers)
+    )
+
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        t = finger.append_desired_action(action)
+        finger.get_observation(t + 1)
+    duration = time.perf_counter() - start
+
+    return num_steps / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-steps",
+        type=int,
+        default=5000,
+        help="Number of steps per finger type.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--finger-types",
+        type=str,
+        nargs="+",
+        default=["fingerone", "trifingerpro"],
+        help="Finger types that are measured.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    for finger_type in args.finger_types:
+        rate = measure_steps_per_second(finger_type, args.num_steps)
+        print("{}:\t{:.0f} steps/s".format(finger_type, rate))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Measure how the step rate of vectorized CubeEnvs scales with the number
+of environments.
+
+Compares the shared-memory vector env of trifinger_simulation with gym's
+pipe-based ``AsyncVectorEnv`` (which, like ``SubprocVecEnv`` of
+stable-baselines, pickles the observations and sends them through pipes) for
+1 up to the number of CPU cores environments.
+"""
+import argparse
+import functools
+import os
+import time
+
+import gym
+
+from trifinger_simulation.gym_wrapper.envs import cube_env
+from trifinger_simulation.gym_wrapper.vector_env import SharedMemoryVectorEnv
+
+
+def make_env(frameskip):
+    return cube_env.CubeEnv(
+        cube_env.RandomInitializer(difficulty=1),
+        frameskip=frameskip,
+        reuse_platform=True,
+    )
+
+
+def measure_steps_per_second(vector_env_class, num_envs, num_steps, frameskip):
+    env = vector_env_class(
+        [functools.partial(make_env, frameskip)] * num_envs
+    )
+    env.seed(0)
+    env.single_action_space.seed(0)
+    actions = [env.single_action_space.sample() for _ in range(num_envs)]
+
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        env.step(actions)
+    duration = time.perf_counter() - start
+    env.close()
+
+    # total number of environment steps of all environments
+    return num_envs * num_steps / duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--num-steps",
+        type=int,
+        default=500,
+        help="Number of (vectorized) steps per measurement."
+        "  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--frameskip",
+        type=int,
+        default=1,
+        help="Frameskip of the environments.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--max-envs",
+        type=int,
+        default=os.cpu_count(),
+        help="Maximum number of environments.  Default: number of CPU cores"
+        " (%(default)s)",
+    )
+    args = parser.parse_args()
+
+    # powers of two up to the maximum
+    num_envs_list = []
+    num_envs = 1
+    while num_envs < args.max_envs:
+        num_envs_list.append(num_envs)
+        num_envs *= 2
+    num_envs_list.append(args.max_envs)
+
+    vector_env_classes = {
+        "pipes": functools.partial(
+            gym.vector.AsyncVectorEnv, shared_memory=False
+        ),
+        "shared memory": SharedMemoryVectorEnv,
+    }
+
+    print("num_envs\t" + "\t".join(vector_env_classes.keys()) + "\t[steps/s]")
+    for num_envs in num_envs_list:
+        rates = [
+            measure_steps_per_second(
+                vector_env_class, num_envs, args.num_steps, args.frameskip
+            )
+            for vector_env_class in vector_env_classes.values()
+        ]
+        print(
+            "{}\t\t".format(num_envs)
+            + "\t".join("{:.0f}".format(rate) for rate in rates)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,10 @@ as a base for your own script to evaluate your policy.  All you need to do is
 to replace the `RandomPolicy` and potentially the Gym environment with your own
 ones (see the TODOs in the code below).
 
+The functions `make_env()`, `make_policy()` and `run_episode()` are also used
+by `run_evaluate_policy_all_levels_parallel.py`, which imports this script in
+long-lived worker processes to evaluate many samples without restarting.
+
 This script will be executed in an automated procedure.  For this to work, make
 sure you do not change the overall structure of the script!
 
@@ -40,6 +44,50 @@ class RandomPolicy:
         return self.action_space.sample()
 
 
+def make_env(difficulty, initializer):
+    """Create the environment for the given difficulty level.
+
+    Note: When the evaluation is run with warm worker processes (see
+    `run_evaluate_policy_all_levels_parallel.py`), the environment is created
+    only once per difficulty level and reused for multiple episodes.  Before
+    each episode, the initializer of the environment is replaced and then
+    `reset()` is called, so make sure that the environment does not keep any
+    state across episodes that would affect the results.
+    """
+    # TODO: Replace with your environment if you used a custom one.
+    env = gym.make(
+        "trifinger_simulation.gym_wrapper:real_robot_challenge_phase_1-v1",
+        initializer=initializer,
+        action_type=cube_env.ActionType.POSITION,
+        visualization=False,
+    )
+    return env
+
+
+def make_policy(env, difficulty):
+    """Create the policy for the given environment and difficulty level."""
+    # TODO: Replace this with your model
+    # Note: You may also use a different policy for each difficulty level
+    return RandomPolicy(env.action_space)
+
+
+def run_episode(env, policy):
+    """Execute one episode and return the accumulated reward."""
+    # Make sure that the number of simulation steps matches with the episode
+    # length of the task.  When using the default Gym environment, this is the
+    # case when looping until is_done == True.  Make sure to adjust this in
+    # case your custom environment behaves differently!
+    is_done = False
+    observation = env.reset()
+    accumulated_reward = 0
+    while not is_done:
+        action = policy.predict(observation)
+        observation, reward, is_done, info = env.step(action)
+        accumulated_reward += reward
+
+    return accumulated_reward
+
+
 def main():
     try:
         difficulty = int(sys.argv[1])
@@ -64,29 +112,11 @@ def main():
         difficulty, initial_pose, goal_pose
     )
 
-    # TODO: Replace with your environment if you used a custom one.
-    env = gym.make(
-        "trifinger_simulation.gym_wrapper:real_robot_challenge_phase_1-v1",
-        initializer=initializer,
-        action_type=cube_env.ActionType.POSITION,
-        visualization=False,
-    )
-
-    # TODO: Replace this with your model
-    # Note: You may also use a different policy for each difficulty level (difficulty)
-    policy = RandomPolicy(env.action_space)
+    env = make_env(difficulty, initializer)
+    policy = make_policy(env, difficulty)
 
-    # Execute one episode.  Make sure that the number of simulation steps
-    # matches with the episode length of the task.  When using the default Gym
-    # environment, this is the case when looping until is_done == True.  Make
-    # sure to adjust this in case your custom environment behaves differently!
-    is_done = False
-    observation = env.reset()
-    accumulated_reward = 0
-    while not is_done:
-        action = policy.predict(observation)
-        observation, reward, is_done, info = env.step(action)
-        accumulated_reward += reward
+    # Execute one episode.
+    accumulated_reward = run_episode(env, policy)
 
     print("Accumulated reward: {}".format(accumulated_reward))
 
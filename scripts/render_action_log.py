@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Render the camera images of an episode from its action log.
+
+The log file is a file as produced by
+`trifinger_simulation.TriFingerPlatform.store_action_log()`.  The robot and
+object states stored in it are rendered for the three cameras with the given
+frame rate and resolution, without simulating the physics again.  The frames
+are rendered in parallel by multiple worker processes.  Since the object poses
+are only logged with the camera rate of the platform (10 fps), the frame rate
+must not be higher than that.  Each frame shows the state at the camera update
+closest to its time.
+
+The output directory will contain the files "images.npy" with an array of
+shape (n_frames, 3, height, width, 3) containing the RGB images of the three
+cameras for each frame and "time_indices.npy" with the time index of each
+frame.  Load them with `numpy.load(filename, mmap_mode="r")` to avoid reading
+all images into memory.
+"""
+import argparse
+import time
+
+from trifinger_simulation import camera_rendering
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--logfile",
+        "-l",
+        required=True,
+        type=str,
+        help="Path to the log file.",
+    )
+    parser.add_argument(
+        "--output-dir",
+        "-o",
+        required=True,
+        type=str,
+        help="Directory to which the images are written.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=10,
+        help="""Frame rate in frames per second.  Must not be higher than
+            the camera rate of 10 fps.  Default: %(default)s
+        """,
+    )
+    parser.add_argument(
+        "--image-size",
+        type=int,
+        nargs=2,
+        default=(270, 270),
+        metavar=("WIDTH", "HEIGHT"),
+        help="Size of the images.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of worker processes.  Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=50,
+        help="Number of frames per chunk.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    images, _ = camera_rendering.render_action_log(
+        args.logfile,
+        args.output_dir,
+        rate_fps=args.rate,
+        n_workers=args.jobs,
+        chunk_size=args.chunk_size,
+        image_size=tuple(args.image_size),
+    )
+    duration = time.perf_counter() - start
+
+    print(
+        "Rendered {} frames in {:.1f} s ({:.1f} frames/s).".format(
+            len(images), duration, len(images) / duration
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
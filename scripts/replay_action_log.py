@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Replay actions for a given logfile and verify final object pose.
 
-The log file is a JSON file as produced by
+The log file is a file as produced by
 `trifinger_simulation.TriFingerPlatform.store_action_log()` which contains the
 initial state, a list of all applied actions and the final state of the object.
 
@@ -19,11 +19,9 @@ Both initial and goal pose are given as JSON strings with keys "position" and
 
 """
 import argparse
-import pickle
 import sys
-import numpy as np
 
-from trifinger_simulation import trifinger_platform
+from trifinger_simulation import replay
 from trifinger_simulation.tasks import move_cube
 
 
@@ -64,144 +62,19 @@ def main():
     )
     args = parser.parse_args()
 
-    with open(args.logfile, "rb") as fh:
-        log = pickle.load(fh)
-
     initial_object_pose = move_cube.Pose.from_json(args.initial_pose)
     goal_pose = move_cube.Pose.from_json(args.goal_pose)
 
-    # verify that the initial object pose matches with the one in the log file
     try:
-        np.testing.assert_array_almost_equal(
-            initial_object_pose.position,
-            log["initial_object_pose"].position,
-            err_msg=(
-                "Given initial object position does not match with log file."
-            ),
-        )
-        np.testing.assert_array_almost_equal(
-            initial_object_pose.orientation,
-            log["initial_object_pose"].orientation,
-            err_msg=(
-                "Given initial object orientation does not match with log file."
-            ),
+        accumulated_reward = replay.replay_action_log(
+            args.logfile, args.difficulty, initial_object_pose, goal_pose
         )
     except AssertionError as e:
         print("Failed.", file=sys.stderr)
         print(e, file=sys.stderr)
         sys.exit(1)
 
-    platform = trifinger_platform.TriFingerPlatform(
-        visualization=False, initial_object_pose=initial_object_pose
-    )
-
-    # verify that the robot is initialized to the same position as in the log
-    # file
-    initial_robot_position = platform.get_robot_observation(0).position
-    try:
-        np.testing.assert_array_almost_equal(
-            initial_robot_position,
-            log["initial_robot_position"],
-            err_msg=("Initial robot position does not match with log file."),
-        )
-    except AssertionError as e:
-        print("Failed.", file=sys.stderr)
-        print(e, file=sys.stderr)
-        sys.exit(1)
-
-    # verify that the number of logged actions matches with the episode length
-    n_actions = len(log["actions"])
-    assert (
-        n_actions == move_cube.episode_length
-    ), "Number of actions in log does not match with expected episode length."
-
-    accumulated_reward = 0
-    for logged_action in log["actions"]:
-        action = logged_action["action"]
-
-        t = platform.append_desired_action(action)
-
-        robot_obs = platform.get_robot_observation(t)
-        cube_pose = platform.get_object_pose(t)
-        reward = -move_cube.evaluate_state(
-            goal_pose, cube_pose, args.difficulty
-        )
-        accumulated_reward += reward
-
-        assert logged_action["t"] == t
-
-        np.testing.assert_array_almost_equal(
-            robot_obs.position,
-            logged_action["robot_observation"].position,
-            err_msg=(
-                "Step %d: Recorded robot position does not match with"
-                " the one achieved by the replay" % t
-            ),
-        )
-        np.testing.assert_array_almost_equal(
-            robot_obs.torque,
-            logged_action["robot_observation"].torque,
-            err_msg=(
-                "Step %d: Recorded robot torque does not match with"
-                " the one achieved by the replay" % t
-            ),
-        )
-        np.testing.assert_array_almost_equal(
-            robot_obs.velocity,
-            logged_action["robot_observation"].velocity,
-            err_msg=(
-                "Step %d: Recorded robot velocity does not match with"
-                " the one achieved by the replay" % t
-            ),
-        )
-
-        np.testing.assert_array_almost_equal(
-            cube_pose.position,
-            logged_action["object_pose"].position,
-            err_msg=(
-                "Step %d: Recorded object position does not match with"
-                " the one achieved by the replay" % t
-            ),
-        )
-        np.testing.assert_array_almost_equal(
-            cube_pose.orientation,
-            logged_action["object_pose"].orientation,
-            err_msg=(
-                "Step %d: Recorded object orientation does not match with"
-                " the one achieved by the replay" % t
-            ),
-        )
-
-    cube_pose = platform.get_object_pose(t)
-    final_pose = log["final_object_pose"]["pose"]
-
     print("Accumulated Reward:", accumulated_reward)
-
-    # verify that actual and logged final object pose match
-    try:
-        np.testing.assert_array_almost_equal(
-            cube_pose.position,
-            final_pose.position,
-            decimal=3,
-            err_msg=(
-                "Recorded object position does not match with the one"
-                " achieved by the replay"
-            ),
-        )
-        np.testing.assert_array_almost_equal(
-            cube_pose.orientation,
-            final_pose.orientation,
-            decimal=3,
-            err_msg=(
-                "Recorded object orientation does not match with the one"
-                " achieved by the replay"
-            ),
-        )
-    except AssertionError as e:
-        print("Failed.", file=sys.stderr)
-        print(e, file=sys.stderr)
-        sys.exit(1)
-
     print("Passed.")
 
 
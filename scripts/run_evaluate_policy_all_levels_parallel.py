@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Parallel version of "run_evaluate_policy_all_levels.py".
+
+Creates a dataset of multiple pairs of random initial state and goal for the
+cube for each difficulty level.  Then evaluates the policy of
+`evaluate_policy.py` on each of these samples and collects the log files in
+the specified output directory.  The generated files are the same as the ones
+of "run_evaluate_policy_all_levels.py", so the result can be replayed with
+"run_replay_all_levels.py".
+
+By default, the samples are evaluated by a pool of long-lived worker
+processes.  Each worker imports `evaluate_policy.py` once and uses its
+functions `make_env()`, `make_policy()` and `run_episode()` to evaluate the
+samples it takes from the queue.  Environment and policy are created only once
+per worker and difficulty level and are reused for the following samples.
+This avoids starting Python and loading gym, pyBullet and the policy again for
+every sample.  The simulation itself is still created anew in every reset of
+the environment, so the physics and therefore the rewards and action logs are
+the same as with `--isolated`.
+
+With `--isolated`, `evaluate_policy.py` is executed in a new process for
+every sample instead, like "run_evaluate_policy_all_levels.py" does.  Use this
+if your policy or environment keeps state across episodes that would affect
+the results.
+"""
+import argparse
+import concurrent.futures
+import importlib.util
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import typing
+
+from trifinger_simulation.gym_wrapper.envs import cube_env
+from trifinger_simulation.tasks import move_cube
+
+
+class TestSample(typing.NamedTuple):
+    difficulty: int
+    iteration: int
+    init_pose_json: str
+    goal_pose_json: str
+    logfile: str
+
+
+def generate_test_set(
+    levels: typing.List[int], samples_per_level: int, logfile_tmpl: str
+) -> typing.List[TestSample]:
+    """Generate random test set for policy evaluation.
+
+    See "run_evaluate_policy_all_levels.py".
+    """
+    samples = []
+    for level in levels:
+        for i in range(samples_per_level):
+            init = move_cube.sample_goal(-1)
+            goal = move_cube.sample_goal(level)
+            logfile = logfile_tmpl.format(level=level, iteration=i)
+
+            samples.append(
+                TestSample(level, i, init.to_json(), goal.to_json(), logfile)
+            )
+
+    return samples
+
+
+def run_evaluate_policy(policy_script: str, sample: TestSample):
+    """Run the evaluation script in a new process with the given sample.
+
+    Args:
+        policy_script: Path to the evaluation script.
+        sample: Contains all required information to run the evaluation
+            script.
+    """
+    cmd = [
+        policy_script,
+        str(sample.difficulty),
+        sample.init_pose_json,
+        sample.goal_pose_json,
+        sample.logfile,
+    ]
+    subprocess.run(cmd, check=True)
+
+
+# State of a worker process, see _init_worker()
+_policy_script = None
+_policy_module = None
+_envs_and_policies = {}
+
+
+def _init_worker(policy_script: str):
+    global _policy_script
+    _policy_script = policy_script
+
+
+def _import_policy_script(policy_script: str):
+    """Import the evaluation script as module."""
+    spec = importlib.util.spec_from_file_location(
+        "evaluate_policy", policy_script
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    for name in ("make_env", "make_policy", "run_episode"):
+        if not hasattr(module, name):
+            raise AttributeError(
+                "'{}' does not provide the function {}().  Run with"
+                " --isolated to execute it as a script instead.".format(
+                    policy_script, name
+                )
+            )
+
+    return module
+
+
+def _evaluate_in_worker(sample: TestSample) -> float:
+    """Evaluate the policy on one sample in a worker process."""
+    global _policy_module
+
+    # Import the script on the first call instead of in the pool initializer,
+    # so that errors are reported to the main process (a failing initializer
+    # would only make the pool restart the worker over and over again).
+    if _policy_module is None:
+        _policy_module = _import_policy_script(_policy_script)
+
+    initial_pose = move_cube.Pose.from_json(sample.init_pose_json)
+    goal_pose = move_cube.Pose.from_json(sample.goal_pose_json)
+    initializer = cube_env.FixedInitializer(
+        sample.difficulty, initial_pose, goal_pose
+    )
+
+    if sample.difficulty in _envs_and_policies:
+        env, policy = _envs_and_policies[sample.difficulty]
+        env.unwrapped.initializer = initializer
+    else:
+        env = _policy_module.make_env(sample.difficulty, initializer)
+        policy = _policy_module.make_policy(env, sample.difficulty)
+        _envs_and_policies[sample.difficulty] = (env, policy)
+
+    accumulated_reward = _policy_module.run_episode(env, policy)
+    env.unwrapped.platform.store_action_log(sample.logfile)
+
+    return accumulated_reward
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "output_directory",
+        type=str,
+        help="Directory in which generated files are stored.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=multiprocessing.cpu_count(),
+        help="""Number of samples that are evaluated in parallel.  Defaults
+            to the number of CPUs.
+        """,
+    )
+    parser.add_argument(
+        "--isolated",
+        action="store_true",
+        help="""Execute the evaluation script in a new process for each
+            sample instead of using long-lived worker processes.
+        """,
+    )
+    parser.add_argument(
+        "--policy-script",
+        type=str,
+        default="./evaluate_policy.py",
+        help="Path to the evaluation script.  Default: '%(default)s'.",
+    )
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.output_directory):
+        print(
+            "'{}' does not exist or is not a directory.".format(
+                args.output_directory
+            )
+        )
+        sys.exit(1)
+
+    levels = (1, 2, 3, 4)
+    runs_per_level = 10
+
+    logfile_tmpl = os.path.join(
+        args.output_directory, "action_log_l{level}_i{iteration}.bin"
+    )
+
+    # generate n samples for each level
+    test_data = generate_test_set(levels, runs_per_level, logfile_tmpl)
+
+    # store samples
+    sample_file = os.path.join(args.output_directory, "test_data.p")
+    with open(sample_file, "wb") as fh:
+        pickle.dump(test_data, fh, pickle.HIGHEST_PROTOCOL)
+
+    n_jobs = max(1, min(args.jobs, len(test_data)))
+
+    if args.isolated:
+        # the actual work is done in the subprocesses, so threads are enough
+        # to run them in parallel
+        with concurrent.futures.ThreadPoolExecutor(n_jobs) as executor:
+            futures = [
+                executor.submit(run_evaluate_policy, args.policy_script, s)
+                for s in test_data
+            ]
+            for sample, future in zip(test_data, futures):
+                future.result()
+                print(
+                    "Evaluated level {} sample {}".format(
+                        sample.difficulty, sample.iteration
+                    )
+                )
+    else:
+        with multiprocessing.Pool(
+            n_jobs, initializer=_init_worker, initargs=(args.policy_script,)
+        ) as pool:
+            # episodes take long, so hand out the samples one by one
+            rewards = pool.imap(_evaluate_in_worker, test_data, chunksize=1)
+            for sample, reward in zip(test_data, rewards):
+                print(
+                    "Evaluated level {} sample {}, accumulated reward:"
+                    " {}".format(sample.difficulty, sample.iteration, reward)
+                )
+
+
+if __name__ == "__main__":
+    main()
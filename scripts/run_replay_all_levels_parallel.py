@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Parallel version of "run_replay_all_levels.py".
+
+Reads the files generated by "run_evaluate_policy_all_levels.py" and replays
+the action logs to verify the result and to compute the total reward over all
+runs.
+
+Instead of running "replay_action_log.py" in a new process for each sample,
+the samples are distributed over a pool of persistent worker processes, each
+of which reuses one simulated platform for all its samples.  The resulting
+rewards and the report are the same as the ones of "run_replay_all_levels.py".
+"""
+import argparse
+import os
+import pickle
+import sys
+import typing
+
+import numpy as np
+
+from trifinger_simulation import replay
+from trifinger_simulation.tasks import move_cube
+
+
+class TestSample(typing.NamedTuple):
+    difficulty: int
+    iteration: int
+    init_pose_json: str
+    goal_pose_json: str
+    logfile: str
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "input_directory",
+        type=str,
+        help="Directory containing the generated log files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of worker processes.  Defaults to the number of CPUs.",
+    )
+    args = parser.parse_args()
+
+    try:
+        if not os.path.isdir(args.input_directory):
+            print(
+                "'{}' does not exist or is not a directory.".format(
+                    args.input_directory
+                )
+            )
+            sys.exit(1)
+
+        levels = (1, 2, 3, 4)
+
+        # load samples
+        sample_file = os.path.join(args.input_directory, "test_data.p")
+        with open(sample_file, "rb") as fh:
+            test_data = pickle.load(fh)
+
+        replay_samples = [
+            replay.ReplaySample(
+                sample.logfile,
+                sample.difficulty,
+                move_cube.Pose.from_json(sample.init_pose_json),
+                move_cube.Pose.from_json(sample.goal_pose_json),
+            )
+            for sample in test_data
+        ]
+
+        # replay all samples in parallel
+        level_rewards = {level: [] for level in levels}
+        replay_rewards = replay.replay_action_logs(replay_samples, args.jobs)
+        for sample, reward in zip(test_data, replay_rewards):
+            print(
+                "Replay level {} sample {}".format(
+                    sample.difficulty, sample.iteration
+                )
+            )
+            level_rewards[sample.difficulty].append(reward)
+
+        # report
+        print("\n=======================================================\n")
+
+        report = ""
+        total_reward = 0
+        for level, rewards in level_rewards.items():
+            rewards = np.asarray(rewards)
+            mean = rewards.mean()
+            report += "Level {} mean reward:\t{:.3f},\tstd: {:.3f}\n".format(
+                level, mean, rewards.std()
+            )
+            total_reward += level * mean
+
+        report += "-------------------------------------------------------\n"
+        report += "Total Weighted Reward: {:.3f}\n".format(total_reward)
+
+        print(report)
+
+        # save report to file
+        report_file = os.path.join(args.input_directory, "reward.txt")
+        with open(report_file, "w") as fh:
+            fh.write(report)
+
+    except Exception as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
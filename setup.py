@@ -18,7 +18,9 @@ d = generate_distutils_setup(
         "scripts/replay_action_log.py",
         "scripts/rrc_evaluate",
         "scripts/run_evaluate_policy_all_levels.py",
+        "scripts/run_evaluate_policy_all_levels_parallel.py",
         "scripts/run_replay_all_levels.py",
+        "scripts/run_replay_all_levels_parallel.py",
     ],
 )
 
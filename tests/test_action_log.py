@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+import gc
+import json
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import unittest
+import numpy as np
+
+from trifinger_simulation import TriFingerPlatform
+from trifinger_simulation.action_log import (
+    COLUMNS,
+    FORMAT_VERSION,
+    MAGIC,
+    _COLUMNS_V1,
+    ActionLog,
+    _write_header,
+    load_action_log,
+)
+from trifinger_simulation.tasks import move_cube
+
+
+class TestActionLog(unittest.TestCase):
+    """Test the action log of TriFingerPlatform."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.logfile = os.path.join(self.tmp_dir, "action_log.bin")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_store_and_load(self):
+        initial_object_pose = move_cube.Pose(
+            [0.05, 0.02, 0.0325], [0, 0, 0, 1]
+        )
+        platform = TriFingerPlatform(initial_object_pose=initial_object_pose)
+        # use a small chunk size to test the growth of the log
+        platform._action_log.chunk_size = 7
+
+        rng = np.random.RandomState(0)
+        expected = []
+        for i in range(30):
+            action = platform.Action(
+                torque=rng.uniform(-0.1, 0.1, size=9),
+                position=rng.uniform(-1, 1, size=9),
+            )
+            if i % 2:
+                action.position_kp = np.full(9, 5.0)
+            t = platform.append_desired_action(action)
+            expected.append(
+                (
+                    t,
+                    action,
+                    platform.get_object_pose(t),
+                    platform.get_robot_observation(t),
+                )
+            )
+        platform.store_action_log(self.logfile)
+
+        log = load_action_log(self.logfile)
+
+        np.testing.assert_array_equal(
+            log["initial_robot_position"],
+            TriFingerPlatform.spaces.robot_position.default,
+        )
+        np.testing.assert_array_equal(
+            log["initial_object_pose"].position, initial_object_pose.position
+        )
+        np.testing.assert_array_equal(
+            log["initial_object_pose"].orientation,
+            initial_object_pose.orientation,
+        )
+
+        self.assertEqual(len(log["actions"]), len(expected))
+        for logged, (t, action, object_pose, robot_obs) in zip(
+            log["actions"], expected
+        ):
+            self.assertEqual(logged["t"], t)
+            for attr in ("torque", "position", "position_kp", "position_kd"):
+                np.testing.assert_array_equal(
+                    getattr(logged["action"], attr), getattr(action, attr)
+                )
+            for attr in ("position", "orientation", "timestamp", "confidence"):
+                np.testing.assert_array_equal(
+                    getattr(logged["object_pose"], attr),
+                    getattr(object_pose, attr),
+                )
+            for attr in ("position", "velocity", "torque", "tip_force"):
+                np.testing.assert_array_equal(
+                    getattr(logged["robot_observation"], attr),
+                    getattr(robot_obs, attr),
+                )
+
+        self.assertEqual(log["final_object_pose"]["t"], t)
+        np.testing.assert_array_equal(
+            log["final_object_pose"]["pose"].position,
+            platform.get_object_pose(t).position,
+        )
+
+    def test_streaming(self):
+        initial_object_pose = move_cube.Pose(
+            [0.05, 0.02, 0.0325], [0, 0, 0, 1]
+        )
+        streamed_logfile = os.path.join(self.tmp_dir, "streamed.bin")
+        platforms = [
+            TriFingerPlatform(initial_object_pose=initial_object_pose),
+            TriFingerPlatform(
+                initial_object_pose=initial_object_pose,
+                action_log_file=streamed_logfile,
+            ),
+        ]
+        for platform in platforms:
+            platform._action_log.chunk_size = 7
+
+        streamed_log = platforms[1]._action_log
+        for i in range(30):
+            for platform in platforms:
+                platform.append_desired_action(
+                    platform.Action(torque=np.full(9, 0.01 * i))
+                )
+            # only the current chunk is kept in memory
+            self.assertLessEqual(len(streamed_log._chunks), 1)
+            self.assertEqual(len(streamed_log), i + 1)
+
+        # completed chunks can be read while the episode is still running
+        streamed_log._stream_writer.wait()
+        prefix = ActionLog.read(streamed_logfile)
+        self.assertEqual(len(prefix), 28)
+        self.assertIsNone(prefix.final_object_pose)
+
+        with self.assertRaises(RuntimeError):
+            streamed_log.get_column("t")
+
+        platforms[0].store_action_log(self.logfile)
+        platforms[1].store_action_log()
+
+        expected = ActionLog.read(self.logfile)
+        log = ActionLog.read(streamed_logfile)
+        self.assertEqual(len(log), 30)
+        for name in COLUMNS:
+            np.testing.assert_array_equal(
+                log.get_column(name), expected.get_column(name)
+            )
+        self.assertEqual(
+            log.final_object_pose["t"], expected.final_object_pose["t"]
+        )
+
+        # a different file cannot be used for a streamed log
+        with self.assertRaises(ValueError):
+            platforms[1].store_action_log(self.logfile)
+
+    def test_streaming_reset(self):
+        first_logfile = os.path.join(self.tmp_dir, "episode1.bin")
+        second_logfile = os.path.join(self.tmp_dir, "episode2.bin")
+        platform = TriFingerPlatform(action_log_file=first_logfile)
+        for i in range(10):
+            platform.append_desired_action(platform.Action())
+
+        # the log of the first episode must not be overwritten
+        with self.assertRaises(ValueError):
+            platform.reset()
+        with self.assertRaises(ValueError):
+            platform.reset(action_log_file=first_logfile)
+
+        platform.reset(action_log_file=second_logfile)
+        for i in range(5):
+            platform.append_desired_action(platform.Action())
+        platform.store_action_log()
+
+        self.assertEqual(len(ActionLog.read(first_logfile)), 10)
+        self.assertEqual(len(ActionLog.read(second_logfile)), 5)
+
+    def test_streaming_without_close(self):
+        streamed_logfile = os.path.join(self.tmp_dir, "streamed.bin")
+        platform = TriFingerPlatform(action_log_file=streamed_logfile)
+        platform._action_log.chunk_size = 7
+        for i in range(30):
+            platform.append_desired_action(
+                platform.Action(torque=np.full(9, 0.01 * i))
+            )
+
+        # the remaining steps are written when the platform is collected
+        del platform
+        gc.collect()
+
+        log = ActionLog.read(streamed_logfile)
+        self.assertEqual(len(log), 30)
+        np.testing.assert_array_equal(log.get_column("t"), np.arange(30))
+        self.assertIsNone(log.final_object_pose)
+
+    def test_truncated_file(self):
+        pose = move_cube.Pose([0, 0, 0.0325], [0, 0, 0, 1])
+        log = ActionLog(np.zeros(9), pose, chunk_size=10)
+        platform = TriFingerPlatform()
+        for t in range(25):
+            log.append(
+                t,
+                platform.Action(),
+                platform.get_object_pose(0),
+                platform.get_robot_observation(0),
+            )
+        log.write(self.logfile)
+
+        # cut off the end of the file, so the last chunk is incomplete
+        with open(self.logfile, "rb") as fh:
+            data = fh.read()
+        with open(self.logfile, "wb") as fh:
+            fh.write(data[:-100])
+
+        truncated_log = ActionLog.read(self.logfile)
+        self.assertEqual(len(truncated_log), 20)
+        np.testing.assert_array_equal(
+            truncated_log.get_column("t"), np.arange(20)
+        )
+        self.assertIsNone(truncated_log.final_object_pose)
+
+    def test_deterministic_overlapping_pairs(self):
+        # the setting of the platform is stored in the log
+        for deterministic in (False, True):
+            platform = TriFingerPlatform(
+                deterministic_overlapping_pairs=deterministic
+            )
+            platform.append_desired_action(platform.Action())
+            platform.store_action_log(self.logfile)
+            log = load_action_log(self.logfile)
+            self.assertIs(
+                log["deterministic_overlapping_pairs"], deterministic
+            )
+
+        # the setting is required in the header
+        header = json.dumps(
+            {
+                "n_joints": 9,
+                "initial_robot_position": [0.0] * 9,
+                "initial_object_pose": {
+                    "position": [0.0, 0.0, 0.0325],
+                    "orientation": [0.0, 0.0, 0.0, 1.0],
+                },
+            }
+        ).encode("utf-8")
+        with open(self.logfile, "wb") as fh:
+            fh.write(MAGIC)
+            fh.write(struct.pack("<II", FORMAT_VERSION, len(header)))
+            fh.write(header)
+        with self.assertRaises(KeyError):
+            load_action_log(self.logfile)
+
+    def test_without_tip_forces(self):
+        platform = TriFingerPlatform(compute_tip_forces=False)
+        t = platform.append_desired_action(platform.Action())
+        self.assertIsNone(platform.get_robot_observation(t).tip_force)
+        platform.store_action_log(self.logfile)
+
+        log = load_action_log(self.logfile)
+        self.assertIsNone(log["actions"][0]["robot_observation"].tip_force)
+
+    def test_read_version_1(self):
+        # files of version 1 do not have the columns that were added later
+        platform = TriFingerPlatform()
+        t = platform.append_desired_action(platform.Action())
+        platform.store_action_log(self.logfile)
+        log = ActionLog.read(self.logfile)
+
+        with open(self.logfile, "wb") as fh:
+            _write_header(
+                fh,
+                log.initial_robot_position,
+                log.initial_object_pose,
+                log.deterministic_overlapping_pairs,
+            )
+            fh.seek(len(MAGIC))
+            fh.write(struct.pack("<I", 1))
+            fh.seek(0, os.SEEK_END)
+            fh.write(b"CHNK")
+            fh.write(struct.pack("<I", len(log)))
+            for name in _COLUMNS_V1:
+                fh.write(log.get_column(name).tobytes())
+
+        log_v1 = ActionLog.read(self.logfile)
+        self.assertEqual(len(log_v1), 1)
+        for name in COLUMNS:
+            if name in _COLUMNS_V1:
+                np.testing.assert_array_equal(
+                    log_v1.get_column(name), log.get_column(name)
+                )
+            else:
+                self.assertTrue(np.isnan(log_v1.get_column(name)).all())
+        self.assertIsNone(log_v1[0]["robot_observation"].tip_force)
+        self.assertEqual(log_v1[0]["t"], t)
+
+    def test_load_pickle_log(self):
+        # logs of the old format are still supported
+        old_log = {
+            "initial_robot_position": np.zeros(9),
+            "initial_object_pose": None,
+            "actions": [],
+        }
+        with open(self.logfile, "wb") as fh:
+            pickle.dump(old_log, fh)
+
+        log = load_action_log(self.logfile)
+        np.testing.assert_array_equal(
+            log["initial_robot_position"], np.zeros(9)
+        )
+        self.assertEqual(log["actions"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+import pybullet
+
+from trifinger_simulation import camera, visual_objects
+from trifinger_simulation.tasks import move_cube
+
+
+def reference_rbg_to_bayer_bg(image):
+    """Straightforward per-pixel implementation of rbg_to_bayer_bg."""
+    bayer_img = np.zeros((image.shape[0], image.shape[1], 1), dtype=np.uint8)
+    channel_map = {(0, 0): 0, (1, 0): 1, (0, 1): 1, (1, 1): 2}
+    for r in range(image.shape[0]):
+        for c in range(image.shape[1]):
+            bayer_img[r, c] = image[r, c, channel_map[(r % 2, c % 2)]]
+    return bayer_img
+
+
+class TestCamera(unittest.TestCase):
+    """Test the camera module."""
+
+    def test_rbg_to_bayer_bg(self):
+        rng = np.random.RandomState(0)
+        # include odd sizes and an RGBA image
+        for shape in ((270, 270, 3), (5, 7, 3), (6, 3, 4)):
+            image = rng.randint(0, 256, size=shape, dtype=np.uint8)
+            expected = reference_rbg_to_bayer_bg(image)
+
+            bayer = camera.rbg_to_bayer_bg(image)
+            self.assertEqual(bayer.dtype, np.uint8)
+            np.testing.assert_array_equal(bayer, expected)
+
+            out = np.empty(shape[:2] + (1,), dtype=np.uint8)
+            result = camera.rbg_to_bayer_bg(image, out=out)
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(out, expected)
+
+        with self.assertRaises(ValueError):
+            camera.rbg_to_bayer_bg(image, out=np.empty((6, 3), np.uint8))
+        with self.assertRaises(ValueError):
+            camera.rbg_to_bayer_bg(image, out=np.empty((6, 3, 1), np.int32))
+
+    def test_get_bayer_images(self):
+        client = pybullet.connect(pybullet.DIRECT)
+        self.addCleanup(pybullet.disconnect, client)
+        visual_objects.CuboidMarker(
+            size=(0.065, 0.065, 0.065),
+            position=(0, 0, 0.05),
+            orientation=(0, 0, 0, 1),
+            color=(1, 0, 0, 1),
+            pybullet_client_id=client,
+        )
+
+        cameras = camera.TriFingerCameras(
+            image_size=(64, 48), physicsClientId=client
+        )
+        images = cameras.get_images()
+
+        out = [np.empty((48, 64, 1), dtype=np.uint8) for _ in range(3)]
+        bayer_images = cameras.get_bayer_images(out=out)
+        for image, bayer, o in zip(images, bayer_images, out):
+            self.assertIs(bayer, o)
+            np.testing.assert_array_equal(
+                bayer, reference_rbg_to_bayer_bg(image)
+            )
+
+        with self.assertRaises(ValueError):
+            cameras.get_bayer_images(out=out[:2])
+
+    def test_cache(self):
+        client = pybullet.connect(pybullet.DIRECT)
+        self.addCleanup(pybullet.disconnect, client)
+        marker = visual_objects.CuboidMarker(
+            size=(0.065, 0.065, 0.065),
+            position=(0, 0, 0.05),
+            orientation=(0, 0, 0, 1),
+            color=(1, 0, 0, 1),
+            pybullet_client_id=client,
+        )
+
+        uncached_cameras = camera.TriFingerCameras(
+            image_size=(64, 48), physicsClientId=client
+        )
+        cameras = camera.TriFingerCameras(
+            cache_tolerance=1e-3, image_size=(64, 48), physicsClientId=client
+        )
+
+        images = cameras.get_images()
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (0, 1))
+
+        # unchanged scene
+        np.testing.assert_array_equal(cameras.get_images(), images)
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (1, 1))
+
+        # change within the tolerance
+        marker.set_state((0.0005, 0, 0.05), (0, 0, 0, 1))
+        np.testing.assert_array_equal(cameras.get_images(), images)
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (2, 1))
+
+        # the Bayer images are based on the cached images as well
+        bayer_images = cameras.get_bayer_images()
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (3, 1))
+        for image, bayer in zip(images, bayer_images):
+            np.testing.assert_array_equal(
+                bayer, reference_rbg_to_bayer_bg(image)
+            )
+
+        # moving the object needs to result in new images
+        marker.set_state((0.05, 0, 0.05), (0, 0, 0, 1))
+        new_images = cameras.get_images()
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (3, 2))
+        self.assertFalse(np.array_equal(new_images, images))
+        np.testing.assert_array_equal(
+            new_images, uncached_cameras.get_images()
+        )
+
+        # so does adding a new object
+        visual_objects.CuboidMarker(
+            size=(0.02, 0.02, 0.02),
+            position=(0, 0.05, 0.05),
+            orientation=(0, 0, 0, 1),
+            color=(0, 0, 1, 1),
+            pybullet_client_id=client,
+        )
+        np.testing.assert_array_equal(
+            cameras.get_images(), uncached_cameras.get_images()
+        )
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (3, 3))
+
+        cameras.clear_cache()
+        cameras.get_images()
+        self.assertEqual((cameras.cache_hits, cameras.cache_misses), (3, 4))
+
+        # counters are not touched if the cache is disabled
+        uncached_cameras.get_images()
+        self.assertEqual(uncached_cameras.cache_hits, 0)
+        self.assertEqual(uncached_cameras.cache_misses, 0)
+
+    def test_render_channels(self):
+        client = pybullet.connect(pybullet.DIRECT)
+        self.addCleanup(pybullet.disconnect, client)
+        marker = visual_objects.CuboidMarker(
+            size=(0.065, 0.065, 0.065),
+            position=(0, 0, 0.05),
+            orientation=(0, 0, 0, 1),
+            color=(1, 0, 0, 1),
+            pybullet_client_id=client,
+        )
+
+        cameras = camera.TriFingerCameras(
+            channels=camera.CHANNELS,
+            image_size=(64, 48),
+            physicsClientId=client,
+        )
+        frames = cameras.render()
+        images = cameras.get_images()
+        self.assertEqual(len(frames), 3)
+        for frame, image, c in zip(frames, images, cameras.cameras):
+            np.testing.assert_array_equal(frame.rgb, image)
+            np.testing.assert_array_equal(
+                frame.bayer, reference_rbg_to_bayer_bg(image)
+            )
+            self.assertEqual(frame.depth.shape, (48, 64))
+            self.assertEqual(frame.segmentation.shape, (48, 64))
+
+            # the cube is visible at the projection of its center and the
+            # depth there is about the distance from the camera
+            pixels, _ = c.project_points([[0, 0, 0.05]])
+            x, y = pixels[0].astype(int)
+            is_cube = frame.segmentation == marker.body_id
+            self.assertTrue(is_cube[y, x])
+            self.assertTrue(np.all(frame.segmentation[~is_cube] == -1))
+            self.assertTrue(np.all(frame.depth[is_cube] < 1))
+            self.assertTrue(np.all(frame.depth[~is_cube] > 10))
+            camera_position = np.linalg.inv(
+                np.reshape(c._view_matrix, (4, 4)).T
+            )[:3, 3]
+            distance = np.linalg.norm(camera_position - [0, 0, 0.05])
+            self.assertLess(frame.depth[y, x], distance)
+            self.assertGreater(frame.depth[y, x], distance - 0.06)
+
+        # channels that are not requested are not set
+        frame = cameras.render(("depth",))[0]
+        self.assertIsNone(frame.rgb)
+        self.assertIsNone(frame.segmentation)
+        self.assertIsNone(frame.bayer)
+        np.testing.assert_allclose(frame.depth, frames[0].depth)
+
+        with self.assertRaises(ValueError):
+            cameras.render(("rgb", "infrared"))
+
+    def test_roi(self):
+        client = pybullet.connect(pybullet.DIRECT)
+        self.addCleanup(pybullet.disconnect, client)
+        visual_objects.CuboidMarker(
+            size=(0.065, 0.065, 0.065),
+            position=(0, 0, 0.05),
+            orientation=(0, 0, 0, 1),
+            color=(1, 0, 0, 1),
+            pybullet_client_id=client,
+        )
+
+        image_sizes = [(64, 48), (80, 60), (64, 48)]
+        rois = [(10, 6, 32, 24), None, (0, 24, 64, 24)]
+        full_cameras = camera.TriFingerCameras(
+            image_sizes=image_sizes, physicsClientId=client
+        )
+        cameras = camera.TriFingerCameras(
+            image_sizes=image_sizes, rois=rois, physicsClientId=client
+        )
+
+        full_images = full_cameras.get_images()
+        images = cameras.get_images()
+        for image, full_image, roi in zip(images, full_images, rois):
+            if roi is None:
+                expected = full_image
+            else:
+                x, y, width, height = roi
+                expected = full_image[y : y + height, x : x + width]
+            self.assertEqual(image.shape, expected.shape)
+            # allow some differences at edges due to rasterization
+            self.assertLess(
+                np.mean(np.any(image != expected, axis=-1)), 0.02
+            )
+
+        # projected points are in the coordinates of the region of interest
+        full_pixels, _ = full_cameras.project_points([[0, 0, 0.05]])
+        pixels, _ = cameras.project_points([[0, 0, 0.05]])
+        for i, roi in enumerate(rois):
+            offset = (0, 0) if roi is None else roi[:2]
+            np.testing.assert_allclose(pixels[i], full_pixels[i] - offset)
+
+        with self.assertRaises(ValueError):
+            camera.Camera(
+                (0, 0, 1),
+                (0, 0, 0, 1),
+                image_size=(64, 48),
+                roi=(40, 0, 32, 24),
+                physicsClientId=client,
+            )
+
+    def test_project_points(self):
+        client = pybullet.connect(pybullet.DIRECT)
+        self.addCleanup(pybullet.disconnect, client)
+        cameras = camera.TriFingerCameras(physicsClientId=client)
+
+        # the projected points need to be on small markers in the images
+        points = np.array(
+            [[0.05, 0.03, 0.05], [-0.06, 0.02, 0.02], [0.0, -0.08, 0.1]]
+        )
+        for point in points:
+            visual_objects.CuboidMarker(
+                size=(0.006, 0.006, 0.006),
+                position=point,
+                orientation=(0, 0, 0, 1),
+                color=(1, 0, 0, 1),
+                pybullet_client_id=client,
+            )
+        images = cameras.get_images()
+
+        pixels, visible = cameras.project_points(points)
+        self.assertEqual(pixels.shape, (3, 3, 2))
+        self.assertTrue(np.all(visible))
+        for image, camera_pixels in zip(images, pixels):
+            for x, y in camera_pixels.astype(int):
+                red, green, blue = image[y, x]
+                self.assertGreater(red, 100)
+                self.assertEqual(green, 0)
+                self.assertEqual(blue, 0)
+
+        # same for the single cameras
+        for i, c in enumerate(cameras.cameras):
+            camera_pixels, camera_visible = c.project_points(points)
+            np.testing.assert_array_equal(camera_pixels, pixels[i])
+            np.testing.assert_array_equal(camera_visible, visible[i])
+
+        # points outside of the images or behind the cameras are not visible
+        _, visible = cameras.project_points([[2, 0, 0], [0, 0, 5]])
+        self.assertFalse(np.any(visible))
+
+        # batches of time steps
+        rng = np.random.RandomState(0)
+        batch = rng.uniform(-0.1, 0.1, size=(4, 5, 3))
+        pixels, visible = cameras.project_points(batch)
+        self.assertEqual(pixels.shape, (3, 4, 5, 2))
+        self.assertEqual(visible.shape, (3, 4, 5))
+        for i in range(4):
+            np.testing.assert_allclose(
+                pixels[:, i], cameras.project_points(batch[i])[0]
+            )
+
+    def test_project_keypoints(self):
+        cameras = camera.TriFingerCameras()
+
+        rng = np.random.RandomState(0)
+        positions = rng.uniform(-0.1, 0.1, size=(4, 3))
+        orientations = rng.normal(size=(4, 4))
+        orientations /= np.linalg.norm(orientations, axis=1, keepdims=True)
+        tips = rng.uniform(-0.1, 0.1, size=(4, 3, 3))
+
+        pixels, visible = cameras.project_keypoints(
+            positions, orientations, tips
+        )
+        self.assertEqual(pixels.shape, (3, 4, 11, 2))
+        self.assertEqual(visible.shape, (3, 4, 11))
+
+        for i in range(4):
+            corners = move_cube.get_cube_corner_positions(
+                move_cube.Pose(positions[i], orientations[i])
+            )
+            expected, _ = cameras.project_points(
+                np.concatenate([corners, tips[i]])
+            )
+            np.testing.assert_allclose(pixels[:, i], expected)
+
+            # single time step
+            np.testing.assert_allclose(
+                cameras.project_keypoints(
+                    positions[i], orientations[i], tips[i]
+                )[0],
+                expected,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import unittest
+from collections import namedtuple
+import numpy as np
+
+from trifinger_simulation import TriFingerPlatform, camera_rendering
+
+
+class TestCameraRendering(unittest.TestCase):
+    """Test the camera_rendering module."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_render_action_log(self):
+        # The images rendered from the log need to be the same as the ones
+        # rendered during the episode.
+        Pose = namedtuple("Pose", ["position", "orientation"])
+        pose = Pose([0.05, -0.02, 0.0325], [0, 0, 0.2084599, 0.97803091])
+        platform = TriFingerPlatform(
+            enable_cameras=True, initial_object_pose=pose
+        )
+
+        rng = np.random.RandomState(0)
+        expected_images = []
+        expected_time_indices = []
+        for _ in range(110):
+            t = platform.append_desired_action(
+                platform.Action(torque=rng.uniform(-0.3, 0.3, size=9))
+            )
+            # camera updates are every 25 steps
+            if t % 25 == 0:
+                observation = platform.get_camera_observation(t)
+                expected_images.append([c.image for c in observation.cameras])
+                expected_time_indices.append(t)
+
+        logfile = os.path.join(self.tmp_dir, "action_log.bin")
+        platform.store_action_log(logfile)
+
+        output_dir = os.path.join(self.tmp_dir, "images")
+        images, time_indices = camera_rendering.render_action_log(
+            logfile, output_dir, n_workers=2, chunk_size=2
+        )
+
+        np.testing.assert_array_equal(time_indices, expected_time_indices)
+        self.assertEqual(images.shape, (5, 3, 270, 270, 3))
+        np.testing.assert_array_equal(images, expected_images)
+
+        # the output is stored on disk
+        np.testing.assert_array_equal(
+            np.load(
+                os.path.join(output_dir, camera_rendering.IMAGES_FILENAME)
+            ),
+            images,
+        )
+        np.testing.assert_array_equal(
+            np.load(
+                os.path.join(
+                    output_dir, camera_rendering.TIME_INDICES_FILENAME
+                )
+            ),
+            time_indices,
+        )
+
+        # other rate and resolution
+        images, time_indices = camera_rendering.render_action_log(
+            logfile,
+            output_dir,
+            rate_fps=5,
+            n_workers=1,
+            image_size=(64, 48),
+        )
+        np.testing.assert_array_equal(time_indices, [0, 50, 100])
+        self.assertEqual(images.shape, (3, 3, 48, 64, 3))
+
+        # rates that do not divide the camera rate are rendered at the
+        # closest camera update
+        _, time_indices = camera_rendering.render_action_log(
+            logfile, output_dir, rate_fps=3, n_workers=1, image_size=(8, 8)
+        )
+        np.testing.assert_array_equal(time_indices, [0, 75])
+
+        # object poses are only logged with the camera rate, so higher rates
+        # are not supported
+        for rate_fps in (0, 20):
+            with self.assertRaises(ValueError):
+                camera_rendering.render_action_log(
+                    logfile, output_dir, rate_fps=rate_fps
+                )
+
+        # all cameras need to have the same image size
+        with self.assertRaises(ValueError):
+            camera_rendering.render_action_log(
+                logfile, output_dir, image_sizes=[(64, 48)] * 3
+            )
+        with self.assertRaises(ValueError):
+            camera_rendering.render_action_log(
+                logfile, output_dir, rois=[(0, 0, 10, 10)] * 3
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
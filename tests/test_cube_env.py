@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import unittest
+import numpy as np
 
 from trifinger_simulation.gym_wrapper.envs import cube_env
 
@@ -25,6 +26,145 @@ class TestSample(unittest.TestCase):
                 msg="Invalid observation: {}".format(observation),
             )
 
+    def test_reuse_platform(self):
+        # Episodes of an environment that reuses the platform need to be the
+        # same as with a new platform (with the same settings) in every
+        # reset.
+        initializer = cube_env.RandomInitializer(4)
+
+        def run_episodes(new_platform):
+            env = cube_env.CubeEnv(initializer, reuse_platform=True)
+            env.seed(42)
+            env.action_space.seed(42)
+
+            observations = []
+            for _ in range(3):
+                if new_platform:
+                    env.platform = None
+                observation = env.reset()
+                for _ in range(200):
+                    observation, _, _, _ = env.step(env.action_space.sample())
+                    observations.append(
+                        np.concatenate(
+                            [
+                                observation["observation"]["position"],
+                                observation["observation"]["velocity"],
+                                observation["achieved_goal"]["position"],
+                                observation["achieved_goal"]["orientation"],
+                            ]
+                        )
+                    )
+            return np.array(observations)
+
+        np.testing.assert_array_equal(
+            run_episodes(new_platform=True),
+            run_episodes(new_platform=False),
+        )
+
+    def test_seed(self):
+        # Environments in the same process need to have independent random
+        # number generators, so interleaved resets do not affect each other.
+        def sample_goals(envs, n_resets):
+            goals = {env: [] for env in envs}
+            for _ in range(n_resets):
+                for env in envs:
+                    env.reset()
+                    goals[env].append(
+                        np.concatenate(
+                            [env.goal["position"], env.goal["orientation"]]
+                        )
+                    )
+            return [np.array(goals[env]) for env in envs]
+
+        initializer = cube_env.RandomInitializer(4)
+        env_a = cube_env.CubeEnv(initializer, reuse_platform=True)
+        env_b = cube_env.CubeEnv(initializer, reuse_platform=True)
+
+        env_a.seed(1)
+        (goals_a_alone,) = sample_goals([env_a], 3)
+
+        env_a.seed(1)
+        env_b.seed(2)
+        goals_a, goals_b = sample_goals([env_a, env_b], 3)
+
+        np.testing.assert_array_equal(goals_a, goals_a_alone)
+        self.assertFalse(np.array_equal(goals_a, goals_b))
+
+    def test_initializer_without_rng(self):
+        # initializers with the old signature are still supported
+        pose = cube_env.move_cube.Pose([0, 0, 0.0325], [0, 0, 0, 1])
+
+        class OldInitializer:
+            difficulty = 1
+
+            def get_initial_state(self):
+                return pose
+
+            def get_goal(self):
+                return pose
+
+        with self.assertWarns(DeprecationWarning):
+            poses = cube_env.sample_from_initializer(
+                OldInitializer(), np.random.RandomState(0)
+            )
+        self.assertIs(poses[0], pose)
+        self.assertIs(poses[1], pose)
+
+        env = cube_env.CubeEnv(OldInitializer())
+        with self.assertWarns(DeprecationWarning):
+            env.reset()
+        np.testing.assert_array_equal(env.goal["position"], pose.position)
+
+    def test_compute_reward_batch(self):
+        # the batched reward needs to match the one of single goals
+        env = cube_env.CubeEnv(cube_env.RandomInitializer(4))
+        rng = np.random.RandomState(0)
+
+        n = 50
+        achieved_goals = []
+        desired_goals = []
+        infos = []
+        for i in range(n):
+            for goals in (achieved_goals, desired_goals):
+                goals.append(
+                    {
+                        "position": rng.uniform(-0.2, 0.2, size=3),
+                        "orientation": rng.normal(size=4),
+                    }
+                )
+            infos.append({"difficulty": i % 4 + 1})
+
+        def stack(goals, indices):
+            return {
+                key: np.array([goals[i][key] for i in indices])
+                for key in ("position", "orientation")
+            }
+
+        expected = np.array(
+            [
+                env.compute_reward(a, d, info)
+                for a, d, info in zip(achieved_goals, desired_goals, infos)
+            ]
+        )
+
+        # mixed difficulties with one info per goal
+        rewards = env.compute_reward(
+            stack(achieved_goals, range(n)),
+            stack(desired_goals, range(n)),
+            infos,
+        )
+        self.assertEqual(rewards.shape, (n,))
+        np.testing.assert_allclose(rewards, expected, atol=1e-12)
+
+        # a single info for all goals
+        level_4 = [i for i in range(n) if infos[i]["difficulty"] == 4]
+        rewards = env.compute_reward(
+            stack(achieved_goals, level_4),
+            stack(desired_goals, level_4),
+            {"difficulty": 4},
+        )
+        np.testing.assert_allclose(rewards, expected[level_4], atol=1e-12)
+
 
 if __name__ == "__main__":
     unittest.main()
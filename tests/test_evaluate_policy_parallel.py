@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+import importlib.util
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+from trifinger_simulation.action_log import ActionLog, COLUMNS
+from trifinger_simulation.tasks import move_cube
+
+
+SCRIPT_DIR = os.path.join(os.path.dirname(__file__), "..", "scripts")
+
+
+def import_script(name):
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(SCRIPT_DIR, name + ".py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Evaluation script that uses evaluate_policy.py with a deterministic policy
+# and short episodes, so that the results can be compared.
+POLICY_SCRIPT = """#!{python}
+import importlib.util
+
+import numpy as np
+
+from trifinger_simulation.tasks import move_cube
+
+move_cube.episode_length = {episode_length}
+
+_spec = importlib.util.spec_from_file_location(
+    "evaluate_policy", {evaluate_policy!r}
+)
+evaluate_policy = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(evaluate_policy)
+
+
+class ConstantPolicy:
+    def __init__(self, action_space):
+        self.action = np.array([0.0, 0.9, -1.7] * 3, dtype=action_space.dtype)
+
+    def predict(self, observation):
+        return self.action
+
+
+def make_policy(env, difficulty):
+    return ConstantPolicy(env.action_space)
+
+
+evaluate_policy.make_policy = make_policy
+make_env = evaluate_policy.make_env
+run_episode = evaluate_policy.run_episode
+
+if __name__ == "__main__":
+    evaluate_policy.main()
+"""
+
+
+class TestEvaluatePolicyParallel(unittest.TestCase):
+    """Test the worker path of run_evaluate_policy_all_levels_parallel.py."""
+
+    episode_length = 30
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        self._original_episode_length = move_cube.episode_length
+
+        self.policy_script = os.path.join(self.tmp_dir, "evaluate_policy.py")
+        with open(self.policy_script, "w") as fh:
+            fh.write(
+                POLICY_SCRIPT.format(
+                    python=sys.executable,
+                    episode_length=self.episode_length,
+                    evaluate_policy=os.path.abspath(
+                        os.path.join(SCRIPT_DIR, "evaluate_policy.py")
+                    ),
+                )
+            )
+        os.chmod(self.policy_script, 0o755)
+
+        self.parallel = import_script(
+            "run_evaluate_policy_all_levels_parallel"
+        )
+        self.parallel._init_worker(self.policy_script)
+        self.parallel._policy_module = None
+        self.parallel._envs_and_policies.clear()
+
+    def tearDown(self):
+        move_cube.episode_length = self._original_episode_length
+        shutil.rmtree(self.tmp_dir)
+
+    def evaluate_in_subprocess(self, sample):
+        """Run the evaluation script in a new process like --isolated."""
+        result = subprocess.run(
+            [
+                self.policy_script,
+                str(sample.difficulty),
+                sample.init_pose_json,
+                sample.goal_pose_json,
+                sample.logfile,
+            ],
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        match = re.search(r"Accumulated reward: (\S+)", result.stdout)
+        return float(match.group(1))
+
+    def test_worker_matches_evaluate_policy(self):
+        # two samples of the same level, so the worker reuses environment and
+        # policy
+        move_cube.random.seed(0)
+        samples = self.parallel.generate_test_set(
+            [1],
+            2,
+            os.path.join(self.tmp_dir, "worker_l{level}_i{iteration}.bin"),
+        )
+        self.assertNotEqual(
+            samples[0].init_pose_json, samples[1].init_pose_json
+        )
+
+        worker_rewards = [
+            self.parallel._evaluate_in_worker(sample) for sample in samples
+        ]
+        self.assertEqual(len(self.parallel._envs_and_policies), 1)
+
+        for sample, worker_reward in zip(samples, worker_rewards):
+            script_sample = sample._replace(
+                logfile=sample.logfile.replace("worker", "script")
+            )
+            script_reward = self.evaluate_in_subprocess(script_sample)
+            self.assertEqual(worker_reward, script_reward)
+
+            worker_log = ActionLog.read(sample.logfile)
+            script_log = ActionLog.read(script_sample.logfile)
+            self.assertEqual(len(worker_log), self.episode_length)
+            self.assertEqual(len(worker_log), len(script_log))
+            self.assertEqual(
+                worker_log.deterministic_overlapping_pairs,
+                script_log.deterministic_overlapping_pairs,
+            )
+            for name in COLUMNS:
+                np.testing.assert_array_equal(
+                    worker_log.get_column(name),
+                    script_log.get_column(name),
+                    err_msg=name,
+                )
+            self.assertEqual(
+                worker_log.final_object_pose["t"],
+                script_log.final_object_pose["t"],
+            )
+            np.testing.assert_array_equal(
+                worker_log.final_object_pose["pose"].position,
+                script_log.final_object_pose["pose"].position,
+            )
+            np.testing.assert_array_equal(
+                worker_log.final_object_pose["pose"].orientation,
+                script_log.final_object_pose["pose"].orientation,
+            )
+
+    def test_worker_uses_default_physics(self):
+        # the worker keeps the environment but not the simulation, so it has
+        # the physics of a new simulation per episode
+        pose = move_cube.Pose(
+            np.array([0, 0, 0.0325]), np.array([0, 0, 0, 1])
+        )
+        self.parallel._evaluate_in_worker(
+            self.parallel.TestSample(
+                1,
+                0,
+                pose.to_json(),
+                pose.to_json(),
+                os.path.join(self.tmp_dir, "log.bin"),
+            )
+        )
+        env, _ = self.parallel._envs_and_policies[1]
+        self.assertFalse(env.unwrapped.reuse_platform)
+        self.assertFalse(
+            env.unwrapped.platform.deterministic_overlapping_pairs
+        )
+
+if __name__ == "__main__":
+    unittest.main()
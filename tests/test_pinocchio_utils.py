@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from trifinger_simulation import finger_types_data
+from trifinger_simulation.pinocchio_utils import Kinematics
+from trifinger_simulation.sim_finger import SimFinger
+
+
+class TestKinematics(unittest.TestCase):
+    """Test the Kinematics class of pinocchio_utils."""
+
+    def test_forward_kinematics_batch(self):
+        rng = np.random.RandomState(42)
+        for finger_type in ("fingerone", "trifingerpro"):
+            kinematics = SimFinger(finger_type=finger_type).kinematics
+            n_joints = kinematics.robot_model.nq
+
+            joint_positions = rng.uniform(-1.5, 1.5, size=(20, n_joints))
+            tip_positions = kinematics.forward_kinematics_batch(
+                joint_positions
+            )
+
+            self.assertEqual(
+                tip_positions.shape, (20, len(kinematics.tip_link_ids), 3)
+            )
+            for q, tips in zip(joint_positions, tip_positions):
+                np.testing.assert_array_equal(
+                    tips, kinematics.forward_kinematics(q)
+                )
+
+    def test_numpy_backend(self):
+        # the analytical forward kinematics needs to match pinocchio
+        rng = np.random.RandomState(42)
+        for finger_type in finger_types_data.get_valid_finger_types():
+            finger = SimFinger(finger_type=finger_type)
+            kinematics = Kinematics(
+                finger.finger_urdf_path, finger.tip_link_names, backend="numpy"
+            )
+            n_joints = kinematics.robot_model.nq
+
+            joint_positions = rng.uniform(-np.pi, np.pi, size=(1000, n_joints))
+            np.testing.assert_allclose(
+                kinematics.forward_kinematics_batch(joint_positions),
+                finger.kinematics.forward_kinematics_batch(joint_positions),
+                rtol=0,
+                atol=1e-9,
+                err_msg=finger_type,
+            )
+            tip_positions = kinematics.forward_kinematics(joint_positions[0])
+            np.testing.assert_allclose(
+                tip_positions,
+                finger.kinematics.forward_kinematics(joint_positions[0]),
+                rtol=0,
+                atol=1e-9,
+                err_msg=finger_type,
+            )
+            # same return type as the pinocchio backend
+            self.assertIsInstance(tip_positions, list)
+            for tip in tip_positions:
+                self.assertIsInstance(tip, np.ndarray)
+
+    def test_invalid_backend(self):
+        finger = SimFinger(finger_type="fingerone")
+        with self.assertRaises(ValueError):
+            Kinematics(
+                finger.finger_urdf_path, finger.tip_link_names, backend="foo"
+            )
+
+    def test_inverse_kinematics_batch(self):
+        kinematics = SimFinger(finger_type="trifingerpro").kinematics
+        initial_position = np.array([0, 0.9, -1.7] * 3)
+
+        # use targets that are known to be reachable
+        rng = np.random.RandomState(42)
+        joint_positions = initial_position + rng.uniform(
+            -0.5, 0.5, size=(50, 9)
+        )
+        targets = kinematics.forward_kinematics_batch(joint_positions)
+
+        tolerance = 1e-4
+        q, errors, iterations = kinematics.inverse_kinematics_batch(
+            targets, initial_position, tolerance=tolerance
+        )
+
+        self.assertEqual(q.shape, (50, 9))
+        self.assertEqual(errors.shape, (50, 3, 3))
+        self.assertEqual(iterations.shape, (50,))
+        self.assertTrue(np.all(np.linalg.norm(errors, axis=-1) < tolerance))
+        self.assertTrue(np.all(iterations < 1000))
+        np.testing.assert_allclose(
+            kinematics.forward_kinematics_batch(q),
+            targets,
+            rtol=0,
+            atol=tolerance,
+        )
+
+        # an unreachable target does not converge
+        unreachable_targets = targets[:1].copy()
+        unreachable_targets[0, 0] = [1.0, 1.0, 1.0]
+        _, errors, iterations = kinematics.inverse_kinematics_batch(
+            unreachable_targets, initial_position, max_iterations=100
+        )
+        self.assertGreater(np.linalg.norm(errors[0, 0]), 0.005)
+        self.assertEqual(iterations[0], 100)
+
+    def test_inverse_kinematics(self):
+        kinematics = SimFinger(finger_type="trifingerpro").kinematics
+        initial_position = np.array([0, 0.9, -1.7] * 3)
+        targets = kinematics.forward_kinematics(
+            initial_position + [0.2, -0.1, 0.3] * 3
+        )
+
+        q, errors = kinematics.inverse_kinematics(targets, initial_position)
+
+        self.assertEqual(len(errors), 3)
+        for error in errors:
+            self.assertLess(np.linalg.norm(error), 0.005)
+        np.testing.assert_allclose(
+            kinematics.forward_kinematics(q), targets, rtol=0, atol=0.005
+        )
+
+    def test_warm_start(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+
+        kinematics = SimFinger(finger_type="trifingerpro").kinematics
+        kinematics.enable_warm_start(resolution=10, cache_dir=cache_dir)
+
+        # the table is cached and loaded from there by the next instance
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        other_kinematics = SimFinger(finger_type="trifingerpro").kinematics
+        other_kinematics.enable_warm_start(resolution=10, cache_dir=cache_dir)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+        np.testing.assert_array_equal(
+            other_kinematics.warm_start_table.tip_positions,
+            kinematics.warm_start_table.tip_positions,
+        )
+
+        # targets all over the workspace
+        rng = np.random.RandomState(42)
+        joint_positions = rng.uniform(
+            kinematics.robot_model.lowerPositionLimit,
+            kinematics.robot_model.upperPositionLimit,
+            size=(100, 9),
+        )
+        targets = kinematics.forward_kinematics_batch(joint_positions)
+
+        # without enabling it, no table is used (or built)
+        fresh_kinematics = SimFinger(finger_type="trifingerpro").kinematics
+        _, errors, _ = fresh_kinematics.inverse_kinematics_batch(targets)
+        self.assertIsNone(fresh_kinematics.warm_start_table)
+        self.assertTrue(np.all(np.linalg.norm(errors, axis=-1) < 0.005))
+
+        # guesses are taken from the table if none are given
+        _, errors, iterations = kinematics.inverse_kinematics_batch(targets)
+        self.assertTrue(np.all(np.linalg.norm(errors, axis=-1) < 0.005))
+
+        _, _, cold_iterations = kinematics.inverse_kinematics_batch(
+            targets, np.array([0, 0.9, -1.7] * 3)
+        )
+        self.assertLess(iterations.mean(), cold_iterations.mean())
+
+    def test_forward_kinematics_batch_invalid_shape(self):
+        kinematics = SimFinger(finger_type="trifingerpro").kinematics
+        with self.assertRaises(ValueError):
+            kinematics.forward_kinematics_batch(np.zeros(9))
+
+
+if __name__ == "__main__":
+    unittest.main()
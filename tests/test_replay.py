@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+
+from trifinger_simulation import TriFingerPlatform, replay
+from trifinger_simulation.tasks import move_cube
+
+
+class TestReplay(unittest.TestCase):
+    """Test replaying action logs, sequentially and in parallel."""
+
+    episode_length = 50
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+        # generate a few logs with different initial poses and actions
+        rng = np.random.RandomState(42)
+        self.samples = []
+        for i in range(3):
+            initial_pose = move_cube.Pose(
+                [0.02 * i, -0.01 * i, 0.0325], [0, 0, 0, 1]
+            )
+            goal_pose = move_cube.Pose([0, 0.05, 0.0325], [0, 0, 0, 1])
+            logfile = os.path.join(self.tmp_dir, "log_{}.bin".format(i))
+
+            platform = TriFingerPlatform(
+                initial_object_pose=initial_pose,
+                deterministic_overlapping_pairs=True,
+            )
+            for _ in range(self.episode_length):
+                platform.append_desired_action(
+                    platform.Action(torque=rng.uniform(-0.2, 0.2, size=9))
+                )
+            platform.store_action_log(logfile)
+
+            self.samples.append(
+                replay.ReplaySample(logfile, i + 1, initial_pose, goal_pose)
+            )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def replay_sequential(self, platform=None):
+        return [
+            replay.replay_action_log(
+                *sample,
+                platform=platform,
+                episode_length=self.episode_length
+            )
+            for sample in self.samples
+        ]
+
+    def test_reuse_platform(self):
+        expected_rewards = self.replay_sequential()
+        rewards = self.replay_sequential(
+            TriFingerPlatform(deterministic_overlapping_pairs=True)
+        )
+        self.assertEqual(rewards, expected_rewards)
+
+        # a platform with a different setting cannot be reused
+        rewards = self.replay_sequential(TriFingerPlatform())
+        self.assertEqual(rewards, expected_rewards)
+
+    def test_replay_baseline_log(self):
+        # Log in the old pickle format, recorded with a platform without
+        # deterministic overlapping pairs.  It needs to be replayed with the
+        # same physics.
+        logfile = os.path.join(
+            os.path.dirname(__file__), "data", "baseline_action_log.pkl"
+        )
+        pose = move_cube.Pose(
+            [0.02, -0.01, 0.0325], [0, 0, 0.2084599, 0.97803091]
+        )
+        for platform in (
+            None,
+            TriFingerPlatform(deterministic_overlapping_pairs=True),
+        ):
+            reward = replay.replay_action_log(
+                logfile, 1, pose, pose, platform=platform, episode_length=200
+            )
+            self.assertLess(reward, 0)
+
+    def test_parallel_replay(self):
+        expected_rewards = self.replay_sequential()
+        rewards = list(
+            replay.replay_action_logs(
+                self.samples, n_workers=2, episode_length=self.episode_length
+            )
+        )
+        self.assertEqual(rewards, expected_rewards)
+
+    def test_parallel_replay_failure(self):
+        # replay with a wrong initial pose needs to fail
+        sample = self.samples[1]._replace(
+            initial_pose=move_cube.Pose([0.1, 0.1, 0.0325], [0, 0, 0, 1])
+        )
+        with self.assertRaises(RuntimeError):
+            list(
+                replay.replay_action_logs(
+                    [self.samples[0], sample],
+                    n_workers=2,
+                    episode_length=self.episode_length,
+                )
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
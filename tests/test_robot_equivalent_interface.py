@@ -170,6 +170,35 @@ class TestRobotEquivalentInterface(unittest.TestCase):
         self.assertIsInstance(obs.velocity, np.ndarray)
         self.assertIsInstance(obs.tip_force, np.ndarray)
 
+    def test_observation_is_writable(self):
+        """Verify that observations are independent, writable copies."""
+        t = self.finger.append_desired_action(self.finger.Action())
+        obs = self.finger.get_observation(t + 1)
+        position = obs.position.copy()
+        velocity = obs.velocity.copy()
+
+        # modifying the observation must be possible and must not affect the
+        # state of the simulation
+        obs.position += 1.0
+        obs.velocity[:] = 0.0
+        np.testing.assert_array_equal(
+            self.finger.get_observation(t + 1).position, position
+        )
+        np.testing.assert_array_equal(
+            self.finger.get_observation(t + 1).velocity, velocity
+        )
+
+        # later steps must not change the observation
+        for _ in range(10):
+            t = self.finger.append_desired_action(
+                self.finger.Action(torque=[0.2, 0.2, 0.2])
+            )
+        self.assertFalse(
+            np.array_equal(self.finger.get_observation(t).position, position)
+        )
+        np.testing.assert_array_equal(obs.position, position + 1.0)
+        np.testing.assert_array_equal(obs.velocity, 0.0)
+
     def test_get_desired_action(self):
         # verify that t < 0 is not accepted
         with self.assertRaises(ValueError):
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 import unittest
+import numpy as np
 from numpy.testing.utils import assert_array_compare
 import operator
 
 from trifinger_simulation import sample
+from trifinger_simulation.sim_finger import SimFinger
 
 
 def assert_array_less_equal(x, y, err_msg="", verbose=True):
@@ -44,6 +46,95 @@ class TestSample(unittest.TestCase):
             assert_array_less_equal(lower_bounds * 3, result)
             assert_array_less_equal(result, upper_bounds * 3)
 
+    def test_feasible_random_joint_positions_for_reaching(self):
+        finger = SimFinger(finger_type="trifingerone")
+        # same bounds as used by the TriFingerReach environment
+        action_bounds = {
+            "low": np.deg2rad([-70, -70, -160] * 3),
+            "high": np.deg2rad([70, 0, -2] * 3),
+        }
+
+        def is_feasible(joint_positions):
+            tips = finger.kinematics.forward_kinematics(
+                np.concatenate([joint_positions] * 3)
+            )
+            dist_to_center = np.linalg.norm(tips[0][:2])
+            angle = np.arccos(tips[0][0] / dist_to_center)
+            return (
+                np.pi / 6 < angle < 5 / 6 * np.pi
+                and tips[0][1] > 0
+                and 0.02 < dist_to_center < 0.2
+            )
+
+        single = sample.feasible_random_joint_positions_for_reaching(
+            finger, action_bounds
+        )
+        self.assertEqual(np.shape(single), (9,))
+
+        batch = sample.feasible_random_joint_positions_for_reaching(
+            finger, action_bounds, number_of_samples=100
+        )
+        self.assertEqual(batch.shape, (100, 9))
+
+        for joint_positions in np.concatenate([[single], batch]):
+            assert_array_less_equal(action_bounds["low"], joint_positions)
+            assert_array_less_equal(joint_positions, action_bounds["high"])
+            for finger_joint_positions in joint_positions.reshape(3, 3):
+                self.assertTrue(is_feasible(finger_joint_positions))
+
+        # samples of the global generator are reproducible after re-seeding
+        def draw():
+            np.random.seed(0)
+            return [
+                sample.feasible_random_joint_positions_for_reaching(
+                    finger, action_bounds
+                )
+                for _ in range(10)
+            ]
+
+        np.testing.assert_array_equal(draw(), draw())
+
+        # the pool needs an explicit generator and is only reproducible after
+        # clearing it
+        with self.assertRaises(ValueError):
+            sample.feasible_random_joint_positions_for_reaching(
+                finger, action_bounds, use_pool=True
+            )
+
+        rng = np.random.RandomState(42)
+
+        def draw_with_pool():
+            rng.seed(42)
+            sample.clear_sample_pool(finger)
+            return [
+                sample.feasible_random_joint_positions_for_reaching(
+                    finger, action_bounds, rng=rng, use_pool=True
+                )
+                for _ in range(10)
+            ]
+
+        pooled_samples = draw_with_pool()
+        np.testing.assert_array_equal(draw_with_pool(), pooled_samples)
+        for joint_positions in pooled_samples:
+            for finger_joint_positions in joint_positions.reshape(3, 3):
+                self.assertTrue(is_feasible(finger_joint_positions))
+
+        # the same with an explicit generator
+        np.testing.assert_array_equal(
+            sample.feasible_random_joint_positions_for_reaching(
+                finger,
+                action_bounds,
+                number_of_samples=5,
+                rng=np.random.RandomState(42),
+            ),
+            sample.feasible_random_joint_positions_for_reaching(
+                finger,
+                action_bounds,
+                number_of_samples=5,
+                rng=np.random.RandomState(42),
+            ),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+
+from trifinger_simulation import SharedWorld, TriFingerPlatform
+from trifinger_simulation.tasks import move_cube
+
+
+class TestSharedWorld(unittest.TestCase):
+    """Test multiple platforms in one shared world."""
+
+    def test_same_as_separate_platforms(self):
+        # Platforms in a shared world need to behave like platforms with
+        # their own simulation (up to numerical differences due to the
+        # different positions in the world).
+        n_platforms = 3
+        poses = [
+            move_cube.Pose([0.05 * i, 0.02, 0.0325], [0, 0, 0, 1])
+            for i in range(n_platforms)
+        ]
+
+        world = SharedWorld()
+        shared_platforms = [
+            TriFingerPlatform(shared_world=world, initial_object_pose=pose)
+            for pose in poses
+        ]
+        # the shared world always uses deterministic overlapping pairs
+        separate_platforms = [
+            TriFingerPlatform(
+                initial_object_pose=pose, deterministic_overlapping_pairs=True
+            )
+            for pose in poses
+        ]
+
+        # move the fingers to different targets with the position controller
+        targets = [
+            [0.1 * i, 0.9, -1.7, 0.0, 0.9 - 0.1 * i, -1.7, 0.0, 0.9, -1.5]
+            for i in range(n_platforms)
+        ]
+        for _ in range(300):
+            for platforms in (shared_platforms, separate_platforms):
+                for platform, target in zip(platforms, targets):
+                    t = platform.append_desired_action(
+                        platform.Action(position=target)
+                    )
+
+            for shared, separate in zip(
+                shared_platforms, separate_platforms
+            ):
+                np.testing.assert_array_almost_equal(
+                    shared.get_robot_observation(t + 1).position,
+                    separate.get_robot_observation(t + 1).position,
+                )
+                np.testing.assert_array_almost_equal(
+                    shared.get_object_pose(t + 1).position,
+                    separate.get_object_pose(t + 1).position,
+                )
+
+    def test_lockstep(self):
+        world = SharedWorld()
+        platform1 = TriFingerPlatform(shared_world=world)
+        platform2 = TriFingerPlatform(shared_world=world)
+
+        t = platform1.append_desired_action(platform1.Action())
+        # the world is not stepped before all platforms have an action
+        with self.assertRaises(RuntimeError):
+            platform1.get_robot_observation(t + 1)
+        with self.assertRaises(RuntimeError):
+            platform1.append_desired_action(platform1.Action())
+
+        platform2.append_desired_action(platform2.Action())
+        platform1.get_robot_observation(t + 1)
+
+    def test_reset(self):
+        world = SharedWorld()
+        platforms = [TriFingerPlatform(shared_world=world) for _ in range(2)]
+
+        for _ in range(100):
+            for platform in platforms:
+                t = platform.append_desired_action(
+                    platform.Action(torque=[0.3] * 9)
+                )
+
+        pose = move_cube.Pose([0.05, 0.05, 0.0325], [0, 0, 0, 1])
+        platforms[0].reset(initial_object_pose=pose)
+        # time index is reset, so there is no current time index yet
+        with self.assertRaises(ValueError):
+            platforms[0].get_current_timeindex()
+
+        np.testing.assert_array_almost_equal(
+            platforms[0].get_object_pose(0).position, pose.position
+        )
+        np.testing.assert_array_equal(
+            platforms[0].get_robot_observation(0).position,
+            TriFingerPlatform.spaces.robot_position.default,
+        )
+        np.testing.assert_array_equal(
+            platforms[0].get_robot_observation(0).velocity, np.zeros(9)
+        )
+        self.assertEqual(platforms[1].get_current_timeindex(), t)
+
+    def test_reset_with_pending_action(self):
+        world = SharedWorld()
+        platforms = [TriFingerPlatform(shared_world=world) for _ in range(2)]
+        for _ in range(20):
+            for platform in platforms:
+                platform.append_desired_action(platform.Action())
+
+        # pyBullet would still apply the torques of the pending action, so
+        # resetting is not possible before the world is stepped
+        platforms[0].append_desired_action(
+            platforms[0].Action(torque=[0.3] * 9)
+        )
+        with self.assertRaises(RuntimeError):
+            platforms[0].reset()
+
+        platforms[1].append_desired_action(platforms[1].Action())
+        platforms[0].reset()
+
+        # the platforms are stepped in lockstep again
+        for _ in range(5):
+            time_indices = [
+                platform.append_desired_action(platform.Action())
+                for platform in platforms
+            ]
+            for platform, t in zip(platforms, time_indices):
+                platform.get_robot_observation(t + 1)
+        self.assertEqual(time_indices, [4, 25])
+
+    def test_cameras_not_supported(self):
+        with self.assertRaises(ValueError):
+            TriFingerPlatform(shared_world=SharedWorld(), enable_cameras=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+
+from trifinger_simulation.sim_finger import SimFinger
+from trifinger_simulation.sim_finger_pool import SimFingerPool
+
+
+class TestSimFingerPool(unittest.TestCase):
+    """Test the batched interface for multiple simulated robots."""
+
+    def test_same_as_sim_finger(self):
+        # Run the pool and individual SimFinger instances with the same
+        # actions and verify that they produce the same trajectories.
+        n_robots = 3
+        pool = SimFingerPool(n_robots, finger_type="trifingerpro")
+        robots = [
+            SimFinger(finger_type="trifingerpro", compute_tip_forces=False)
+            for _ in range(n_robots)
+        ]
+
+        start_position = np.array([[0.0, 0.7, -1.5] * 3] * n_robots)
+        start_position[1] += 0.1
+        pool.reset(start_position)
+        for robot, position in zip(robots, start_position):
+            robot.reset_finger_positions_and_velocities(position)
+
+        rng = np.random.RandomState(42)
+        for i in range(300):
+            torque = rng.uniform(-0.2, 0.2, size=(n_robots, 9))
+            position = rng.uniform(-0.5, 0.5, size=(n_robots, 9))
+            # disable position control for some joints
+            position[:, i % 9] = np.nan
+            if i % 2:
+                torque = np.zeros_like(torque)
+
+            pool_observation = pool.step(torque=torque, position=position)
+
+            for j, robot in enumerate(robots):
+                t = robot.append_desired_action(
+                    robot.Action(torque=torque[j], position=position[j])
+                )
+                observation = robot.get_observation(t + 1)
+
+                np.testing.assert_array_equal(
+                    observation.position, pool_observation.position[j]
+                )
+                np.testing.assert_array_equal(
+                    observation.velocity, pool_observation.velocity[j]
+                )
+                np.testing.assert_array_equal(
+                    observation.torque, pool_observation.torque[j]
+                )
+
+    def test_invalid_shape(self):
+        pool = SimFingerPool(2, finger_type="fingerone")
+        with self.assertRaises(ValueError):
+            pool.step(torque=np.zeros((3, 3)))
+        with self.assertRaises(ValueError):
+            pool.step(position=np.zeros(3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -88,6 +88,19 @@ class TestMoveCube(unittest.TestCase):
         )
         np.testing.assert_array_almost_equal(expected_both_corners, both)
 
+        # multiple poses at once
+        batch = move_cube.get_cube_corner_positions(
+            move_cube.Pose(
+                np.array([[1, 2, 3], [1, 2, 3]]),
+                np.array([rot_z90, [0, 0, 0, 1]]),
+            )
+        )
+        self.assertEqual(batch.shape, (2, 8, 3))
+        np.testing.assert_array_almost_equal(batch[0], both)
+        np.testing.assert_array_almost_equal(
+            batch[1], move_cube._cube_corners + [1, 2, 3]
+        )
+
     def test_sample_goal_difficulty_1(self):
         for i in range(1000):
             goal = move_cube.sample_goal(difficulty=1)
@@ -299,6 +312,107 @@ class TestMoveCube(unittest.TestCase):
         )
         self.assertAlmostEqual(cost_without_y, cost_with_y)
 
+    def test_evaluate_states(self):
+        # the vectorized version needs to match evaluate_state()
+        rng = np.random.RandomState(0)
+        positions = rng.uniform(-0.2, 0.2, size=(100, 3))
+        orientations = Rotation.random(100, random_state=rng).as_quat()
+        # non-normalized quaternions are normalized by evaluate_state()
+        orientations[:10] *= 3
+
+        for difficulty in (1, 2, 3, 4):
+            goal = move_cube.sample_goal(difficulty, rng=rng)
+            costs = move_cube.evaluate_states(
+                goal, positions, orientations, difficulty
+            )
+            expected_costs = [
+                move_cube.evaluate_state(
+                    goal, move_cube.Pose(position, orientation), difficulty
+                )
+                for position, orientation in zip(positions, orientations)
+            ]
+
+            self.assertEqual(costs.shape, (100,))
+            np.testing.assert_allclose(costs, expected_costs, atol=1e-12)
+
+        with self.assertRaises(ValueError):
+            move_cube.evaluate_states(goal, positions, orientations, 5)
+
+    def test_sample_goals(self):
+        n = 1000
+        for difficulty in (-1, 1, 2, 3, 4):
+            positions, orientations = move_cube.sample_goals(
+                difficulty, n, np.random.RandomState(difficulty + 1)
+            )
+            self.assertEqual(positions.shape, (n, 3))
+            self.assertEqual(orientations.shape, (n, 4))
+
+            valid, reasons = move_cube.validate_goals(positions, orientations)
+            self.assertTrue(np.all(valid), msg=np.unique(reasons))
+
+            if difficulty in (1, 2, 3):
+                np.testing.assert_array_equal(
+                    orientations, np.tile([0, 0, 0, 1], (n, 1))
+                )
+            if difficulty in (-1, 1):
+                np.testing.assert_array_equal(
+                    positions[:, 2], move_cube._CUBOID_HALF_SIZE[2]
+                )
+
+        # samples are reproducible with a seeded generator
+        for rng_type in (np.random.RandomState, np.random.default_rng):
+            positions, orientations = move_cube.sample_goals(
+                4, 10, rng_type(42)
+            )
+            positions2, orientations2 = move_cube.sample_goals(
+                4, 10, rng_type(42)
+            )
+            np.testing.assert_array_equal(positions, positions2)
+            np.testing.assert_array_equal(orientations, orientations2)
+
+        with self.assertRaises(ValueError):
+            move_cube.sample_goals(5, 10)
+
+    def test_validate_goals(self):
+        # the vectorized version needs to match validate_goal()
+        rng = np.random.RandomState(0)
+        positions = rng.uniform(
+            [-0.2, -0.2, -0.05], [0.2, 0.2, 0.15], size=(2000, 3)
+        )
+        orientations = Rotation.random(2000, random_state=rng).as_quat()
+        orientations[:500] = [0, 0, 0, 1]
+
+        valid, reasons = move_cube.validate_goals(positions, orientations)
+
+        messages = {
+            move_cube.InvalidGoalReason.OUTSIDE_ARENA: "outside of the arena",
+            move_cube.InvalidGoalReason.TOO_LOW: "Position is too low",
+            move_cube.InvalidGoalReason.TOO_HIGH: "too high",
+            move_cube.InvalidGoalReason.CORNER_TOO_LOW: "corner is too low",
+        }
+        for position, orientation, is_valid, reason in zip(
+            positions, orientations, valid, reasons
+        ):
+            pose = move_cube.Pose(position, orientation)
+            if is_valid:
+                self.assertEqual(reason, move_cube.InvalidGoalReason.VALID)
+                move_cube.validate_goal(pose)
+            else:
+                with self.assertRaisesRegex(
+                    move_cube.InvalidGoalError, messages[reason]
+                ):
+                    move_cube.validate_goal(pose)
+
+        # make sure all reasons are covered
+        self.assertEqual(
+            set(reasons), set(move_cube.InvalidGoalReason.__members__.values())
+        )
+
+        with self.assertRaises(ValueError):
+            move_cube.validate_goals(positions[:, :2], orientations)
+        with self.assertRaises(ValueError):
+            move_cube.validate_goals(positions, orientations[:-1])
+
     def test_validate_goal(self):
         on_ground_height = move_cube._CUBOID_HALF_SIZE[2]
         yaw_rotation = Rotation.from_euler("z", 0.42).as_quat()
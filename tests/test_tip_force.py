@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+
+from trifinger_simulation.sim_finger import SimFinger
+
+
+class TestTipForce(unittest.TestCase):
+    """Test the simulated push sensors of the finger tips."""
+
+    def test_contact(self):
+        finger = SimFinger(finger_type="trifingerpro")
+        finger.reset_finger_positions_and_velocities([0.0, 0.9, -1.7] * 3)
+
+        # without contact, only the "no contact" offset is measured
+        t = finger.append_desired_action(finger.Action())
+        np.testing.assert_array_almost_equal(
+            finger.get_observation(t).tip_force, [0.05] * 3
+        )
+
+        # move the tips to a position where they are in contact with the
+        # boundary of the arena
+        action = finger.Action(position=[0.0, 1.2, -1.2] * 3)
+        for _ in range(500):
+            t = finger.append_desired_action(action)
+        observation_tplus1 = finger.get_observation(t + 1)
+        np.testing.assert_array_less(0.05, observation_tplus1.tip_force)
+
+        # nothing changes until the next step
+        t = finger.append_desired_action(action)
+        np.testing.assert_array_equal(
+            observation_tplus1.tip_force, finger.get_observation(t).tip_force
+        )
+
+    def test_disable_tip_forces(self):
+        finger = SimFinger(
+            finger_type="trifingerpro", compute_tip_forces=False
+        )
+        t = finger.append_desired_action(finger.Action())
+        self.assertIsNone(finger.get_observation(t).tip_force)
+        self.assertIsNone(finger.get_observation(t + 1).tip_force)
+
+
+if __name__ == "__main__":
+    unittest.main()
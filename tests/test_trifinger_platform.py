@@ -4,6 +4,7 @@ import unittest
 import numpy as np
 
 from trifinger_simulation import TriFingerPlatform
+from trifinger_simulation.gym_wrapper.envs import cube_env
 
 
 class TestTriFingerPlatform(unittest.TestCase):
@@ -81,6 +82,128 @@ class TestTriFingerPlatform(unittest.TestCase):
         with self.assertRaises(ValueError):
             platform.get_camera_observation(t + 2)
 
+    def test_async_cameras(self):
+        # The asynchronously rendered images need to be the same as the ones
+        # rendered in the control loop.
+        Pose = namedtuple("Pose", ["position", "orientation"])
+        pose = Pose([0.05, -0.02, 0.0325], [0, 0, 0.2084599, 0.97803091])
+        rng = np.random.RandomState(0)
+        torques = [rng.uniform(-0.3, 0.3, size=9) for _ in range(60)]
+
+        def run(platform):
+            images = []
+            for torque in torques:
+                t = platform.append_desired_action(
+                    platform.Action(torque=torque)
+                )
+                # only get the images of every camera update (every 25 steps)
+                if t % 25 == 0:
+                    observation = platform.get_camera_observation(t)
+                    images.append([c.image for c in observation.cameras])
+            # images of the next step
+            observation = platform.get_camera_observation(t + 1)
+            images.append([c.image for c in observation.cameras])
+            return np.array(images)
+
+        sync_images = run(
+            TriFingerPlatform(enable_cameras=True, initial_object_pose=pose)
+        )
+        platform = TriFingerPlatform(
+            enable_cameras=True, async_cameras=True, initial_object_pose=pose
+        )
+        async_images = run(platform)
+
+        self.assertEqual(sync_images.shape, (4, 3, 270, 270, 3))
+        np.testing.assert_array_equal(sync_images, async_images)
+
+        # also after a reset
+        platform.reset(initial_object_pose=pose)
+        np.testing.assert_array_equal(sync_images, run(platform))
+
+        with self.assertRaises(ValueError):
+            TriFingerPlatform(async_cameras=True)
+
+    def test_close(self):
+        platform = TriFingerPlatform(enable_cameras=True, async_cameras=True)
+        workers = list(platform._camera_renderer._pool._pool)
+        self.assertTrue(all(worker.is_alive() for worker in workers))
+
+        platform.append_desired_action(platform.Action())
+        platform.close()
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+        # closing again has no effect
+        platform.close()
+
+        # the simulation can still be used without cameras
+        t = platform.append_desired_action(platform.Action())
+        platform.get_robot_observation(t)
+
+        with TriFingerPlatform(
+            enable_cameras=True, async_cameras=True
+        ) as platform:
+            workers = list(platform._camera_renderer._pool._pool)
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+    def test_camera_channels(self):
+        channels = ("rgb", "depth", "segmentation")
+        sync_platform = TriFingerPlatform(
+            enable_cameras=True, camera_channels=channels
+        )
+        async_platform = TriFingerPlatform(
+            enable_cameras=True, async_cameras=True, camera_channels=channels
+        )
+        for platform in (sync_platform, async_platform):
+            t = platform.append_desired_action(platform.Action())
+            observation = platform.get_camera_observation(t)
+            for camera_observation in observation.cameras:
+                self.assertEqual(camera_observation.image.shape, (270, 270, 3))
+                self.assertEqual(camera_observation.depth.shape, (270, 270))
+                self.assertEqual(
+                    camera_observation.segmentation.shape, (270, 270)
+                )
+                self.assertIsNone(camera_observation.bayer)
+
+        for sync_camera, async_camera in zip(
+            sync_platform.get_camera_observation(t).cameras,
+            async_platform.get_camera_observation(t).cameras,
+        ):
+            np.testing.assert_array_equal(
+                sync_camera.image, async_camera.image
+            )
+            np.testing.assert_array_equal(
+                sync_camera.depth, async_camera.depth
+            )
+
+        # only RGB by default
+        platform = TriFingerPlatform(enable_cameras=True)
+        t = platform.append_desired_action(platform.Action())
+        camera_observation = platform.get_camera_observation(t).cameras[0]
+        self.assertIsNotNone(camera_observation.image)
+        self.assertIsNone(camera_observation.depth)
+
+        with self.assertRaises(ValueError):
+            TriFingerPlatform(enable_cameras=True, camera_channels=("ir",))
+
+    def test_compute_tip_forces(self):
+        platform = TriFingerPlatform()
+        t = platform.append_desired_action(platform.Action())
+        self.assertEqual(
+            platform.get_robot_observation(t).tip_force.shape, (3,)
+        )
+
+        platform = TriFingerPlatform(compute_tip_forces=False)
+        t = platform.append_desired_action(platform.Action())
+        self.assertIsNone(platform.get_robot_observation(t).tip_force)
+
+        env = cube_env.CubeEnv(
+            cube_env.RandomInitializer(1), compute_tip_forces=False
+        )
+        env.reset()
+        env.step(env.action_space.sample())
+        t = env.platform.get_current_timeindex()
+        self.assertIsNone(env.platform.get_robot_observation(t).tip_force)
+
     def test_object_pose_observation(self):
         Pose = namedtuple("Pose", ["position", "orientation"])
         pose = Pose([0.1, -0.5, 0], [0, 0, 0.2084599, 0.97803091])
@@ -94,6 +217,79 @@ class TestTriFingerPlatform(unittest.TestCase):
             obs.object_pose.orientation, pose.orientation
         )
 
+    def test_get_object_pose(self):
+        platform = TriFingerPlatform()
+
+        with self.assertRaises(ValueError):
+            platform.get_object_pose(-1)
+
+        t = platform.append_desired_action(platform.Action())
+        for t_ in (t, t + 1):
+            object_pose = platform.get_object_pose(t_)
+            camera_object_pose = platform.get_camera_observation(
+                t_
+            ).object_pose
+            np.testing.assert_array_equal(
+                object_pose.position, camera_object_pose.position
+            )
+            np.testing.assert_array_equal(
+                object_pose.orientation, camera_object_pose.orientation
+            )
+
+        with self.assertRaises(ValueError):
+            platform.get_object_pose(t + 2)
+
+    def test_reset_equals_new_platform(self):
+        # A platform that is reset to a given initial state needs to behave
+        # exactly the same as a newly created one with that initial state.
+        Pose = namedtuple("Pose", ["position", "orientation"])
+        pose = Pose([0.05, -0.02, 0.0325], [0, 0, 0.2084599, 0.97803091])
+        rng = np.random.RandomState(0)
+        actions = [rng.uniform(-0.3, 0.3, size=9) for _ in range(300)]
+
+        def run(platform):
+            observations = []
+            for torque in actions:
+                t = platform.append_desired_action(
+                    platform.Action(torque=torque)
+                )
+                robot_obs = platform.get_robot_observation(t)
+                object_pose = platform.get_camera_observation(t).object_pose
+                observations.append(
+                    np.concatenate(
+                        [
+                            robot_obs.position,
+                            robot_obs.velocity,
+                            object_pose.position,
+                            object_pose.orientation,
+                        ]
+                    )
+                )
+            return np.array(observations)
+
+        new_platform_observations = run(
+            TriFingerPlatform(
+                initial_object_pose=pose, deterministic_overlapping_pairs=True
+            )
+        )
+
+        platform = TriFingerPlatform(deterministic_overlapping_pairs=True)
+        # do some steps with a different action sequence before resetting
+        for _ in range(100):
+            platform.append_desired_action(
+                platform.Action(torque=[0.3, -0.3, 0.3] * 3)
+            )
+        platform.reset(initial_object_pose=pose)
+
+        # time index needs to start from zero again
+        t = platform.append_desired_action(platform.Action())
+        self.assertEqual(t, 0)
+        platform.reset(initial_object_pose=pose)
+
+        np.testing.assert_array_equal(
+            new_platform_observations, run(platform)
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+import unittest
+import numpy as np
+import gym
+
+from trifinger_simulation.gym_wrapper.envs import cube_env
+from trifinger_simulation.gym_wrapper.vector_env import SharedMemoryVectorEnv
+
+
+class CountingEnv(gym.Env):
+    """Minimal environment with short episodes for testing auto-reset."""
+
+    observation_space = gym.spaces.Box(low=0, high=10, shape=(1,))
+    action_space = gym.spaces.Box(low=-1, high=1, shape=(1,))
+    episode_length = 3
+
+    def reset(self):
+        self.step_count = 0
+        return np.array([self.step_count], dtype=np.float32)
+
+    def step(self, action):
+        if action[0] < 0:
+            raise ValueError("negative action")
+        self.step_count += 1
+        observation = np.array([self.step_count], dtype=np.float32)
+        done = self.step_count == self.episode_length
+        return observation, float(action[0]), done, {}
+
+
+def make_cube_env():
+    return cube_env.CubeEnv(
+        cube_env.RandomInitializer(difficulty=3), reuse_platform=True
+    )
+
+
+class TestSharedMemoryVectorEnv(unittest.TestCase):
+    """Test the SharedMemoryVectorEnv."""
+
+    def test_same_as_cube_env(self):
+        # Each environment of the vector env needs to produce the same
+        # observations and rewards as an environment running in this process.
+        n_envs = 2
+        n_steps = 30
+
+        vector_env = SharedMemoryVectorEnv([make_cube_env] * n_envs)
+        vector_env.seed([10, 20])
+        vector_observation = vector_env.reset()
+
+        action_space = vector_env.single_action_space
+        action_space.seed(0)
+        actions = [
+            [action_space.sample() for _ in range(n_envs)]
+            for _ in range(n_steps)
+        ]
+
+        vector_rewards = []
+        vector_positions = [vector_observation["observation"]["position"]]
+        for step_actions in actions:
+            vector_observation, rewards, dones, infos = vector_env.step(
+                step_actions
+            )
+            vector_rewards.append(rewards)
+            vector_positions.append(
+                vector_observation["observation"]["position"]
+            )
+            self.assertFalse(dones.any())
+            self.assertEqual(list(infos), [{"difficulty": 3}] * n_envs)
+        vector_env.close()
+
+        for i, seed in enumerate([10, 20]):
+            env = make_cube_env()
+            env.seed(seed)
+            observation = env.reset()
+            np.testing.assert_array_equal(
+                vector_positions[0][i],
+                observation["observation"]["position"].astype(np.float32),
+            )
+            for t, step_actions in enumerate(actions):
+                observation, reward, _, _ = env.step(step_actions[i])
+                self.assertEqual(vector_rewards[t][i], reward)
+                np.testing.assert_array_equal(
+                    vector_positions[t + 1][i],
+                    observation["observation"]["position"].astype(np.float32),
+                )
+
+    def test_auto_reset(self):
+        env = SharedMemoryVectorEnv([CountingEnv] * 2)
+        observations = env.reset()
+        np.testing.assert_array_equal(observations, [[0], [0]])
+
+        action = [[0.5], [0.5]]
+        for step in range(1, 3):
+            observations, rewards, dones, infos = env.step(action)
+            np.testing.assert_array_equal(observations, [[step], [step]])
+            np.testing.assert_array_equal(rewards, [0.5, 0.5])
+            np.testing.assert_array_equal(dones, [False, False])
+
+        # the last step of the episode returns the first observation of the
+        # next episode
+        observations, rewards, dones, infos = env.step(action)
+        np.testing.assert_array_equal(observations, [[0], [0]])
+        np.testing.assert_array_equal(dones, [True, True])
+        for info in infos:
+            np.testing.assert_array_equal(info["terminal_observation"], [3])
+
+        env.close()
+
+    def test_error_in_worker(self):
+        env = SharedMemoryVectorEnv([CountingEnv] * 2)
+        env.reset()
+        with self.assertRaisesRegex(RuntimeError, "negative action"):
+            env.step([[0.5], [-0.5]])
+        env.close()
+
+    def test_error_in_env_creation(self):
+        def make_broken_env():
+            raise ValueError("broken env")
+
+        # the traceback of the worker is raised instead of an EOFError
+        with self.assertRaisesRegex(RuntimeError, "broken env"):
+            SharedMemoryVectorEnv([CountingEnv, make_broken_env])
+
+
+if __name__ == "__main__":
+    unittest.main()